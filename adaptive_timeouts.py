@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+InPlay Football Adaptive Timeouts
+Learns how long each browser wait and cycle stage normally takes (EWMA and a
+rolling p99) and sets its timeout to a multiple of that, between a floor and the
+old fixed value, so a sick site is detected in seconds rather than minutes
+"""
+
+import os
+import json
+import time
+import logging
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Optional
+
+from scraper_metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyStats:
+    """EWMA plus a bounded window of recent samples for one wait or stage"""
+
+    def __init__(self, window: int = 200, alpha: float = 0.2):
+        self.alpha = alpha
+        self.ewma: Optional[float] = None
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def add(self, seconds: float) -> None:
+        self.ewma = seconds if self.ewma is None else self.alpha * seconds + (1 - self.alpha) * self.ewma
+        self.samples.append(seconds)
+
+    def p99(self) -> float:
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))]
+
+    def estimate(self) -> float:
+        """The slower of the recent trend and the tail, so one fast streak cannot starve a slow page"""
+        return max(self.ewma or 0.0, self.p99())
+
+
+class AdaptiveTimeouts:
+    """Per-key timeouts of `multiple` x observed latency, clamped to [floor, ceiling]"""
+
+    def __init__(self, state_path: Optional[str] = None, multiple: Optional[float] = None,
+                 floor: Optional[float] = None, min_samples: Optional[int] = None,
+                 enabled: Optional[bool] = None, window: int = 200):
+        self.state_path = state_path
+        self.multiple = float(os.getenv('ADAPTIVE_TIMEOUT_MULTIPLE', '3')) if multiple is None else multiple
+        self.floor = float(os.getenv('ADAPTIVE_TIMEOUT_FLOOR', '5')) if floor is None else floor
+        # Until a key has this many samples its fixed default is used
+        self.min_samples = int(os.getenv('ADAPTIVE_TIMEOUT_MIN_SAMPLES', '5')) if min_samples is None else min_samples
+        self.enabled = os.getenv('ADAPTIVE_TIMEOUTS', '1') != '0' if enabled is None else enabled
+        self.window = window
+        self.stats: Dict[str, LatencyStats] = {}
+        self._load_state()
+
+    def _stats(self, key: str) -> LatencyStats:
+        if key not in self.stats:
+            self.stats[key] = LatencyStats(self.window)
+        return self.stats[key]
+
+    def observe(self, key: str, seconds: float) -> None:
+        self._stats(key).add(seconds)
+
+    def timeout(self, key: str, default: float, ceiling: Optional[float] = None,
+                floor: Optional[float] = None) -> float:
+        """Current timeout for key; the fixed default doubles as the ceiling unless one is given"""
+        ceiling = default if ceiling is None else ceiling
+        floor = self.floor if floor is None else floor
+        stats = self.stats.get(key)
+        if not self.enabled or stats is None or len(stats.samples) < self.min_samples:
+            value = default
+        else:
+            value = min(ceiling, max(floor, self.multiple * stats.estimate()))
+        REGISTRY.set('inplay_adaptive_timeout_seconds', round(value, 3), {'wait': key},
+                     help_text='Current timeout for each browser wait and cycle stage')
+        return value
+
+    @contextmanager
+    def measure(self, key: str, timeout: float):
+        """Record how long the block took; a timeout inside it is recorded as the full timeout"""
+        started = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            # Widen the next timeout after one fires, so a slow-but-working site recovers
+            if 'Timeout' in type(e).__name__:
+                self.observe(key, timeout)
+            raise
+        self.observe(key, time.monotonic() - started)
+
+    def _load_state(self) -> None:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as handle:
+                state = json.load(handle)
+            for key, entry in state.items():
+                stats = self._stats(key)
+                stats.samples.extend(entry.get('samples', []))
+                stats.ewma = entry.get('ewma')
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"⚠️ Could not load adaptive timeout state: {e}")
+
+    def save(self) -> None:
+        if not self.state_path:
+            return
+        state = {key: {'ewma': stats.ewma, 'samples': [round(s, 3) for s in stats.samples]}
+                 for key, stats in self.stats.items()}
+        try:
+            tmp_path = self.state_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as handle:
+                json.dump(state, handle)
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not save adaptive timeout state: {e}")
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+InPlay Football Alert Rules
+Rules declared in a JSON config are compiled once and evaluated only against
+rows the snapshot diff marks as changed, with per-rule de-duplication per match
+"""
+
+import os
+import json
+import queue
+import logging
+import operator
+import threading
+from datetime import datetime, timezone
+from typing import List, Dict, Optional, Callable
+
+from snapshot_diff import DiffResult
+
+logger = logging.getLogger(__name__)
+
+OPERATORS = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+    '==': operator.eq,
+    '!=': operator.ne,
+    'in': lambda value, options: value in options,
+    'contains': lambda value, text: text in value,
+}
+
+
+class AlertSink:
+    """Destination for fired alerts"""
+
+    name = 'sink'
+
+    def send(self, alert: Dict) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class LogSink(AlertSink):
+    name = 'log'
+
+    def send(self, alert: Dict) -> None:
+        logger.info(f"🔔 Alert {alert['rule']}: {alert['match_key']} ({alert['league']}) min {alert['min']}")
+
+
+class FileSink(AlertSink):
+    """Appends alerts as JSON lines to a local file"""
+
+    name = 'file'
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def send(self, alert: Dict) -> None:
+        with open(self.path, 'a', encoding='utf-8') as handle:
+            handle.write(json.dumps(alert, default=str) + '\n')
+
+
+class WebhookSink(AlertSink):
+    """Posts alerts to a URL from a background thread so the cycle never waits on it"""
+
+    name = 'webhook'
+
+    def __init__(self, url: str, timeout: float = 5.0, max_pending: int = 1000):
+        self.url = url
+        self.timeout = timeout
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name='alert-webhook', daemon=True)
+        self._thread.start()
+
+    def send(self, alert: Dict) -> None:
+        try:
+            self._queue.put_nowait(alert)
+        except queue.Full:
+            logger.warning(f"⚠️ Webhook queue full - dropping alert {alert['rule']} for {alert['match_key']}")
+
+    def _run(self) -> None:
+        import requests
+
+        while True:
+            alert = self._queue.get()
+            if alert is None:
+                return
+            try:
+                response = requests.post(self.url, json=alert, timeout=self.timeout)
+                if response.status_code >= 400:
+                    logger.warning(f"⚠️ Webhook returned {response.status_code} for {alert['rule']}")
+            except Exception as e:
+                logger.warning(f"⚠️ Webhook delivery failed: {e}")
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout=self.timeout)
+
+
+SINK_TYPES = {
+    'log': lambda options: LogSink(),
+    'file': lambda options: FileSink(options.get('path', 'alerts.jsonl')),
+    'webhook': lambda options: WebhookSink(options['url'], float(options.get('timeout', 5.0))),
+}
+
+
+class Rule:
+    """One compiled rule: all conditions must hold for a row to fire"""
+
+    def __init__(self, name: str, conditions: List[Callable[[Dict], bool]], columns: set,
+                 sinks: List[str], rearm: bool):
+        self.name = name
+        self.conditions = conditions
+        self.columns = columns
+        self.sinks = sinks
+        self.rearm = rearm
+
+    def matches(self, row: Dict) -> bool:
+        for condition in self.conditions:
+            if not condition(row):
+                return False
+        return True
+
+
+def compile_condition(column: str, op: str, operand) -> Callable[[Dict], bool]:
+    """Turn a [column, op, value] triple into a predicate over a row"""
+    if op not in OPERATORS:
+        raise ValueError(f"Unknown operator {op!r} for column {column!r}")
+    compare = OPERATORS[op]
+
+    def condition(row: Dict) -> bool:
+        value = row.get(column)
+        if value is None:
+            return False
+        try:
+            return compare(value, operand)
+        except TypeError:
+            return False
+
+    return condition
+
+
+class AlertEngine:
+    """Evaluates compiled rules against each snapshot diff"""
+
+    def __init__(self, config: Dict, state_path: Optional[str] = None):
+        self.state_path = state_path
+        self.sinks: Dict[str, AlertSink] = {}
+        for name, options in config.get('sinks', {'log': {'type': 'log'}}).items():
+            sink_type = options.get('type', name)
+            if sink_type not in SINK_TYPES:
+                raise ValueError(f"Unknown alert sink type {sink_type!r}")
+            self.sinks[name] = SINK_TYPES[sink_type](options)
+
+        self.rules: List[Rule] = []
+        # column -> rules that read it, so an updated row only re-runs affected rules
+        self.rules_by_column: Dict[str, List[Rule]] = {}
+        for spec in config.get('rules', []):
+            conditions = [compile_condition(*triple) for triple in spec['when']]
+            columns = {triple[0] for triple in spec['when']}
+            sinks = spec.get('sinks', list(self.sinks))
+            for sink in sinks:
+                if sink not in self.sinks:
+                    raise ValueError(f"Rule {spec['name']!r} uses undefined sink {sink!r}")
+            rule = Rule(spec['name'], conditions, columns, sinks, bool(spec.get('rearm', False)))
+            self.rules.append(rule)
+            for column in columns:
+                self.rules_by_column.setdefault(column, []).append(rule)
+
+        # (rule name, match key) pairs that have already fired
+        self.fired: set = set()
+        self._load_state()
+        logger.info(f"🔔 Alert engine loaded {len(self.rules)} rules and {len(self.sinks)} sinks")
+
+    @classmethod
+    def from_file(cls, path: str, state_path: Optional[str] = None) -> 'AlertEngine':
+        with open(path, 'r', encoding='utf-8') as handle:
+            return cls(json.load(handle), state_path)
+
+    def _load_state(self) -> None:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as handle:
+                self.fired = {tuple(pair) for pair in json.load(handle)}
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Could not load alert state: {e}")
+
+    def _save_state(self) -> None:
+        if not self.state_path:
+            return
+        try:
+            tmp_path = self.state_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as handle:
+                json.dump(sorted(self.fired), handle)
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not save alert state: {e}")
+
+    def process(self, diff: DiffResult) -> List[Dict]:
+        """Evaluate rules against changed rows and dispatch new alerts to sinks"""
+        alerts = []
+        fired_before = len(self.fired)
+
+        for key, row in diff.inserted.items():
+            alerts.extend(self._evaluate(key, row, self.rules))
+
+        for key, row in diff.updated.items():
+            candidates = {}
+            for column in diff.deltas[key]:
+                for rule in self.rules_by_column.get(column, ()):
+                    candidates[rule.name] = rule
+            if candidates:
+                alerts.extend(self._evaluate(key, row, candidates.values()))
+
+        # Finished matches can never fire again; drop their de-dup entries
+        if diff.removed:
+            self.fired = {pair for pair in self.fired if pair[1] not in diff.removed}
+
+        for alert in alerts:
+            for sink_name in alert.pop('_sinks'):
+                try:
+                    self.sinks[sink_name].send(alert)
+                except Exception as e:
+                    logger.warning(f"⚠️ Alert sink {sink_name} failed: {e}")
+
+        if alerts or diff.removed or len(self.fired) != fired_before:
+            self._save_state()
+        return alerts
+
+    def _evaluate(self, key: str, row: Dict, rules) -> List[Dict]:
+        alerts = []
+        for rule in rules:
+            marker = (rule.name, key)
+            if rule.matches(row):
+                if marker in self.fired:
+                    continue
+                self.fired.add(marker)
+                alerts.append({
+                    'rule': rule.name,
+                    'match_key': key,
+                    'league': row.get('league'),
+                    'hometeam': row.get('hometeam'),
+                    'awayteam': row.get('awayteam'),
+                    'min': row.get('min'),
+                    'score': row.get('score'),
+                    'values': {column: row.get(column) for column in sorted(rule.columns)},
+                    'fired_at': datetime.now(timezone.utc).isoformat(),
+                    '_sinks': rule.sinks,
+                })
+            elif rule.rearm and marker in self.fired:
+                # Condition went false again - allow the next crossing to fire
+                self.fired.discard(marker)
+        return alerts
+
+    def close(self) -> None:
+        for sink in self.sinks.values():
+            sink.close()
@@ -4,26 +4,53 @@ Continuous Runner for InPlay Football Scraper
 Alternative to server.js - runs the scraper continuously with no delays
 """
 
+import os
+import sys
 import time
+import signal
 import subprocess
 import logging
+import threading
+from collections import deque
 from datetime import datetime
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('continuous_runner.log'),
-        logging.StreamHandler()
-    ]
-)
+from resource_monitor import MB, process_rss, process_tree_rss
+from logging_setup import setup_logging
+from scraper_worker import WorkerClient, WorkerCrashed
+from cycle_supervisor import FailureBackoff
+
+# Configure logging: I/O happens on a background listener thread (see logging_setup.py)
+setup_logging('continuous_runner.log')
 
 logger = logging.getLogger(__name__)
 
+# Hard ceiling for one scraper process; the in-process stage deadlines should fire first
+CYCLE_TIMEOUT = int(os.getenv('CYCLE_TIMEOUT', '600'))
+
+def kill_process_group(process: subprocess.Popen, timed_out: threading.Event) -> None:
+    """Kill the scraper and everything it started (chromedriver, Chrome)"""
+    timed_out.set()
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+# Only the tail of each run's output is kept in memory
+OUTPUT_TAIL_LINES = int(os.getenv('OUTPUT_TAIL_LINES', '200'))
+RSS_SAMPLE_INTERVAL = 5
+
+def stream_output(pipe, tail: deque, echo: bool) -> None:
+    """Read a child pipe line by line into a ring buffer, optionally echoing it"""
+    for line in iter(pipe.readline, ''):
+        tail.append(line)
+        if echo:
+            print(f"📊 {line.strip()}")
+    pipe.close()
+
 def run_scraper_continuously():
     """Run the scraper continuously with no delays between runs"""
     run_count = 0
+    backoff = FailureBackoff()
     
     logger.info("🚀 Starting InPlay Football Scraper - Continuous Mode")
     logger.info("⚡ Mode: Instant restart after completion")
@@ -43,27 +70,44 @@ def run_scraper_continuously():
                 stderr=subprocess.PIPE,
                 text=True,
                 bufsize=1,
-                universal_newlines=True
+                universal_newlines=True,
+                start_new_session=True
             )
             
-            # Stream output in real-time
-            stdout_lines = []
-            stderr_lines = []
+            # Watchdog: kills the whole process group if the run exceeds CYCLE_TIMEOUT
+            timed_out = threading.Event()
+            watchdog = threading.Timer(CYCLE_TIMEOUT, kill_process_group, args=(process, timed_out))
+            watchdog.daemon = True
+            watchdog.start()
+            
+            # Stream output through bounded ring buffers; each pipe is drained on its own
+            # thread so a chatty stderr can never fill up and block the child
+            stdout_lines = deque(maxlen=OUTPUT_TAIL_LINES)
+            stderr_lines = deque(maxlen=OUTPUT_TAIL_LINES)
+            readers = [
+                threading.Thread(target=stream_output, args=(process.stdout, stdout_lines, True), daemon=True),
+                threading.Thread(target=stream_output, args=(process.stderr, stderr_lines, False), daemon=True),
+            ]
+            for reader in readers:
+                reader.start()
             
+            # Sample the child's process tree (Python + chromedriver + Chrome) while it runs
+            peak_child_mb = 0.0
             while True:
-                output = process.stdout.readline()
-                if output == '' and process.poll() is not None:
+                peak_child_mb = max(peak_child_mb, process_tree_rss(process.pid) / MB)
+                try:
+                    process.wait(timeout=RSS_SAMPLE_INTERVAL)
                     break
-                if output:
-                    print(f"📊 {output.strip()}")
-                    stdout_lines.append(output)
+                except subprocess.TimeoutExpired:
+                    continue
             
-            # Get any remaining output
-            remaining_stdout, remaining_stderr = process.communicate()
-            if remaining_stdout:
-                stdout_lines.append(remaining_stdout)
-            if remaining_stderr:
-                stderr_lines.append(remaining_stderr)
+            for reader in readers:
+                reader.join(timeout=5)
+            watchdog.cancel()
+            if timed_out.is_set():
+                raise subprocess.TimeoutExpired(process.args, CYCLE_TIMEOUT)
+            
+            logger.info(f"🧠 RSS - runner {process_rss() / MB:.0f} MB, scraper tree peak {peak_child_mb:.0f} MB")
             
             # Create result object
             class Result:
@@ -78,6 +122,7 @@ def run_scraper_continuously():
             duration = (end_time - start_time).total_seconds()
             
             if result.returncode == 0:
+                backoff.succeeded()
                 logger.info(f"✅ Run #{run_count} completed successfully in {duration:.1f} seconds")
                 # Log last few lines of output for monitoring
                 if result.stdout:
@@ -90,9 +135,10 @@ def run_scraper_continuously():
                 if result.stderr:
                     logger.error(f"Error: {result.stderr.strip()}")
                 
-                # Wait 30 seconds on error before retrying
-                logger.info("⏳ Waiting 30 seconds before retry...")
-                time.sleep(30)
+                # Stages already retried inside the run; back off briefly before the next one
+                delay = backoff.failed()
+                logger.info(f"⏳ Waiting {delay:.1f} seconds before retry...")
+                time.sleep(delay)
                 continue
             
             # Instant restart (1 second delay to prevent overlap)
@@ -100,8 +146,8 @@ def run_scraper_continuously():
             time.sleep(1)
             
         except subprocess.TimeoutExpired:
-            logger.error(f"⏰ Run #{run_count} timed out after 10 minutes")
-            time.sleep(30)
+            logger.error(f"⏰ Run #{run_count} timed out after {CYCLE_TIMEOUT} seconds - process group killed")
+            time.sleep(backoff.failed())
             continue
             
         except KeyboardInterrupt:
@@ -110,12 +156,62 @@ def run_scraper_continuously():
             
         except Exception as e:
             logger.error(f"❌ Unexpected error in run #{run_count}: {e}")
-            time.sleep(30)
+            time.sleep(backoff.failed())
             continue
 
+def run_warm_worker_continuously():
+    """Drive one long-lived worker process instead of spawning Python every cycle"""
+    run_count = 0
+    client = WorkerClient()
+    backoff = FailureBackoff()
+    
+    logger.info("🚀 Starting InPlay Football Scraper - Continuous Mode (warm worker)")
+    logger.info(f"♻️ Worker respawns on crash or after {client.max_cycles} cycles")
+    logger.info("🔄 Press Ctrl+C to stop")
+    
+    try:
+        while True:
+            run_count += 1
+            start_time = datetime.now()
+            
+            try:
+                logger.info(f"🎯 Starting scraper run #{run_count} at {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
+                result = client.run_cycle()
+                duration = (datetime.now() - start_time).total_seconds()
+                
+                if result.get('ok'):
+                    backoff.succeeded()
+                    logger.info(f"✅ Run #{run_count} completed successfully in {duration:.1f} seconds "
+                                f"({result.get('rows', 0)} rows, worker cycle {result.get('cycle')}, "
+                                f"Python {result.get('python_rss_mb', 0):.0f} MB, browser {result.get('browser_rss_mb', 0):.0f} MB)")
+                    logger.info("🔄 Restarting immediately...")
+                    time.sleep(1)
+                else:
+                    delay = backoff.failed()
+                    logger.error(f"❌ Run #{run_count} failed after {duration:.1f} seconds: {result.get('error') or 'see worker log'}")
+                    logger.info(f"⏳ Waiting {delay:.1f} seconds before retry...")
+                    time.sleep(delay)
+                    
+            except WorkerCrashed as e:
+                logger.error(f"💥 Run #{run_count}: {e} - worker will be respawned")
+                time.sleep(backoff.failed())
+                
+            except KeyboardInterrupt:
+                logger.info("🛑 Received interrupt signal - stopping continuous runner")
+                break
+                
+            except Exception as e:
+                logger.error(f"❌ Unexpected error in run #{run_count}: {e}")
+                time.sleep(backoff.failed())
+    finally:
+        client.stop()
+
 if __name__ == "__main__":
     try:
-        run_scraper_continuously()
+        if os.getenv('WARM_WORKER') == '1' or '--warm' in sys.argv[1:]:
+            run_warm_worker_continuously()
+        else:
+            run_scraper_continuously()
     except KeyboardInterrupt:
         logger.info("✅ Continuous runner stopped")
     except Exception as e:
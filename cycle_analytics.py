@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+InPlay Football Cycle Analytics
+Vectorised per-snapshot signals: implied probabilities, model-vs-market edge
+and line movement against the previous snapshot and the opening lines
+"""
+
+import os
+import time
+import logging
+from typing import List, Dict, Optional
+
+import numpy as np
+
+from match_history import match_key_for
+
+logger = logging.getLogger(__name__)
+
+# Source columns pulled into float arrays once per snapshot
+INPUT_COLUMNS = [
+    'hdp1', 'tg1', 'hprice', 'aprice', 'over_price', 'under_price',
+    'modhome', 'modaway', 'homeperc', 'modover', 'overperc',
+    'startline', 'start_tgs',
+]
+
+# Columns tracked against the previous snapshot of the same match
+MOVEMENT_COLUMNS = ['hdp1', 'tg1', 'hprice', 'aprice', 'over_price', 'under_price']
+
+# Derived columns written alongside each row
+OUTPUT_COLUMNS = [
+    'imp_home', 'imp_away', 'imp_over', 'imp_under',
+    'overround_hdp', 'overround_tg',
+    'edge_home', 'edge_over',
+    'value_home', 'value_away', 'value_over',
+    'hdp1_move_open', 'tg1_move_open',
+] + [f'{column}_move_prev' for column in MOVEMENT_COLUMNS]
+
+
+def _matrix(rows: List[Dict], columns: List[str]) -> np.ndarray:
+    """Extract columns as a float64 (columns x rows) matrix with None mapped to NaN"""
+    raw = np.array([[row.get(column) for column in columns] for row in rows], dtype=object)
+    raw[np.equal(raw, None)] = np.nan
+    return raw.astype(np.float64).T
+
+
+def _as_probability(values: np.ndarray) -> np.ndarray:
+    """Model percentages arrive either as 0-1 or 0-100; normalise to 0-1"""
+    return np.where(values > 1.0, values / 100.0, values)
+
+
+class CycleAnalytics:
+    """Computes derived signals for each snapshot, remembering the previous one"""
+
+    def __init__(self, precision: int = 4, state_path: Optional[str] = None):
+        self.precision = precision
+        self.state_path = state_path
+        self._previous_keys: Dict[str, int] = {}
+        self._previous_values: Optional[np.ndarray] = None
+        self.last_duration = 0.0
+        self._load_state()
+
+    def _load_state(self) -> None:
+        """Restore the previous snapshot so movement survives one-process-per-cycle runners"""
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with np.load(self.state_path, allow_pickle=False) as state:
+                keys = state['keys'].tolist()
+                values = state['values']
+            if values.shape == (len(MOVEMENT_COLUMNS), len(keys)):
+                self._previous_keys = {key: i for i, key in enumerate(keys) if key}
+                self._previous_values = values
+        except Exception as e:
+            logger.warning(f"⚠️ Could not load analytics state: {e}")
+
+    def _save_state(self, keys: List[Optional[str]]) -> None:
+        if not self.state_path:
+            return
+        try:
+            tmp_path = self.state_path + '.tmp.npz'
+            np.savez(tmp_path, keys=np.array([key or '' for key in keys]), values=self._previous_values)
+            os.replace(tmp_path, self.state_path)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not save analytics state: {e}")
+
+    def compute(self, rows: List[Dict]) -> Dict[str, np.ndarray]:
+        """Return the derived columns for a snapshot as arrays aligned with rows"""
+        inputs = dict(zip(INPUT_COLUMNS, _matrix(rows, INPUT_COLUMNS)))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            inv_home = 1.0 / inputs['hprice']
+            inv_away = 1.0 / inputs['aprice']
+            inv_over = 1.0 / inputs['over_price']
+            inv_under = 1.0 / inputs['under_price']
+
+            book_hdp = inv_home + inv_away
+            book_tg = inv_over + inv_under
+
+            out = {
+                # Implied probabilities with the overround removed
+                'imp_home': inv_home / book_hdp,
+                'imp_away': inv_away / book_hdp,
+                'imp_over': inv_over / book_tg,
+                'imp_under': inv_under / book_tg,
+                'overround_hdp': book_hdp - 1.0,
+                'overround_tg': book_tg - 1.0,
+                # Model probability minus market probability
+                'edge_home': _as_probability(inputs['homeperc']) - inv_home / book_hdp,
+                'edge_over': _as_probability(inputs['overperc']) - inv_over / book_tg,
+                # Market price against the model's fair price
+                'value_home': inputs['hprice'] / inputs['modhome'] - 1.0,
+                'value_away': inputs['aprice'] / inputs['modaway'] - 1.0,
+                'value_over': inputs['over_price'] / inputs['modover'] - 1.0,
+                # Movement against the opening lines
+                'hdp1_move_open': inputs['hdp1'] - inputs['startline'],
+                'tg1_move_open': inputs['tg1'] - inputs['start_tgs'],
+            }
+
+        # Movement against the previous snapshot, aligned by match key
+        keys = [match_key_for(row) for row in rows]
+        current = np.vstack([inputs[column] for column in MOVEMENT_COLUMNS])
+
+        if self._previous_values is not None:
+            positions = np.array([self._previous_keys.get(key, -1) for key in keys], dtype=np.int64)
+            known = positions >= 0
+            previous = np.full_like(current, np.nan)
+            previous[:, known] = self._previous_values[:, positions[known]]
+            moves = current - previous
+        else:
+            moves = np.full_like(current, np.nan)
+
+        for i, column in enumerate(MOVEMENT_COLUMNS):
+            out[f'{column}_move_prev'] = moves[i]
+
+        self._previous_keys = {key: i for i, key in enumerate(keys) if key}
+        self._previous_values = current
+        self._save_state(keys)
+        return out
+
+    def enrich(self, rows: List[Dict]) -> List[Dict]:
+        """Write the derived columns into each row in place; returns rows"""
+        if not rows:
+            return rows
+
+        started = time.perf_counter()
+        derived = self.compute(rows)
+
+        # One (rows x columns) matrix, NaN/inf mapped to None, written back row-wise
+        matrix = np.round(np.column_stack([derived[column] for column in OUTPUT_COLUMNS]), self.precision)
+        values = matrix.astype(object)
+        values[~np.isfinite(matrix)] = None
+        for row, row_values in zip(rows, values.tolist()):
+            row.update(zip(OUTPUT_COLUMNS, row_values))
+
+        self.last_duration = time.perf_counter() - started
+        logger.info(f"📐 Analytics computed for {len(rows)} rows in {self.last_duration * 1000:.1f} ms")
+        return rows
+
+
+def benchmark(rows: int = 5000, cycles: int = 5) -> float:
+    """Time enrich() on synthetic rows; returns the mean milliseconds per snapshot"""
+    rng = np.random.default_rng(0)
+    base = [
+        {
+            'timeupdated': '19/10/2026, 18:00:00', 'hometeam': f'Home {i}', 'league': 'Bench',
+            'hdp1': -0.5, 'tg1': 2.5, 'startline': -0.25, 'start_tgs': 2.75,
+            'modhome': 1.9, 'modaway': 2.0, 'homeperc': 52.0, 'modover': 1.95, 'overperc': 51.0,
+        }
+        for i in range(rows)
+    ]
+    analytics = CycleAnalytics()
+    timings = []
+    for _ in range(cycles):
+        prices = rng.uniform(1.6, 2.4, size=(rows, 4)).round(3)
+        for row, (h, a, o, u) in zip(base, prices.tolist()):
+            row.update(hprice=h, aprice=a, over_price=o, under_price=u)
+        analytics.enrich(base)
+        timings.append(analytics.last_duration)
+    return sum(timings) / len(timings) * 1000
+
+
+if __name__ == "__main__":
+    import sys
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    print(f"{size} rows: {benchmark(size):.2f} ms per snapshot")
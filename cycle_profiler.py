@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+InPlay Football Cycle Profiler
+Opt-in, rate-limited profiling of whole cycles: cProfile per stage or a sampling
+profiler over all threads, Chrome performance counters over CDP and a tracemalloc
+top-N of what the cycle allocated, written under PROFILE_DIR by cycle id
+"""
+
+import os
+import sys
+import time
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from scraper_metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+MODES = ('cprofile', 'sample', 'cdp', 'tracemalloc')
+
+# The profile of the cycle running in this context; stage threads inherit it
+_session: contextvars.ContextVar = contextvars.ContextVar('profile_session', default=None)
+
+
+class StackSampler:
+    """Samples the stacks of every thread at a fixed interval into folded-stack counts
+
+    The output (`thread;frame;frame count` per line) loads into flamegraph.pl or speedscope.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.counts: Dict[str, int] = {}
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                folded = ';'.join([names.get(ident, str(ident))] + stack[::-1])
+                self.counts[folded] = self.counts.get(folded, 0) + 1
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def write(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as handle:
+            for stack, count in sorted(self.counts.items(), key=lambda item: -item[1]):
+                handle.write(f"{stack} {count}\n")
+
+
+class ProfileSession:
+    """Everything captured for one profiled cycle"""
+
+    def __init__(self, profiler: 'CycleProfiler', cycle_id: str):
+        self.profiler = profiler
+        self.cycle_id = cycle_id
+        self.prefix = os.path.join(profiler.directory, f"{time.strftime('%Y%m%d-%H%M%S')}_{cycle_id}")
+        self.stage_profiles: List = []
+        self.sampler: Optional[StackSampler] = None
+        self.cdp_before: Optional[Dict[str, float]] = None
+
+    def add_stage_profile(self, profile) -> None:
+        self.stage_profiles.append(profile)
+
+
+class CycleProfiler:
+    """Chooses which cycles to profile and writes their artifacts
+
+    PROFILE is a comma list of modes (cprofile or sample, plus cdp and tracemalloc).
+    A cycle is profiled when PROFILE_EVERY cycles have passed or the previous one
+    took longer than PROFILE_SLOW_SECONDS, but never within PROFILE_MIN_INTERVAL
+    seconds of the last profile; only the newest PROFILE_KEEP cycles are kept.
+    """
+
+    def __init__(self, modes: List[str], directory: str = 'profiles', every: int = 20,
+                 min_interval: float = 600.0, slow_seconds: float = 0.0, keep: int = 20, top: int = 25):
+        unknown = set(modes) - set(MODES)
+        if unknown:
+            raise ValueError(f"Unknown PROFILE modes {sorted(unknown)} (choose from {', '.join(MODES)})")
+        self.modes = set(modes)
+        self.directory = directory
+        self.every = max(1, every)
+        self.min_interval = min_interval
+        self.slow_seconds = slow_seconds
+        self.keep = keep
+        self.top = top
+        self.cycles = 0
+        # Wall time, seeded from the newest artifact so one-process-per-cycle runs are limited too
+        self.last_profiled: Optional[float] = self._newest_artifact()
+        self.last_duration = 0.0
+        self._cycle_started: Optional[float] = None
+
+    @classmethod
+    def from_env(cls) -> Optional['CycleProfiler']:
+        spec = os.getenv('PROFILE', '')
+        modes = [mode.strip() for mode in spec.split(',') if mode.strip()]
+        if not modes:
+            return None
+        return cls(
+            modes,
+            directory=os.getenv('PROFILE_DIR', 'profiles'),
+            every=int(os.getenv('PROFILE_EVERY', '20')),
+            min_interval=float(os.getenv('PROFILE_MIN_INTERVAL', '600')),
+            slow_seconds=float(os.getenv('PROFILE_SLOW_SECONDS', '0')),
+            keep=int(os.getenv('PROFILE_KEEP', '20')),
+            top=int(os.getenv('PROFILE_TOP', '25')),
+        )
+
+    def _newest_artifact(self) -> Optional[float]:
+        try:
+            return max((entry.stat().st_mtime for entry in os.scandir(self.directory)), default=None)
+        except OSError:
+            return None
+
+    def _chosen(self) -> bool:
+        now = time.time()
+        if self.last_profiled is not None and now - self.last_profiled < self.min_interval:
+            return False
+        slow = self.slow_seconds and self.last_duration > self.slow_seconds
+        # The first cycle of a process counts as due, so per-cycle processes can still be sampled
+        return bool(slow) or (self.cycles - 1) % self.every == 0
+
+    def begin(self, cycle_id: str, driver=None) -> Optional[ProfileSession]:
+        """Start profiling this cycle if it is chosen; call finish() with the result when it ends"""
+        self.cycles += 1
+        self._cycle_started = time.monotonic()
+        if not self._chosen():
+            return None
+        self.last_profiled = time.time()
+        os.makedirs(self.directory, exist_ok=True)
+        session = ProfileSession(self, cycle_id)
+        _session.set(session)
+
+        if 'sample' in self.modes:
+            session.sampler = StackSampler(float(os.getenv('PROFILE_SAMPLE_INTERVAL', '0.01')))
+            session.sampler.start()
+        if 'tracemalloc' in self.modes:
+            import tracemalloc
+            tracemalloc.start(int(os.getenv('PROFILE_TRACEMALLOC_FRAMES', '5')))
+        if 'cdp' in self.modes and driver is not None:
+            session.cdp_before = self._cdp_metrics(driver)
+        logger.info(f"🔬 Profiling cycle {cycle_id} ({', '.join(sorted(self.modes))})")
+        return session
+
+    def finish(self, session: Optional[ProfileSession], driver=None) -> None:
+        """Write the artifacts of a profiled cycle; always records the cycle's duration"""
+        if self._cycle_started is not None:
+            self.last_duration = time.monotonic() - self._cycle_started
+        if session is None:
+            return
+        _session.set(None)
+        if session.sampler is not None:
+            session.sampler.stop()
+        written = []
+        try:
+            # First, so tracing stops even if a later artifact cannot be written
+            if 'tracemalloc' in self.modes:
+                written.append(self._write_tracemalloc(session))
+            if session.stage_profiles:
+                written.append(self._write_cprofile(session))
+            if session.sampler is not None:
+                session.sampler.write(session.prefix + '.folded')
+                written.append(session.prefix + '.folded')
+            if 'cdp' in self.modes and driver is not None:
+                written.append(self._write_cdp(session, driver))
+        except Exception as e:
+            logger.warning(f"⚠️ Could not write profile for cycle {session.cycle_id}: {e}")
+        REGISTRY.inc('inplay_profiled_cycles_total', help_text='Cycles captured by the opt-in profiler')
+        logger.info(f"🔬 Profile of cycle {session.cycle_id}: {', '.join(filter(None, written))}")
+        self._prune()
+
+    def _write_cprofile(self, session: ProfileSession) -> str:
+        import io
+        import pstats
+        stats = pstats.Stats(session.stage_profiles[0])
+        for profile in session.stage_profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(session.prefix + '.prof')
+        summary = io.StringIO()
+        pstats.Stats(session.prefix + '.prof', stream=summary).sort_stats('cumulative').print_stats(self.top)
+        with open(session.prefix + '.prof.txt', 'w', encoding='utf-8') as handle:
+            handle.write(summary.getvalue())
+        return session.prefix + '.prof'
+
+    def _write_tracemalloc(self, session: ProfileSession) -> str:
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            return ''
+        # Tracing started with the cycle, so this is what the cycle allocated and still holds
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+        path = session.prefix + '.tracemalloc.txt'
+        with open(path, 'w', encoding='utf-8') as handle:
+            for stat in snapshot.statistics('lineno')[:self.top]:
+                handle.write(f"{stat.size / 1024:10.1f} KiB {stat.count:8d} blocks  {stat.traceback}\n")
+        return path
+
+    @staticmethod
+    def _cdp_metrics(driver) -> Optional[Dict[str, float]]:
+        try:
+            driver.execute_cdp_cmd('Performance.enable', {})
+            metrics = driver.execute_cdp_cmd('Performance.getMetrics', {})
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read Chrome performance metrics: {e}")
+            return None
+        return {metric['name']: metric['value'] for metric in metrics.get('metrics', [])}
+
+    def _write_cdp(self, session: ProfileSession, driver) -> str:
+        import json
+        after = self._cdp_metrics(driver)
+        if after is None:
+            return ''
+        before = session.cdp_before or {}
+        report = {
+            'cycle_id': session.cycle_id,
+            'metrics': after,
+            # Counters such as ScriptDuration, LayoutDuration and TaskDuration accumulate per page
+            'delta': {name: value - before[name] for name, value in after.items() if name in before},
+        }
+        path = session.prefix + '.cdp.json'
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2)
+        return path
+
+    def _prune(self) -> None:
+        """Keep the artifacts of the newest PROFILE_KEEP cycles"""
+        try:
+            names = sorted(os.listdir(self.directory))
+        except OSError:
+            return
+        cycles = sorted({name.split('.')[0] for name in names})
+        for stale in cycles[:-self.keep] if self.keep else []:
+            for name in names:
+                if name.split('.')[0] == stale:
+                    os.remove(os.path.join(self.directory, name))
+
+
+@contextmanager
+def profile_stage():
+    """cProfile the enclosed stage when its cycle is being profiled (a no-op otherwise)"""
+    session = _session.get()
+    if session is None or 'cprofile' not in session.profiler.modes:
+        yield
+        return
+    import cProfile
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        # Python 3.12+ allows one active profiler per process (e.g. a hung earlier stage still holds it)
+        yield
+        return
+    try:
+        yield
+    finally:
+        profile.disable()
+        session.add_stage_profile(profile)
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+InPlay Football Cycle Supervisor
+Runs each stage of a scraping cycle under its own deadline budget. When a browser
+stage overruns, the browser process tree is killed and only the failed stage (plus
+the browser stages it depends on) is restarted; a stage that merely fails is retried
+in place with jittered back-off, keeping the session and data already gathered
+"""
+
+import os
+import time
+import random
+import signal
+import logging
+import threading
+import contextvars
+from typing import Any, Callable, Dict, Optional
+
+from scraper_metrics import REGISTRY
+from logging_setup import stage_context
+from cycle_profiler import profile_stage
+
+logger = logging.getLogger(__name__)
+
+# Seconds each stage may take before it is considered hung
+DEFAULT_BUDGETS = {
+    'setup_driver': 60,
+    'login': 60,
+    'navigate': 60,
+    'click_tab': 45,
+    'scrape': 150,
+    'process': 30,
+    'save': 120,
+    # Multi-target mode (multi_target.py)
+    'target_reload': 30,
+    'target_read': 120,
+    'target_save': 120,
+}
+
+# Stages that drive Chrome, in the order a fresh browser has to replay them
+BROWSER_STAGES = ['setup_driver', 'login', 'navigate', 'click_tab', 'scrape']
+
+
+class StageDeadlineExceeded(Exception):
+    """A stage overran its budget and could not be recovered"""
+
+    def __init__(self, stage: str, budget: float):
+        super().__init__(f"Stage '{stage}' exceeded its {budget:g}s deadline")
+        self.stage = stage
+        self.budget = budget
+
+
+class StageCall:
+    """One run of a stage on its watchdog thread; abandoned once its deadline fires"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.abandoned = False
+
+
+# The stage call running in this context, if any (set on the watchdog thread)
+_current_call: contextvars.ContextVar = contextvars.ContextVar('stage_call', default=None)
+
+
+def stage_abandoned() -> bool:
+    """True inside a stage call whose deadline has already fired (another attempt has replaced it)"""
+    call = _current_call.get()
+    return call is not None and call.abandoned
+
+
+def adopt_driver(owner, driver) -> None:
+    """Install a freshly started driver on owner, unless its setup_driver stage was abandoned
+
+    Chrome that finishes starting after the deadline is quit instead, so it can neither
+    leak nor replace the browser of the restarted stage.
+    """
+    call = _current_call.get()
+    if call is not None:
+        with call.lock:
+            if not call.abandoned:
+                owner.driver = driver
+                return
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        logger.warning("🧹 Closed a browser that started after its setup_driver deadline")
+        raise RuntimeError("Browser started after the setup_driver deadline")
+    owner.driver = driver
+
+
+def parse_budgets(spec: Optional[str]) -> Dict[str, float]:
+    """Parse STAGE_DEADLINES, e.g. 'login=30,scrape=90', over the defaults"""
+    budgets = {stage: float(seconds) for stage, seconds in DEFAULT_BUDGETS.items()}
+    for part in (spec or '').split(','):
+        if not part.strip():
+            continue
+        stage, _, seconds = part.partition('=')
+        try:
+            budgets[stage.strip()] = float(seconds)
+        except ValueError:
+            logger.warning(f"⚠️ Ignoring invalid stage deadline '{part}'")
+    return budgets
+
+
+def jittered_backoff(attempt: int, base: float, cap: float) -> float:
+    """Exponential delay for the nth attempt (1-based), randomised over its upper half"""
+    delay = min(cap, base * 2 ** max(0, attempt - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def stage_failed(result: Any) -> bool:
+    """Stages report soft failure as False, or an empty list when nothing was scraped"""
+    return result is False or (isinstance(result, list) and not result)
+
+
+class FailureBackoff:
+    """Delay between failed cycles: short at first, growing while failures repeat"""
+
+    def __init__(self, base: Optional[float] = None, cap: Optional[float] = None):
+        self.base = float(os.getenv('FAILURE_RETRY_DELAY', '2')) if base is None else base
+        self.cap = float(os.getenv('FAILURE_RETRY_MAX_DELAY', '30')) if cap is None else cap
+        self.failures = 0
+
+    def failed(self) -> float:
+        self.failures += 1
+        return jittered_backoff(self.failures, self.base, self.cap)
+
+    def succeeded(self) -> None:
+        self.failures = 0
+
+
+def kill_process_tree(pid: int) -> int:
+    """Kill a process and all of its descendants; returns how many were signalled"""
+    import psutil  # only needed on the (rare) kill path
+
+    try:
+        root = psutil.Process(pid)
+    except psutil.NoSuchProcess:
+        return 0
+
+    processes = root.children(recursive=True) + [root]
+    for process in processes:
+        try:
+            process.send_signal(signal.SIGKILL)
+        except psutil.NoSuchProcess:
+            pass
+    psutil.wait_procs(processes, timeout=5)
+    return len(processes)
+
+
+def browser_pid(driver) -> Optional[int]:
+    """PID of the chromedriver process that owns the browser, if there is one"""
+    try:
+        return driver.service.process.pid
+    except AttributeError:
+        return None
+
+
+class CycleSupervisor:
+    """Applies per-stage deadlines to an InPlayFootballScraper cycle"""
+
+    def __init__(self, scraper, budgets: Optional[Dict[str, float]] = None, max_restarts: int = 1,
+                 retries: Optional[int] = None, retry_delay: Optional[float] = None,
+                 retry_max_delay: Optional[float] = None, adaptive=None):
+        self.scraper = scraper
+        self.budgets = budgets or parse_budgets(os.getenv('STAGE_DEADLINES'))
+        # Optional AdaptiveTimeouts: browser stage budgets shrink to a multiple of
+        # observed stage time, never above the configured budget
+        self.adaptive = adaptive
+        self.max_restarts = max_restarts
+        # Soft failures (False/empty result or an exception) are retried in place
+        self.retries = int(os.getenv('STAGE_RETRIES', '2')) if retries is None else retries
+        self.retry_delay = float(os.getenv('STAGE_RETRY_DELAY', '1')) if retry_delay is None else retry_delay
+        self.retry_max_delay = (float(os.getenv('STAGE_RETRY_MAX_DELAY', '8'))
+                                if retry_max_delay is None else retry_max_delay)
+        self.browser_steps: Dict[str, Callable[[], Any]] = {
+            'setup_driver': scraper.setup_driver,
+            'login': scraper.login,
+            'navigate': scraper.navigate_to_fulltime_page,
+            'click_tab': scraper.click_fulltime_raw_tab,
+        }
+
+    def budget(self, stage: str) -> float:
+        configured = self.budgets.get(stage, max(DEFAULT_BUDGETS.values()))
+        # Only browser stages adapt; save has its own timeouts and retries (supabase_client.py)
+        if not self.adaptive or stage not in BROWSER_STAGES:
+            return configured
+        return self.adaptive.timeout(f'stage_{stage}', configured)
+
+    def _call_with_deadline(self, stage: str, fn: Callable, args: tuple) -> Any:
+        """Run fn on a watchdog thread; raise StageDeadlineExceeded if it overruns"""
+        budget = self.budget(stage)
+        outcome: Dict[str, Any] = {}
+        call = StageCall()
+
+        def target():
+            _current_call.set(call)
+            try:
+                with stage_context(stage), profile_stage():
+                    outcome['result'] = fn(*args)
+            except BaseException as e:
+                outcome['error'] = e
+
+        # Run in a copy of the caller's context so records keep the cycle id
+        context = contextvars.copy_context()
+        started = time.monotonic()
+        worker = threading.Thread(target=context.run, args=(target,), name=f'stage-{stage}', daemon=True)
+        worker.start()
+        worker.join(budget)
+        duration = time.monotonic() - started
+
+        REGISTRY.observe('inplay_stage_duration_seconds', duration, {'stage': stage},
+                         help_text='Wall time of each cycle stage')
+
+        if self.adaptive and stage in BROWSER_STAGES:
+            # A fired deadline counts as the full budget so the next one is wider
+            self.adaptive.observe(f'stage_{stage}', budget if worker.is_alive() else duration)
+
+        with call.lock:
+            # Decided under the lock, so a late driver is either adopted before this or quit
+            call.abandoned = worker.is_alive()
+        if call.abandoned:
+            REGISTRY.inc('inplay_stage_deadline_exceeded_total', {'stage': stage},
+                         help_text='Stages that overran their deadline budget')
+            logger.error(f"⏰ Stage '{stage}' exceeded its {budget:g}s deadline")
+            raise StageDeadlineExceeded(stage, budget)
+
+        logger.info(f"⏱️ Stage '{stage}' finished in {duration:.2f}s", extra={'stage_seconds': round(duration, 3)})
+
+        if 'error' in outcome:
+            raise outcome['error']
+        return outcome.get('result')
+
+    def kill_browser(self) -> None:
+        """Kill the whole browser tree; the hung Selenium call then fails fast"""
+        driver = self.scraper.driver
+        self.scraper.driver = None
+        pid = browser_pid(driver) if driver else None
+        if pid is None:
+            return
+        try:
+            killed = kill_process_tree(pid)
+            REGISTRY.inc('inplay_browser_kills_total', help_text='Browser process trees killed by the supervisor')
+            logger.warning(f"🔪 Killed browser process tree ({killed} processes)")
+        except Exception as e:
+            logger.error(f"❌ Could not kill browser process tree: {e}")
+
+    def _rebuild_browser_for(self, stage: str) -> bool:
+        """Replay the browser stages that precede a restarted stage on a fresh Chrome
+
+        A ready hot spare is already logged in and on the raw tab, so it replaces all of
+        them; returns True when it did, and every stage up to click_tab is then done.
+        """
+        take_hot_spare = getattr(self.scraper, 'take_hot_spare', None)
+        if take_hot_spare and take_hot_spare():
+            return True
+        for step in BROWSER_STAGES[:BROWSER_STAGES.index(stage)]:
+            result = self._call_with_deadline(step, self.browser_steps[step], ())
+            if result is False:
+                raise RuntimeError(f"Stage '{step}' failed while rebuilding the browser for '{stage}'")
+        return False
+
+    def run_stage(self, stage: str, fn: Callable, *args) -> Any:
+        """Run one stage under its deadline, restarting it after a hang and retrying it after a failure
+
+        Returns the stage's last result (which may still be a soft failure) or
+        raises its last exception once the retries are used up.
+        """
+        restarts = 0
+        retries = 0
+        first_failure: Optional[float] = None
+        while True:
+            try:
+                if restarts and stage in BROWSER_STAGES and self._rebuild_browser_for(stage) \
+                        and stage != 'scrape':
+                    # Rerunning setup or login on the spare would leak its Chrome or fail
+                    # on a session that is already logged in and parked on the raw tab
+                    logger.info(f"⚡ Hot spare is past '{stage}' - stage done")
+                    return True
+                result = self._call_with_deadline(stage, fn, args)
+                error = None
+            except StageDeadlineExceeded as exceeded:
+                if exceeded.stage not in BROWSER_STAGES:
+                    # Nothing releases a hung process or save call, and running it again
+                    # would overlap the first one (a second publish to every sink)
+                    raise
+                # Killing Chrome makes the hung Selenium call fail fast
+                self.kill_browser()
+                if restarts >= self.max_restarts:
+                    raise
+                restarts += 1
+                REGISTRY.inc('inplay_stage_restarts_total', {'stage': stage},
+                             help_text='Stages restarted after a deadline was exceeded')
+                logger.info(f"🔄 Restarting stage '{stage}' (restart {restarts}/{self.max_restarts})")
+                continue
+            except Exception as e:
+                result, error = None, e
+
+            if error is None and not stage_failed(result):
+                if first_failure is not None:
+                    recovery = time.monotonic() - first_failure
+                    REGISTRY.observe('inplay_stage_recovery_seconds', recovery, {'stage': stage},
+                                     help_text='Time from a stage failing to it succeeding on retry')
+                    logger.info(f"✅ Stage '{stage}' recovered after {retries} retries in {recovery:.1f}s")
+                return result
+
+            # A browser stage cannot be retried in place once its browser is gone
+            browser_gone = stage in BROWSER_STAGES[1:] and not self.scraper.driver
+            if retries >= self.retries or browser_gone:
+                if error is not None:
+                    raise error
+                return result
+
+            first_failure = first_failure or time.monotonic()
+            retries += 1
+            delay = jittered_backoff(retries, self.retry_delay, self.retry_max_delay)
+            REGISTRY.inc('inplay_stage_retries_total', {'stage': stage},
+                         help_text='Stages retried in place after a failure')
+            reason = f"error: {error}" if error is not None else "no result"
+            logger.warning(f"🔁 Stage '{stage}' failed ({reason}) - retry {retries}/{self.retries} in {delay:.1f}s",
+                           extra={'attempt': retries})
+            time.sleep(delay)
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+InPlay Football Fake Supabase
+Stand-in for the supabase client covering the calls the scraper makes
+(table().select/insert/update/delete with eq/in_ filters and the archive RPC),
+backed by memory or SQLite
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from match_identity import split_timeupdated
+
+
+class FakeResponse:
+    """Mirrors the `.data` attribute of a postgrest response"""
+
+    def __init__(self, data: List[Dict]):
+        self.data = data
+
+
+class MemoryTable:
+    """Rows kept in a dict keyed by id"""
+
+    def __init__(self):
+        self.rows: Dict[int, Dict] = {}
+        self._next_id = 1
+
+    def scan(self, id_filter: Optional[set] = None) -> Iterator[Tuple[int, Dict]]:
+        if id_filter is not None:
+            for row_id in id_filter:
+                if row_id in self.rows:
+                    yield row_id, self.rows[row_id]
+            return
+        yield from list(self.rows.items())
+
+    def insert(self, row: Dict) -> Dict:
+        row = dict(row, id=self._next_id)
+        self.rows[self._next_id] = row
+        self._next_id += 1
+        return row
+
+    def update(self, row_id: int, row: Dict) -> None:
+        self.rows[row_id] = row
+
+    def delete(self, row_ids: List[int]) -> None:
+        for row_id in row_ids:
+            self.rows.pop(row_id, None)
+
+    def commit(self) -> None:
+        pass
+
+
+class SqliteTable:
+    """Rows stored as JSON in a SQLite table so a replay leaves an inspectable mirror"""
+
+    def __init__(self, conn: sqlite3.Connection, name: str):
+        self.conn = conn
+        self.name = name
+        conn.execute(f'CREATE TABLE IF NOT EXISTS "{name}" (id INTEGER PRIMARY KEY AUTOINCREMENT, data TEXT NOT NULL)')
+
+    def scan(self, id_filter: Optional[set] = None) -> Iterator[Tuple[int, Dict]]:
+        if id_filter is not None:
+            ids = list(id_filter)
+            if not ids:
+                return
+            placeholders = ','.join('?' * len(ids))
+            cursor = self.conn.execute(f'SELECT id, data FROM "{self.name}" WHERE id IN ({placeholders})', ids)
+        else:
+            cursor = self.conn.execute(f'SELECT id, data FROM "{self.name}"')
+        for row_id, data in cursor.fetchall():
+            yield row_id, dict(json.loads(data), id=row_id)
+
+    def insert(self, row: Dict) -> Dict:
+        row = {k: v for k, v in row.items() if k != 'id'}
+        cursor = self.conn.execute(f'INSERT INTO "{self.name}" (data) VALUES (?)',
+                                   (json.dumps(row, default=str),))
+        return dict(row, id=cursor.lastrowid)
+
+    def update(self, row_id: int, row: Dict) -> None:
+        data = json.dumps({k: v for k, v in row.items() if k != 'id'}, default=str)
+        self.conn.execute(f'UPDATE "{self.name}" SET data = ? WHERE id = ?', (data, row_id))
+
+    def delete(self, row_ids: List[int]) -> None:
+        self.conn.executemany(f'DELETE FROM "{self.name}" WHERE id = ?', [(row_id,) for row_id in row_ids])
+
+    def commit(self) -> None:
+        self.conn.commit()
+
+
+class FakeQuery:
+    """Chainable query builder; filters are applied when execute() is called"""
+
+    def __init__(self, client: 'FakeSupabaseClient', table_name: str):
+        self.client = client
+        self.table_name = table_name
+        self.operation = 'select'
+        self.columns: Optional[List[str]] = None
+        self.payload: Any = None
+        self.filters: List[Tuple[str, str, Any]] = []
+        self.row_limit: Optional[int] = None
+
+    def select(self, columns: str = '*') -> 'FakeQuery':
+        self.operation = 'select'
+        self.columns = None if columns.strip() == '*' else [c.strip() for c in columns.split(',')]
+        return self
+
+    def insert(self, payload) -> 'FakeQuery':
+        self.operation, self.payload = 'insert', payload
+        return self
+
+    def upsert(self, payload, on_conflict: str = '', **kwargs) -> 'FakeQuery':
+        # Only conflicts on id are modelled, which is all the scraper uses
+        self.operation, self.payload = 'upsert', payload
+        return self
+
+    def update(self, payload: Dict) -> 'FakeQuery':
+        self.operation, self.payload = 'update', payload
+        return self
+
+    def delete(self) -> 'FakeQuery':
+        self.operation = 'delete'
+        return self
+
+    def eq(self, column: str, value) -> 'FakeQuery':
+        self.filters.append(('eq', column, value))
+        return self
+
+    def in_(self, column: str, values) -> 'FakeQuery':
+        self.filters.append(('in', column, list(values)))
+        return self
+
+    def limit(self, count: int) -> 'FakeQuery':
+        self.row_limit = count
+        return self
+
+    def _id_filter(self) -> Optional[set]:
+        ids = None
+        for op, column, value in self.filters:
+            if column != 'id':
+                continue
+            wanted = {value} if op == 'eq' else set(value)
+            ids = wanted if ids is None else ids & wanted
+        return ids
+
+    def _matches(self, row: Dict) -> bool:
+        for op, column, value in self.filters:
+            if op == 'eq' and row.get(column) != value:
+                return False
+            if op == 'in' and row.get(column) not in value:
+                return False
+        return True
+
+    def execute(self) -> FakeResponse:
+        with self.client.lock:
+            self.client.calls[self.operation] = self.client.calls.get(self.operation, 0) + 1
+            if self.client.outage is not None:
+                raise self.client.outage
+            table = self.client.storage(self.table_name)
+
+            if self.operation == 'insert':
+                rows = self.payload if isinstance(self.payload, list) else [self.payload]
+                data = [table.insert(row) for row in rows]
+                table.commit()
+                return FakeResponse(data)
+
+            if self.operation == 'upsert':
+                rows = self.payload if isinstance(self.payload, list) else [self.payload]
+                existing = dict(table.scan({row['id'] for row in rows if 'id' in row}))
+                data = []
+                for row in rows:
+                    if row.get('id') in existing:
+                        merged = dict(existing[row['id']], **row)
+                        table.update(merged['id'], merged)
+                        data.append(merged)
+                    else:
+                        data.append(table.insert(row))
+                table.commit()
+                return FakeResponse(data)
+
+            matched = [row for _, row in table.scan(self._id_filter()) if self._matches(row)]
+
+            if self.operation == 'select':
+                if self.row_limit is not None:
+                    matched = matched[:self.row_limit]
+                if self.columns:
+                    matched = [{c: row.get(c) for c in self.columns} for row in matched]
+                return FakeResponse(matched)
+
+            if self.operation == 'update':
+                data = []
+                for row in matched:
+                    row = dict(row, **self.payload)
+                    table.update(row['id'], row)
+                    data.append(row)
+                table.commit()
+                return FakeResponse(data)
+
+            table.delete([row['id'] for row in matched])
+            table.commit()
+            return FakeResponse(matched)
+
+
+class FakeRpc:
+    """Postgres functions from sql/ that the scraper calls, applied to the fake tables"""
+
+    def __init__(self, client: 'FakeSupabaseClient', function: str, params: Dict):
+        self.client = client
+        self.function = function
+        self.params = params
+
+    def execute(self) -> FakeResponse:
+        with self.client.lock:
+            self.client.calls['rpc'] = self.client.calls.get('rpc', 0) + 1
+            if self.client.outage is not None:
+                raise self.client.outage
+            if self.function != 'archive_finished_matches':
+                raise NotImplementedError(f"Fake Supabase has no function {self.function}")
+            return FakeResponse(self._archive_finished_matches(set(self.params['p_live_hometeams'])))
+
+    def _archive_finished_matches(self, live: set) -> int:
+        live_table = self.client.storage('inplay_football')
+        archive = self.client.storage('inplay_football_archive')
+        finished = [row for _, row in live_table.scan() if row.get('hometeam') not in live]
+        archived_at = datetime.now(timezone.utc).isoformat()
+        for row in finished:
+            date_part = split_timeupdated(row['timeupdated'])[0] if row.get('timeupdated') else ''
+            try:
+                match_date = datetime.strptime(date_part, '%d/%m/%Y').date().isoformat()
+            except ValueError:
+                match_date = archived_at[:10]
+            # The fake numbers archive rows itself; the live id is kept as live_id
+            archive.insert(dict(row, live_id=row['id'], match_date=match_date, archived_at=archived_at))
+        live_table.delete([row['id'] for row in finished])
+        live_table.commit()
+        archive.commit()
+        return len(finished)
+
+
+class FakeSupabaseClient:
+    """In-memory by default; pass a SQLite path to persist the tables"""
+
+    def __init__(self, sqlite_path: Optional[str] = None):
+        self.sqlite_path = sqlite_path
+        self.conn = None
+        if sqlite_path:
+            self.conn = sqlite3.connect(sqlite_path, check_same_thread=False)
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.tables: Dict[str, Any] = {}
+        self.calls: Dict[str, int] = {}
+        # Set to an exception to simulate an outage: every execute() raises it
+        self.outage: Optional[Exception] = None
+        self.lock = threading.Lock()
+
+    def storage(self, name: str):
+        if name not in self.tables:
+            self.tables[name] = SqliteTable(self.conn, name) if self.conn else MemoryTable()
+        return self.tables[name]
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def rpc(self, function: str, params: Optional[Dict] = None) -> FakeRpc:
+        return FakeRpc(self, function, params or {})
+
+    def close(self) -> None:
+        if self.conn:
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+InPlay Football Fake WebDriver
+Serves a captured #fulltimemodelraw page through the subset of the Selenium
+WebDriver API that scrape_table_data uses, counting every driver round trip
+"""
+
+from typing import Dict, List, Optional
+
+from table_parser import TABLE_ID, parse_table_rows
+
+ROWS_SELECTOR = f'#{TABLE_ID} tbody tr'
+
+
+class FakeElement:
+    """A table, tbody, row or cell; every lookup goes back through the driver like a remote call"""
+
+    def __init__(self, driver: 'FakeWebDriver', tag: str, text: str = '', row_index: Optional[int] = None):
+        self.driver = driver
+        self.tag_name = tag
+        self._text = text
+        self.row_index = row_index
+
+    @property
+    def text(self) -> str:
+        self.driver._count('element_text')
+        return self._text.strip()
+
+    def find_element(self, by: str, value: str) -> 'FakeElement':
+        elements = self.find_elements(by, value)
+        if not elements:
+            from selenium.common.exceptions import NoSuchElementException
+            raise NoSuchElementException(f'{by}={value}')
+        return elements[0]
+
+    def find_elements(self, by: str, value: str) -> List['FakeElement']:
+        self.driver._count('element_find')
+        if value == 'tbody' and self.tag_name == 'table':
+            return [FakeElement(self.driver, 'tbody')]
+        if value == 'tr' and self.tag_name in ('table', 'tbody'):
+            return self.driver._row_elements()
+        if value == 'td' and self.row_index is not None:
+            self.driver.elements_returned += len(self.driver.rows[self.row_index])
+            return [FakeElement(self.driver, 'td', cell) for cell in self.driver.rows[self.row_index]]
+        return []
+
+
+class FakeSwitchTo:
+    """driver.switch_to for browser tabs: each tab keeps its own URL and page"""
+
+    def __init__(self, driver: 'FakeWebDriver'):
+        self.driver = driver
+
+    def window(self, handle: str) -> None:
+        driver = self.driver
+        driver._count('switch')
+        driver.windows[driver.current_window_handle] = (driver.current_url, driver.page_source)
+        driver.current_window_handle = handle
+        url, page_html = driver.windows[handle]
+        driver.load_html(page_html, url)
+
+    def new_window(self, kind: str = 'tab') -> None:
+        handle = f'tab-{len(self.driver.windows)}'
+        self.driver.windows[handle] = ('about:blank', '')
+        self.window(handle)
+
+
+class FakeWebDriver:
+    """Stand-in driver over static HTML; `calls` counts round trips by kind
+
+    `pages` maps URLs to HTML served by get() and location.reload(), so a test
+    can change what the next reload returns.
+    """
+
+    def __init__(self, page_html: str = '', pages: Optional[Dict[str, str]] = None):
+        self.current_url = 'about:blank'
+        self.calls: Dict[str, int] = {}
+        # Element references sent back over the wire; grows with rows x lookups
+        self.elements_returned = 0
+        self.rows: List[List[str]] = []
+        self.pages = pages if pages is not None else {}
+        self.load_html(page_html)
+        self.current_window_handle = 'tab-0'
+        self.windows = {'tab-0': (self.current_url, self.page_source)}
+        self.switch_to = FakeSwitchTo(self)
+
+    @property
+    def window_handles(self) -> List[str]:
+        return list(self.windows)
+
+    def load_html(self, page_html: str, url: str = 'fake://fulltimemodelraw') -> None:
+        self.page_source = page_html
+        self.rows = parse_table_rows(page_html) if page_html else []
+        self.current_url = url
+
+    @property
+    def round_trips(self) -> int:
+        return sum(self.calls.values())
+
+    def _count(self, kind: str) -> None:
+        self.calls[kind] = self.calls.get(kind, 0) + 1
+
+    def _row_elements(self) -> List[FakeElement]:
+        self.elements_returned += len(self.rows)
+        return [FakeElement(self, 'tr', row_index=i) for i in range(len(self.rows))]
+
+    def find_element(self, by: str, value: str) -> FakeElement:
+        elements = self.find_elements(by, value)
+        if not elements:
+            from selenium.common.exceptions import NoSuchElementException
+            raise NoSuchElementException(f'{by}={value}')
+        return elements[0]
+
+    def find_elements(self, by: str, value: str) -> List[FakeElement]:
+        self._count('find')
+        if value == TABLE_ID and self.page_source:
+            return [FakeElement(self, 'table')]
+        if value == ROWS_SELECTOR:
+            return self._row_elements()
+        if value.startswith('#') and f'id="{value[1:]}"' in self.page_source:
+            return [FakeElement(self, 'label')]
+        return []
+
+    def execute_script(self, script: str, *args):
+        self._count('script')
+        if 'location.reload' in script and self.current_url in self.pages:
+            self.load_html(self.pages[self.current_url], self.current_url)
+        elif 'querySelectorAll' in script:
+            return len(parse_table_rows(self.page_source, args[0].split()[0].lstrip('#')))
+        elif 'outerHTML' in script:
+            return self.page_source if f'id="{args[0]}"' in self.page_source else None
+        return None
+
+    def get(self, url: str) -> None:
+        self._count('get')
+        if url in self.pages:
+            self.load_html(self.pages[url], url)
+        self.current_url = url
+
+    def implicitly_wait(self, seconds: float) -> None:
+        pass
+
+    def set_page_load_timeout(self, seconds: float) -> None:
+        pass
+
+    def quit(self) -> None:
+        pass
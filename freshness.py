@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+InPlay Football Freshness
+Measures how old the odds are at each step: site timeupdated -> read in the
+browser -> committed by the sinks, per league, against a p95 lag SLO
+"""
+
+import os
+import time
+import logging
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, Optional, Tuple
+
+from scraper_metrics import REGISTRY
+from match_identity import timeupdated_timestamp
+
+logger = logging.getLogger(__name__)
+
+# Seconds; from a few seconds (every cycle) up to rows the site stopped updating
+LAG_BUCKETS = [5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 300, 600, 1800, 3600]
+
+
+def site_timezone():
+    """Timezone of the site's timeupdated strings (SITE_TIMEZONE, default Europe/London)"""
+    name = os.getenv('SITE_TIMEZONE', 'Europe/London')
+    try:
+        from zoneinfo import ZoneInfo
+        return ZoneInfo(name)
+    except Exception as e:
+        logger.warning(f"⚠️ Unknown SITE_TIMEZONE {name!r} ({e}) - treating timeupdated as UTC")
+        return timezone.utc
+
+
+def parse_timeupdated(text: Optional[str], tz=timezone.utc) -> Optional[float]:
+    """'19/10/2026, 15:45:37' in the site's timezone -> Unix time, or None if unparseable"""
+    if not text:
+        return None
+    # Cached per string: a row the site has not updated keeps its timeupdated for many cycles
+    return timeupdated_timestamp(text, tz)
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class FreshnessTracker:
+    """Collects capture times as rows are read and records the lags once the snapshot commits
+
+    Stages of inplay_freshness_lag_seconds{stage, league}:
+    capture (timeupdated -> read), commit (timeupdated -> committed) and
+    pipeline (read -> committed, the part the scraper controls).
+    """
+
+    def __init__(self, slo_seconds: Optional[float] = None, window_seconds: Optional[float] = None,
+                 write_column: Optional[bool] = None):
+        self.slo_seconds = float(os.getenv('FRESHNESS_SLO_SECONDS', '120')) if slo_seconds is None else slo_seconds
+        self.window_seconds = (float(os.getenv('FRESHNESS_WINDOW', '300'))
+                               if window_seconds is None else window_seconds)
+        # WRITE_CAPTURED_AT=1 also stores captured_at on every row (sql/inplay_football_freshness.sql)
+        self.write_column = os.getenv('WRITE_CAPTURED_AT') == '1' if write_column is None else write_column
+        self.tz = site_timezone()
+        # (league, site time, capture time) of the rows read this cycle, until they commit
+        self.pending: List[Tuple[str, Optional[float], float]] = []
+        # (commit time, commit lag) over the SLO window
+        self.recent: Deque[Tuple[float, float]] = deque()
+        self.breached = False
+
+    def start_cycle(self) -> None:
+        """Forget rows of a cycle that never committed"""
+        self.pending = []
+
+    def discard_pending(self) -> None:
+        """Forget rows read by a scrape attempt that is starting over, so they are not counted twice"""
+        self.pending = []
+
+    def captured(self, row: Dict, captured_at: Optional[float] = None) -> None:
+        """Note the moment a raw row was read; stamps captured_at on it when that column is written"""
+        captured_at = time.time() if captured_at is None else captured_at
+        league = row.get('league') or 'unknown'
+        site_time = parse_timeupdated(row.get('timeupdated'), self.tz)
+        self.pending.append((league, site_time, captured_at))
+        if self.write_column:
+            row['captured_at'] = datetime.fromtimestamp(captured_at, timezone.utc).isoformat()
+        if site_time is not None:
+            self._observe('capture', league, captured_at - site_time)
+
+    def _observe(self, stage: str, league: str, lag: float) -> None:
+        # A site clock slightly ahead of ours must not produce negative ages
+        REGISTRY.observe('inplay_freshness_lag_seconds', max(0.0, lag), {'stage': stage, 'league': league},
+                         buckets=LAG_BUCKETS, help_text='Age of the odds at each pipeline stage')
+
+    def committed(self, committed_at: Optional[float] = None) -> Optional[float]:
+        """Record the lags of every row read this cycle; returns the windowed p95 commit lag"""
+        committed_at = time.time() if committed_at is None else committed_at
+        for league, site_time, captured_at in self.pending:
+            self._observe('pipeline', league, committed_at - captured_at)
+            if site_time is not None:
+                lag = max(0.0, committed_at - site_time)
+                self._observe('commit', league, lag)
+                self.recent.append((committed_at, lag))
+        self.pending = []
+        while self.recent and self.recent[0][0] < committed_at - self.window_seconds:
+            self.recent.popleft()
+        return self.evaluate()
+
+    def evaluate(self) -> Optional[float]:
+        """Update the p95 gauge and the breach signal; logs once on entering and leaving breach"""
+        p95 = percentile([lag for _, lag in self.recent], 0.95)
+        if p95 is None:
+            return None
+        REGISTRY.set('inplay_freshness_p95_seconds', p95,
+                     help_text='p95 age of committed odds over the SLO window')
+        REGISTRY.set('inplay_freshness_slo_seconds', self.slo_seconds, help_text='Freshness SLO threshold')
+        breached = p95 > self.slo_seconds
+        if breached and not self.breached:
+            REGISTRY.inc('inplay_freshness_slo_breaches_total',
+                         help_text='Times the p95 commit lag crossed the freshness SLO')
+            logger.warning(f"🐢 Freshness SLO breached: p95 lag {p95:.0f}s > {self.slo_seconds:g}s")
+        elif self.breached and not breached:
+            logger.info(f"✅ Freshness back within SLO: p95 lag {p95:.0f}s")
+        self.breached = breached
+        REGISTRY.set('inplay_freshness_slo_breach', 1 if breached else 0,
+                     help_text='1 while the p95 commit lag is above the freshness SLO')
+        return p95
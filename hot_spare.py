@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+InPlay Football Hot Spare
+Keeps a second logged-in Chrome parked on the Full-Time Model Raw tab, refreshed
+in the background, so a failed primary browser is replaced in under a second.
+Its steps run under the stage deadlines and its Chrome under the RSS recycling policy
+"""
+
+import os
+import copy
+import time
+import logging
+import threading
+from typing import Optional
+
+from scraper_metrics import REGISTRY
+from cycle_supervisor import BROWSER_STAGES, CycleSupervisor, browser_pid
+from resource_monitor import MB, ResourceMonitor, process_tree_rss
+
+logger = logging.getLogger(__name__)
+
+
+class HotSpare:
+    """A standby browser session built and refreshed on a background thread"""
+
+    def __init__(self, scraper, refresh_interval: Optional[float] = None):
+        # A shallow copy shares the configuration and adaptive timeouts but drives its own browser
+        self.session = copy.copy(scraper)
+        self.session.driver = None
+        self.refresh_interval = (float(os.getenv('HOT_SPARE_REFRESH', '120'))
+                                 if refresh_interval is None else refresh_interval)
+        self.parked_at = 0.0
+        self._ready = False
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._failures = 0
+        # Same STAGE_DEADLINES as the primary, without restarts: a hung step kills the
+        # spare's Chrome and the next attempt starts from a fresh one
+        self.supervisor = CycleSupervisor(self.session, max_restarts=0, retries=0)
+        # Same BROWSER_MAX_CYCLES / BROWSER_RSS_CEILING_MB policy, counted in refreshes
+        self.monitor = ResourceMonitor()
+        self.refreshes = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='hot-spare', daemon=True)
+            self._thread.start()
+
+    def _park(self) -> bool:
+        """Login (on a fresh browser only), then open the raw tab; False if any step fails"""
+        session = self.session
+        if session.driver_alive():
+            self._check_memory()
+        steps = ['navigate', 'click_tab']
+        if not session.driver_alive():
+            session.close_driver()
+            self.refreshes = 0
+            steps = ['setup_driver', 'login'] + steps
+        for step in steps:
+            result = self.supervisor.run_stage(step, self.supervisor.browser_steps[step])
+            if step != BROWSER_STAGES[0] and not result:
+                return False
+        self.refreshes += 1
+        return True
+
+    def _check_memory(self) -> None:
+        """Drop a spare browser that has been refreshed too often or grown past the RSS ceiling"""
+        pid = browser_pid(self.session.driver)
+        browser_mb = process_tree_rss(pid) / MB if pid else 0.0
+        REGISTRY.set('inplay_hot_spare_rss_mb', browser_mb, help_text='Resident memory of the hot-spare browser')
+        reason = self.monitor.recycle_reason(self.refreshes, browser_mb)
+        if reason:
+            self.session.close_driver()
+            self.monitor.recycled(f"hot spare: {reason}")
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            with self._lock:
+                due = self.session.driver is None or time.monotonic() - self.parked_at >= self.refresh_interval
+                if due:
+                    # From here until it is parked again the driver belongs to this thread
+                    self._ready = False
+            if due:
+                started = time.monotonic()
+                try:
+                    parked = self._park()
+                except Exception as e:
+                    logger.warning(f"⚠️ Hot spare could not be prepared: {e}")
+                    parked = False
+                if self._stopped.is_set():
+                    break
+                if parked:
+                    self.parked_at = time.monotonic()
+                    self._failures = 0
+                    with self._lock:
+                        self._ready = True
+                    logger.info(f"🅿️ Hot spare parked on the raw tab in {time.monotonic() - started:.1f}s")
+                else:
+                    # Expired session or broken browser: start again from a fresh Chrome
+                    self.session.close_driver()
+                    self._failures += 1
+            wait = self.refresh_interval - (time.monotonic() - self.parked_at) if self._ready else \
+                min(60.0, 2.0 ** self._failures)
+            self._wake.wait(max(0.0, wait))
+            self._wake.clear()
+        self.session.close_driver()
+
+    def take(self):
+        """Hand over the parked driver and start building the next spare; None if none is ready"""
+        with self._lock:
+            if not self._ready:
+                return None
+            driver, self.session.driver = self.session.driver, None
+            self._ready = False
+        self._wake.set()
+        if driver is not None:
+            REGISTRY.inc('inplay_hot_spare_failovers_total', help_text='Primary browsers replaced by the hot spare')
+        return driver
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=30)
+            self._thread = None
+        self.session.close_driver()
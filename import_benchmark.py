@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+InPlay Football Import Benchmark
+Measures cold import time of the entry-point modules with `python -X importtime`
+and fails if any module misses its target or drags in a heavy dependency
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+from typing import Dict, List, Tuple
+
+# Cumulative import time budget per module, in milliseconds
+TARGETS_MS = {
+    'inplay_football_scraper': 150,
+    'match_history': 100,
+    'snapshot_diff': 100,
+    'table_parser': 100,
+    'scraper_worker': 100,
+    'soak_test': 200,
+}
+
+# Modules that must only be imported when a backend actually needs them
+HEAVY_MODULES = ['selenium', 'webdriver_manager', 'supabase', 'requests', 'numpy', 'psutil']
+
+# Tools whose whole job needs one of them (the soak test samples RSS through psutil)
+ALLOWED_HEAVY = {
+    'soak_test': ['psutil'],
+}
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def measure(module: str, python: str = sys.executable) -> Tuple[float, List[str]]:
+    """Import a module in a fresh interpreter; returns (cumulative ms, heavy modules loaded)"""
+    probe = (f"import sys, {module}; "
+             f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    result = subprocess.run(
+        [python, '-X', 'importtime', '-c', probe],
+        cwd=REPO_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    cumulative_us = 0
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) == 3 and parts[2].strip() == module:
+            cumulative_us = int(parts[1])
+    loaded = [name for name in result.stdout.strip().split(',') if name]
+    return cumulative_us / 1000, loaded
+
+
+def run(modules: Dict[str, float], repeat: int) -> bool:
+    ok = True
+    print(f"{'module':<26}{'best ms':>10}{'target':>9}  heavy imports")
+    for module, target in modules.items():
+        timings = []
+        loaded: List[str] = []
+        for _ in range(repeat):
+            elapsed, loaded = measure(module)
+            timings.append(elapsed)
+        best = min(timings)
+        unexpected = [name for name in loaded if name not in ALLOWED_HEAVY.get(module, [])]
+        passed = best <= target and not unexpected
+        ok = ok and passed
+        status = '✅' if passed else '❌'
+        print(f"{module:<26}{best:>10.1f}{target:>9.0f}  {', '.join(loaded) or '-'} {status}")
+    return ok
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Check cold import time of the entry-point modules')
+    parser.add_argument('modules', nargs='*', help='Modules to check (default: all with a target)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per module; the best is kept')
+    parser.add_argument('--target-ms', type=float, help='Override the target for every module')
+    args = parser.parse_args(argv)
+
+    names = args.modules or list(TARGETS_MS)
+    modules = {name: args.target_ms or TARGETS_MS.get(name, 150) for name in names}
+    if run(modules, args.repeat):
+        print("✅ All modules within target")
+        return 0
+    print("❌ Import time target missed")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,37 +6,37 @@ Stores data in Supabase with duplicate prevention
 """
 
 import os
+import glob
+import json
 import time
 import logging
 import re
-import requests
-import json
 from datetime import datetime
-from typing import List, Dict, Optional
-
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
-
-from supabase import create_client, Client
-
-# Configure logging for production
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('inplay_scraper.log'),
-        logging.StreamHandler()
-    ]
-)
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
+
+# selenium, webdriver_manager and supabase are imported inside the methods that
+# use them, so tooling (replay, history, soak tests) starts without paying for them
+from match_history import HistoryArchive
+from match_identity import NAME_COLUMNS, intern_name, match_key as build_match_key
+from snapshot_diff import SnapshotDiff
+from cycle_supervisor import CycleSupervisor, StageDeadlineExceeded, adopt_driver, stage_abandoned
+from scraper_metrics import REGISTRY
+from table_parser import TABLE_COLUMNS
+from logging_setup import setup_logging, start_cycle
+from supabase_client import CircuitOpenError
+from adaptive_timeouts import AdaptiveTimeouts
+from write_deltas import IDENTITY_COLUMNS, WriteCache, group_by_columns, payload_bytes
+from freshness import FreshnessTracker
+from cycle_profiler import CycleProfiler
 
 logger = logging.getLogger(__name__)
 
+# Columns kept as text when cleaning; everything except timeupdated and min is otherwise numeric
+TEXT_COLUMNS = ['league', 'hometeam', 'awayteam', 'score', 'analysis']
+
+# The live table archive_finished_matches() moves finished matches out of
+ARCHIVE_SOURCE_TABLE = 'inplay_football'
+
 class InPlayFootballScraper:
     def __init__(self):
         """Initialize the scraper with production configuration"""
@@ -58,25 +58,92 @@ class InPlayFootballScraper:
         
         self.driver = None
         self.supabase_client = None
+        self.last_cycle = {}
+        
+        # Optional local snapshot archive for history queries (see match_history.py)
+        self.history_dir = os.getenv('HISTORY_DIR')
+        self.history_archive = HistoryArchive(self.history_dir) if self.history_dir else None
+        
+        # Optional derived signals (implied probabilities, edge, line movement) written into each row
+        self.analytics = None
+        if os.getenv('ENABLE_ANALYTICS') == '1':
+            from cycle_analytics import CycleAnalytics
+            self.analytics = CycleAnalytics(state_path=os.getenv('ANALYTICS_STATE', 'analytics_state.npz'))
+        
+        # Optional alert rules evaluated against the rows that changed since the last snapshot
+        self.alert_rules_path = os.getenv('ALERT_RULES')
+        self.snapshot_diff = None
+        self.alerts = None
+        if self.alert_rules_path:
+            from alert_rules import AlertEngine
+            self.snapshot_diff = SnapshotDiff(state_path=os.getenv('DIFF_STATE', 'snapshot_state.json'))
+            self.alerts = AlertEngine.from_file(self.alert_rules_path, state_path=os.getenv('ALERT_STATE', 'alert_state.json'))
+        
+        # Where cleaned snapshots go, e.g. SINKS="supabase,sqlite,csv:dir=exports" (see sinks.py)
+        self.sink_spec = os.getenv('SINKS', 'supabase')
+        self.sinks = None
+        self._sink_retry = None
+        
+        # STREAM_ROWS=1 reads, cleans and writes the table in STREAM_CHUNK-row chunks instead of
+        # holding three full copies; the whole-snapshot features (analytics, alerts, archive) need lists
+        self.stream_chunk = int(os.getenv('STREAM_CHUNK', '50'))
+        self.stream_rows = os.getenv('STREAM_ROWS') == '1'
+        if self.stream_rows and (self.analytics or self.alerts or self.history_archive):
+            logger.warning("⚠️ STREAM_ROWS ignored: analytics, alerts and the history archive need whole snapshots")
+            self.stream_rows = False
+        
+        # Updates send only the columns changed since the last write (see write_deltas.py)
+        self.partial_updates = os.getenv('PARTIAL_UPDATES', '1') != '0'
+        self.write_caches: Dict[str, WriteCache] = {}
+        self._batch_upserts = True
+        
+        # Browser waits and stage deadlines learn from observed latency (see adaptive_timeouts.py)
+        self.timeouts = AdaptiveTimeouts(state_path=os.getenv('ADAPTIVE_STATE', 'adaptive_timeouts.json'))
+        
+        # HOT_SPARE=1 keeps a second logged-in browser parked on the raw tab in long-running
+        # modes, so a dead primary is replaced without a cold start (see hot_spare.py)
+        self.hot_spare_enabled = os.getenv('HOT_SPARE') == '1'
+        self.hot_spare = None
         
-        # Column mapping for the table (49 columns from HTML)
-        self.columns = [
-            'timeupdated', 'league', 'hometeam', 'awayteam', 'min', 'score',
-            'modsup', 'hdp1', 'hprice', 'aprice', 'homehdp1', 'awayhdp1',
-            'tg1', 'over_price', 'under_price', 'overtg1', 'undertg1',
-            'hdp1_hval', 'hdp1_aval', 'tg1_oval', 'tg1_uval',
-            'hdp2', 'homehdp2', 'awayhdp2', 'hdp3', 'homehdp3', 'awayhdp3',
-            'hdp4', 'homehdp4', 'awayhdp4', 'modhome', 'modaway',
-            'homeperc', 'awayperc', 'modtgs', 'tg2', 'overtg2', 'undertg2',
-            'tg3', 'overtg3', 'undertg3', 'tg4', 'overtg4', 'undertg4',
-            'modover', 'modunder', 'overperc', 'underperc',
-            'startline', 'start_tgs', 'analysis'
-        ]
+        # LEADER_LEASE=supabase (or file:path) lets replicas run active/standby: only the
+        # lease holder writes, the others keep a logged-in browser ready (see leader_lease.py)
+        self.lease_spec = os.getenv('LEADER_LEASE')
+        self.lease = None
+        self._lease_term = None
+        
+        # Age of the odds from the site's timeupdated to the commit, against a p95 SLO (see freshness.py)
+        self.freshness = FreshnessTracker()
+        
+        # PROFILE=cprofile|sample[,cdp,tracemalloc] profiles chosen cycles (see cycle_profiler.py)
+        self.profiler = CycleProfiler.from_env()
+        
+        # ARCHIVE_FINISHED=1 moves finished matches into inplay_football_archive in one
+        # server-side call instead of deleting them (install sql/inplay_football_archive.sql)
+        self.archive_finished = os.getenv('ARCHIVE_FINISHED') == '1'
+        
+        # Column mapping for the table (51 columns from HTML)
+        self.columns = list(TABLE_COLUMNS)
         
         logger.info(f"InPlay Football Scraper initialized - Production: {self.is_production}")
 
+    def wait_timeout(self, key: str, development: float, production: float) -> float:
+        """Learned timeout for a browser wait; the old fixed value is the cold-start default and ceiling"""
+        return self.timeouts.timeout(key, production if self.is_production else development)
+
+    def load_page(self, url: str) -> None:
+        """driver.get under the learned page-load timeout"""
+        timeout = self.wait_timeout('page_load', 60, 180)
+        self.driver.set_page_load_timeout(timeout)
+        with self.timeouts.measure('page_load', timeout):
+            self.driver.get(url)
+
     def setup_driver(self) -> None:
         """Setup Chrome WebDriver with cloud-ready configuration"""
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+        from webdriver_manager.chrome import ChromeDriverManager
+        
         try:
             chrome_options = Options()
             
@@ -102,20 +169,22 @@ class InPlayFootballScraper:
                         driver_path = correct_path
                 
                 service = Service(driver_path)
-                self.driver = webdriver.Chrome(service=service, options=chrome_options)
+                driver = webdriver.Chrome(service=service, options=chrome_options)
             except Exception as driver_error:
                 logger.error(f"ChromeDriverManager failed: {driver_error}")
                 # Fallback: try system chromedriver
                 try:
-                    self.driver = webdriver.Chrome(options=chrome_options)
+                    driver = webdriver.Chrome(options=chrome_options)
                 except Exception as fallback_error:
                     logger.error(f"System chromedriver also failed: {fallback_error}")
                     raise
             
             # Set timeouts for production reliability
-            timeout = 180 if self.is_production else 60
-            self.driver.implicitly_wait(10)
-            self.driver.set_page_load_timeout(timeout)
+            timeout = self.wait_timeout('page_load', 60, 180)
+            driver.implicitly_wait(10)
+            driver.set_page_load_timeout(timeout)
+            # Not kept if the setup_driver deadline already fired (see cycle_supervisor.py)
+            adopt_driver(self, driver)
             
             logger.info(f"Chrome WebDriver setup complete - Production mode: {self.is_production}")
             
@@ -124,10 +193,11 @@ class InPlayFootballScraper:
             raise
 
     def setup_supabase(self) -> None:
-        """Setup Supabase client"""
+        """Setup Supabase client (timeouts, retries and circuit breaker from supabase_client.py)"""
         try:
             if self.supabase_url and self.supabase_key:
-                self.supabase_client: Client = create_client(self.supabase_url, self.supabase_key)
+                from supabase_client import create_resilient_client
+                self.supabase_client = create_resilient_client(self.supabase_url, self.supabase_key)
                 logger.info("✅ Supabase client setup complete")
             else:
                 logger.warning("⚠️ Supabase not configured - data will not be saved to database")
@@ -138,17 +208,23 @@ class InPlayFootballScraper:
 
     def login(self) -> bool:
         """Login to the website"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.common.exceptions import TimeoutException
+        
         try:
             logger.info("🔐 Navigating to login page...")
-            self.driver.get(self.login_url)
+            self.load_page(self.login_url)
             
             # Wait for page to load and find login form
-            timeout = 40 if self.is_production else 20
+            timeout = self.wait_timeout('login_form', 20, 40)
             wait = WebDriverWait(self.driver, timeout)
             
             # Find username field and enter credentials
             try:
-                username_field = wait.until(EC.presence_of_element_located((By.NAME, "username")))
+                with self.timeouts.measure('login_form', timeout):
+                    username_field = wait.until(EC.presence_of_element_located((By.NAME, "username")))
                 username_field.clear()
                 username_field.send_keys(self.username)
                 logger.info("✅ Username entered successfully")
@@ -229,14 +305,19 @@ class InPlayFootballScraper:
 
     def navigate_to_fulltime_page(self) -> bool:
         """Navigate to the full-time model page"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        
         try:
             logger.info("🌐 Navigating to full-time page...")
-            self.driver.get(self.fulltime_url)
+            self.load_page(self.fulltime_url)
             
             # Wait for page to load
-            timeout = 40 if self.is_production else 20
+            timeout = self.wait_timeout('fulltime_body', 20, 40)
             wait = WebDriverWait(self.driver, timeout)
-            wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+            with self.timeouts.measure('fulltime_body', timeout):
+                wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
             
             time.sleep(2 if self.is_production else 1)
             logger.info("✅ Successfully navigated to full-time page")
@@ -248,13 +329,19 @@ class InPlayFootballScraper:
 
     def click_fulltime_raw_tab(self) -> bool:
         """Click on the 'Full-Time Model Raw' tab"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.common.exceptions import TimeoutException
+        
         try:
             logger.info("🎯 Looking for 'Full-Time Model Raw' tab...")
-            timeout = 40 if self.is_production else 20
+            timeout = self.wait_timeout('raw_tab', 20, 40)
             wait = WebDriverWait(self.driver, timeout)
             
             # Find the tab using the provided HTML structure
-            raw_tab = wait.until(EC.presence_of_element_located((By.ID, "two-tab")))
+            with self.timeouts.measure('raw_tab', timeout):
+                raw_tab = wait.until(EC.presence_of_element_located((By.ID, "two-tab")))
             
             # Scroll to the tab to ensure it's visible
             self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", raw_tab)
@@ -295,192 +382,273 @@ class InPlayFootballScraper:
             logger.error(f"❌ Error clicking 'Full-Time Model Raw' tab: {e}")
             return False
 
-    def scrape_table_data(self) -> List[Dict]:
-        """Scrape all data from the DataTable - handles dynamic content"""
-        try:
-            logger.info("📊 Starting table data scraping...")
-            
-            # Wait longer for dynamic table to load completely
-            timeout = 120 if self.is_production else 60
-            wait = WebDriverWait(self.driver, timeout)
-            
-            # Wait for table to be present and visible
-            table = wait.until(EC.presence_of_element_located((By.ID, "fulltimemodelraw")))
-            
-            # Optimized wait for table content to load
-            logger.info("⏳ Waiting for table content to load...")
-            time.sleep(5 if self.is_production else 3)
-            
-            # Scroll to ensure all content is loaded
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
-            self.driver.execute_script("window.scrollTo(0, 0);")
-            time.sleep(2)
-            
-            scraped_data = []
-            max_retries = 3
-            
-            for attempt in range(max_retries):
-                try:
-                    logger.info(f"📋 Attempt {attempt + 1} to scrape table data...")
-                    
-                    # Re-find table and tbody to avoid stale references
-                    table = self.driver.find_element(By.ID, "fulltimemodelraw")
-                    tbody = table.find_element(By.TAG_NAME, "tbody")
-                    
-                    # Use CSS selector to find all rows at once - more reliable
-                    rows = self.driver.find_elements(By.CSS_SELECTOR, "#fulltimemodelraw tbody tr")
-                    
-                    logger.info(f"📋 Found {len(rows)} rows in attempt {attempt + 1}")
-                    
-                    if len(rows) == 0:
-                        logger.warning("⚠️ No rows found, waiting and retrying...")
-                        time.sleep(5)
-                        continue
-                    
-                    # Process each row
-                    for i in range(len(rows)):
+    def iter_rows(self) -> Iterator[Dict]:
+        """Yield raw row dicts from the DataTable as they are read - handles dynamic content
+
+        The row elements are located once per attempt and a row that goes stale is
+        re-located by index. An attempt is only retried while nothing has been
+        yielded, so no row is produced twice; a later error propagates.
+        """
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.common.exceptions import StaleElementReferenceException
+        
+        logger.info("📊 Starting table data scraping...")
+        
+        # A restarted or retried scrape reads the table again; only this attempt's rows count
+        self.freshness.discard_pending()
+        
+        # Wait longer for dynamic table to load completely
+        timeout = self.wait_timeout('table', 60, 120)
+        wait = WebDriverWait(self.driver, timeout)
+        
+        # Wait for table to be present and visible
+        with self.timeouts.measure('table', timeout):
+            wait.until(EC.presence_of_element_located((By.ID, "fulltimemodelraw")))
+        
+        # Optimized wait for table content to load
+        logger.info("⏳ Waiting for table content to load...")
+        time.sleep(5 if self.is_production else 3)
+        
+        # Scroll to ensure all content is loaded
+        self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        time.sleep(2)
+        self.driver.execute_script("window.scrollTo(0, 0);")
+        time.sleep(2)
+        
+        row_selector = "#fulltimemodelraw tbody tr"
+        yielded = 0
+        max_retries = 3
+        
+        for attempt in range(max_retries):
+            try:
+                logger.info(f"📋 Attempt {attempt + 1} to scrape table data...")
+                
+                # Use CSS selector to find all rows at once - more reliable
+                rows = self.driver.find_elements(By.CSS_SELECTOR, row_selector)
+                
+                logger.info(f"📋 Found {len(rows)} rows in attempt {attempt + 1}")
+                
+                if len(rows) == 0:
+                    logger.warning("⚠️ No rows found, waiting and retrying...")
+                    time.sleep(5)
+                    continue
+                
+                # Process each row
+                for i in range(len(rows)):
+                    try:
                         try:
-                            # Re-find the row to avoid stale reference
-                            current_rows = self.driver.find_elements(By.CSS_SELECTOR, "#fulltimemodelraw tbody tr")
-                            if i >= len(current_rows):
+                            row_data = self._read_row(rows[i], i)
+                        except StaleElementReferenceException:
+                            # The table redrew under us: re-find the rows once and read this one again
+                            rows = self.driver.find_elements(By.CSS_SELECTOR, row_selector)
+                            if i >= len(rows):
                                 logger.warning(f"⚠️ Row {i+1} no longer available, skipping")
                                 break
-                            
-                            row = current_rows[i]
-                            cells = row.find_elements(By.TAG_NAME, "td")
-                            
-                            if len(cells) != len(self.columns):
-                                logger.warning(f"⚠️ Row {i+1}: Expected {len(self.columns)} columns, found {len(cells)}")
-                                continue
-                            
-                            # Extract data from each cell
-                            row_data = {}
-                            for j, (column, cell) in enumerate(zip(self.columns, cells)):
-                                try:
-                                    cell_text = cell.text.strip()
-                                    
-                                    # Handle empty cells
-                                    if cell_text == '' or cell_text == '-':
-                                        cell_text = None
-                                    
-                                    row_data[column] = cell_text
-                                except Exception as cell_error:
-                                    logger.warning(f"⚠️ Error reading cell {j+1} in row {i+1}: {cell_error}")
-                                    row_data[column] = None
-                            
-                            scraped_data.append(row_data)
-                            
-                            # Log progress every 10 rows
-                            if (i + 1) % 10 == 0:
-                                logger.info(f"📈 Processed {i + 1} rows so far...")
-                            
-                        except Exception as row_error:
-                            logger.warning(f"⚠️ Error processing row {i+1}: {row_error}")
-                            # Continue with next row instead of failing completely
-                            continue
+                            row_data = self._read_row(rows[i], i)
+                    except Exception as row_error:
+                        logger.warning(f"⚠️ Error processing row {i+1}: {row_error}")
+                        # Continue with next row instead of failing completely
+                        continue
                     
-                    # If we got data, break out of retry loop
-                    if scraped_data:
-                        logger.info(f"✅ Successfully scraped {len(scraped_data)} rows on attempt {attempt + 1}")
-                        return scraped_data
-                    else:
-                        logger.warning(f"⚠️ No data scraped on attempt {attempt + 1}")
-                        
-                except Exception as attempt_error:
-                    logger.error(f"❌ Error on attempt {attempt + 1}: {attempt_error}")
-                    if attempt < max_retries - 1:
-                        logger.info("🔄 Retrying...")
-                        time.sleep(5)
+                    if row_data is None:
                         continue
-                    else:
-                        logger.error("❌ All attempts failed")
-                        break
-            
-            # If we get here, all attempts failed
-            if not scraped_data:
-                logger.error("❌ Failed to scrape any data after all attempts")
+                    
+                    if stage_abandoned():
+                        # Past the scrape deadline: the restarted stage reads (and counts) the rows now
+                        return
+                    yielded += 1
+                    self.freshness.captured(row_data)
+                    yield row_data
+                    
+                    # Log progress every 10 rows
+                    if (i + 1) % 10 == 0:
+                        logger.info(f"📈 Processed {i + 1} rows so far...")
                 
-            return scraped_data
-            
+                # If we got data, stop retrying
+                if yielded:
+                    logger.info(f"✅ Successfully scraped {yielded} rows on attempt {attempt + 1}")
+                    return
+                logger.warning(f"⚠️ No data scraped on attempt {attempt + 1}")
+                
+            except Exception as attempt_error:
+                if yielded:
+                    raise
+                logger.error(f"❌ Error on attempt {attempt + 1}: {attempt_error}")
+                if attempt < max_retries - 1:
+                    logger.info("🔄 Retrying...")
+                    time.sleep(5)
+                else:
+                    logger.error("❌ All attempts failed")
+        
+        logger.error("❌ Failed to scrape any data after all attempts")
+
+    def _read_row(self, row, index: int) -> Optional[Dict]:
+        """Read one table row into a raw dict; None if it has the wrong number of cells"""
+        from selenium.webdriver.common.by import By
+        from selenium.common.exceptions import StaleElementReferenceException
+        
+        cells = row.find_elements(By.TAG_NAME, "td")
+        
+        if len(cells) != len(self.columns):
+            logger.warning(f"⚠️ Row {index+1}: Expected {len(self.columns)} columns, found {len(cells)}")
+            return None
+        
+        # Extract data from each cell
+        row_data = {}
+        for j, (column, cell) in enumerate(zip(self.columns, cells)):
+            try:
+                cell_text = cell.text.strip()
+                
+                # Handle empty cells
+                if cell_text == '' or cell_text == '-':
+                    cell_text = None
+                
+                row_data[column] = cell_text
+            except StaleElementReferenceException:
+                raise
+            except Exception as cell_error:
+                logger.warning(f"⚠️ Error reading cell {j+1} in row {index+1}: {cell_error}")
+                row_data[column] = None
+        return row_data
+
+    def scrape_table_data(self) -> List[Dict]:
+        """Scrape all data from the DataTable into a list (see iter_rows for the streaming form)"""
+        from selenium.common.exceptions import TimeoutException
+        
+        scraped_data = []
+        try:
+            for row_data in self.iter_rows():
+                scraped_data.append(row_data)
         except TimeoutException:
             logger.error("❌ Timeout waiting for table to load")
             return []
         except Exception as e:
             logger.error(f"❌ Error scraping table data: {e}")
-            return []
+        
+        return scraped_data
 
     def clean_and_convert_data(self, data: List[Dict]) -> List[Dict]:
         """Clean and convert data types for database insertion"""
-        cleaned_data = []
+        return list(self.iter_clean(data))
+
+    def iter_clean(self, rows: Iterable[Dict]) -> Iterator[Dict]:
+        """Clean rows one at a time as they arrive"""
+        for row in rows:
+            yield self.clean_row(row)
+
+    def clean_row(self, row: Dict, text_columns: Optional[List[str]] = None) -> Dict:
+        """Clean and convert one raw row; columns other than timeupdated, min and the text columns are numeric"""
+        text_columns = TEXT_COLUMNS if text_columns is None else text_columns
+        cleaned_row = {}
         
-        for row in data:
-            cleaned_row = {}
-            
-            for column, value in row.items():
-                if column == 'timeupdated':
-                    # Store the raw date string exactly as it appears on the website
-                    # The Supabase column is TEXT type, so no parsing needed
-                    if value and value.strip():
-                        cleaned_row[column] = value.strip()
-                    else:
-                        cleaned_row[column] = None
-                        
-                elif column in ['league', 'hometeam', 'awayteam', 'score', 'analysis']:
-                    # Text fields - clean whitespace
-                    cleaned_row[column] = value.strip() if value else None
+        for column, value in row.items():
+            if column == 'timeupdated':
+                # Store the raw date string exactly as it appears on the website
+                # The Supabase column is TEXT type, so no parsing needed
+                if value and value.strip():
+                    cleaned_row[column] = value.strip()
+                else:
+                    cleaned_row[column] = None
                     
-                elif column == 'min':
-                    # Integer field - handle various formats
-                    if value and str(value).strip():
-                        try:
-                            # Extract numeric part only (in case there's extra text)
-                            numeric_value = ''.join(filter(str.isdigit, str(value)))
-                            if numeric_value:
-                                cleaned_row[column] = int(numeric_value)
-                            else:
-                                cleaned_row[column] = None
-                        except ValueError:
+            elif column == 'captured_at':
+                # ISO timestamp stamped when the row was read (WRITE_CAPTURED_AT=1)
+                cleaned_row[column] = value
+                
+            elif column in text_columns:
+                # Text fields - clean whitespace
+                cleaned_row[column] = value.strip() if value else None
+                if column in NAME_COLUMNS:
+                    # Team and league names repeat every cycle - share one string per name
+                    cleaned_row[column] = intern_name(cleaned_row[column])
+                
+            elif column == 'min':
+                # Integer field - handle various formats
+                if value and str(value).strip():
+                    try:
+                        # Extract numeric part only (in case there's extra text)
+                        numeric_value = ''.join(filter(str.isdigit, str(value)))
+                        if numeric_value:
+                            cleaned_row[column] = int(numeric_value)
+                        else:
                             cleaned_row[column] = None
-                    else:
+                    except ValueError:
                         cleaned_row[column] = None
-                        
                 else:
-                    # All other fields are numeric (DECIMAL)
-                    if value and str(value).strip() and str(value).strip() not in ['-', '']:
-                        try:
-                            # Clean the value - remove any non-numeric characters except decimal point and minus
-                            clean_value = str(value).strip()
-                            # Handle negative values and decimals
-                            if clean_value.replace('-', '').replace('.', '').isdigit():
-                                cleaned_row[column] = float(clean_value)
+                    cleaned_row[column] = None
+                    
+            else:
+                # All other fields are numeric (DECIMAL)
+                if value and str(value).strip() and str(value).strip() not in ['-', '']:
+                    try:
+                        # Clean the value - remove any non-numeric characters except decimal point and minus
+                        clean_value = str(value).strip()
+                        # Handle negative values and decimals
+                        if clean_value.replace('-', '').replace('.', '').isdigit():
+                            cleaned_row[column] = float(clean_value)
+                        else:
+                            # Try to extract numeric value from string
+                            numeric_match = re.search(r'-?\d+\.?\d*', clean_value)
+                            if numeric_match:
+                                cleaned_row[column] = float(numeric_match.group())
                             else:
-                                # Try to extract numeric value from string
-                                numeric_match = re.search(r'-?\d+\.?\d*', clean_value)
-                                if numeric_match:
-                                    cleaned_row[column] = float(numeric_match.group())
-                                else:
-                                    cleaned_row[column] = None
-                        except (ValueError, AttributeError):
-                            cleaned_row[column] = None
-                    else:
+                                cleaned_row[column] = None
+                    except (ValueError, AttributeError):
                         cleaned_row[column] = None
-            
-            cleaned_data.append(cleaned_row)
+                else:
+                    cleaned_row[column] = None
         
-        return cleaned_data
+        return cleaned_row
+
+    def supabase_available(self) -> bool:
+        """False while the circuit breaker is open (plain or fake clients are always available)"""
+        available = getattr(self.supabase_client, 'available', None)
+        return available() if available else True
+
+    def spool_snapshot(self, clean_data: List[Dict]) -> bool:
+        """Keep a snapshot locally while Supabase is unreachable; the next successful save supersedes it"""
+        spool = getattr(self.supabase_client, 'spool', None)
+        if spool is None:
+            return False
+        try:
+            spool.append(clean_data)
+        except OSError as e:
+            logger.error(f"❌ Could not spool snapshot locally: {e}")
+            return False
+        REGISTRY.inc('inplay_supabase_spooled_snapshots_total',
+                     help_text='Snapshots buffered locally while the Supabase circuit was open')
+        logger.warning(f"💾 Supabase unavailable - spooled {len(clean_data)} records to {spool.path}")
+        return True
+
+    def write_cache_for(self, table: str) -> Optional[WriteCache]:
+        """The last-written rows of one destination table (None when partial updates are off)"""
+        if not self.partial_updates:
+            return None
+        if table not in self.write_caches:
+            state_path = os.getenv('WRITE_CACHE_STATE', 'write_cache.json')
+            if table != 'inplay_football':
+                root, ext = os.path.splitext(state_path)
+                state_path = f"{root}.{table}{ext}"
+            self.write_caches[table] = WriteCache(state_path=state_path)
+        return self.write_caches[table]
 
-    def save_to_supabase(self, data: List[Dict]) -> bool:
+    def save_to_supabase(self, data: List[Dict], cleaned: bool = False, table: str = 'inplay_football') -> bool:
         """Save data to Supabase with optimized batch upsert and cleanup functionality"""
         if not self.supabase_client:
             logger.warning("⚠️ Supabase client not configured - skipping database save")
             return False
         
+        if not self.supabase_available():
+            # Circuit open: make no calls this cycle, just buffer the snapshot
+            return self.spool_snapshot(data if cleaned else self.clean_and_convert_data(data))
+        
+        write_cache = self.write_cache_for(table)
         try:
             logger.info(f"💾 Saving {len(data)} records to Supabase with optimized upsert...")
             
-            # Clean and convert data
-            clean_data = self.clean_and_convert_data(data)
+            # Clean and convert data (run_scraper passes rows it has already cleaned)
+            clean_data = data if cleaned else self.clean_and_convert_data(data)
             
             # Filter out records with no TimeUpdated or HomeTeam (required for uniqueness)
             valid_data = []
@@ -504,12 +672,10 @@ class InPlayFootballScraper:
             # OPTIMIZATION: Get all existing records in one query instead of individual queries
             existing_records = {}
             try:
-                all_existing = self.supabase_client.table('inplay_football').select('id,hometeam,timeupdated').execute()
+                all_existing = self.supabase_client.table(table).select('id,hometeam,timeupdated').execute()
                 for record in all_existing.data:
                     # Create a key for matching: hometeam + date part
-                    date_part = record['timeupdated'].split(',')[0].strip() if record['timeupdated'] else ''
-                    key = f"{record['hometeam']}_{date_part}"
-                    existing_records[key] = record['id']
+                    existing_records[build_match_key(record['hometeam'], record['timeupdated'])] = record['id']
                 logger.info(f"📋 Retrieved {len(existing_records)} existing records for comparison")
             except Exception as e:
                 logger.warning(f"⚠️ Could not retrieve existing records, falling back to individual queries: {e}")
@@ -517,43 +683,83 @@ class InPlayFootballScraper:
             # Process records with optimized logic
             successful_upserts = 0
             current_hometeams = set()  # Track current teams for cleanup
+            current_keys = set()
+            partial_updates = []
+            unchanged_records = 0
+            full_bytes = sent_bytes = 0
             
             for record in valid_data:
                 try:
-                    timeupdated_str = record['timeupdated']
                     hometeam = record['hometeam']
                     current_hometeams.add(hometeam)
                     
-                    # Extract date part for matching
-                    match_date = timeupdated_str.split(',')[0].strip() if timeupdated_str else timeupdated_str
-                    match_key = f"{hometeam}_{match_date}"
+                    # Cached per home team and date, so the key is the same object every cycle
+                    match_key = build_match_key(hometeam, record['timeupdated'])
+                    current_keys.add(match_key)
                     
                     if match_key in existing_records:
-                        # Update existing record
                         existing_id = existing_records[match_key]
-                        update_result = self.supabase_client.table('inplay_football').update(record).eq('id', existing_id).execute()
+                        changed = write_cache.changes(match_key, existing_id, record) if write_cache else None
+                        full_bytes += payload_bytes(record)
+                        
+                        if changed:
+                            # Sent after the loop, batched with rows that changed the same columns
+                            partial_updates.append((existing_id, match_key, record, changed))
+                            continue
+                        if changed is not None:
+                            # Nothing changed since the last write
+                            unchanged_records += 1
+                            successful_upserts += 1
+                            continue
+                        
+                        # Update existing record (no earlier write to compare against)
+                        update_result = self.supabase_client.table(table).update(record).eq('id', existing_id).execute()
+                        sent_bytes += payload_bytes(record)
                         
                         if update_result.data:
                             successful_upserts += 1
+                            self.remember_write(table, match_key, existing_id, record)
                         else:
                             logger.warning(f"⚠️ Update failed for {hometeam}")
                     else:
                         # Insert new record
-                        insert_result = self.supabase_client.table('inplay_football').insert(record).execute()
+                        insert_result = self.supabase_client.table(table).insert(record).execute()
                         
                         if insert_result.data:
                             successful_upserts += 1
+                            self.remember_write(table, match_key, insert_result.data[0].get('id'), record)
                         else:
                             logger.warning(f"⚠️ Insert failed for {hometeam}")
                             
+                except CircuitOpenError:
+                    # The breaker tripped mid-save: stop sending and keep the whole snapshot locally
+                    logger.error(f"❌ Supabase circuit opened after {successful_upserts} records - stopping writes")
+                    return self.spool_snapshot(valid_data)
                 except Exception as record_error:
                     logger.error(f"❌ Error processing record for {record.get('hometeam', 'unknown')}: {record_error}")
                     continue
             
+            if partial_updates:
+                try:
+                    written, sent = self.write_partial_updates(partial_updates, table)
+                except CircuitOpenError:
+                    logger.error("❌ Supabase circuit opened during partial updates - stopping writes")
+                    return self.spool_snapshot(valid_data)
+                successful_upserts += written
+                sent_bytes += sent
+            self.record_update_payload(full_bytes, sent_bytes, len(partial_updates), unchanged_records)
+            
             logger.info(f"✅ Successfully processed {successful_upserts} out of {len(valid_data)} records")
             
             # CLEANUP: Remove records that are no longer in the current data
-            cleanup_success = self.cleanup_old_records(current_hometeams)
+            cleanup_success = self.cleanup_old_records(current_hometeams, table)
+            if write_cache:
+                write_cache.retain(current_keys)
+            
+            # The table now mirrors this snapshot, so anything spooled during an outage is stale
+            spool = getattr(self.supabase_client, 'spool', None)
+            if successful_upserts > 0 and spool is not None and os.path.exists(spool.path):
+                logger.info(f"🧹 Dropped {spool.clear()} spooled snapshots superseded by this save")
             
             return successful_upserts > 0 and cleanup_success
                 
@@ -561,14 +767,101 @@ class InPlayFootballScraper:
             logger.error(f"❌ Error saving to Supabase: {e}")
             logger.error(f"Error type: {type(e).__name__}")
             return False
+        finally:
+            if write_cache:
+                write_cache.save()
 
-    def cleanup_old_records(self, current_hometeams: set) -> bool:
+    def remember_write(self, table: str, match_key: str, row_id, record: Dict) -> None:
+        """Record what the table now holds for a match, for the next cycle's partial update"""
+        write_cache = self.write_cache_for(table)
+        if write_cache:
+            write_cache.remember(match_key, row_id, record)
+
+    def write_partial_updates(self, updates: List[Tuple], table: str = 'inplay_football') -> Tuple[int, int]:
+        """Send only the changed columns, one upsert per changed-column set; returns (rows written, bytes sent)"""
+        written = 0
+        sent = 0
+        query = self.supabase_client.table
+        
+        for members in group_by_columns(updates).values():
+            for i in range(0, len(members), 200):
+                batch = members[i:i + 200]
+                
+                if len(batch) > 1 and self._batch_upserts:
+                    payload = [dict({column: record.get(column) for column in IDENTITY_COLUMNS}, **changed, id=row_id)
+                               for row_id, _, record, changed in batch]
+                    try:
+                        query(table).upsert(payload, on_conflict='id', returning='minimal').execute()
+                    except CircuitOpenError:
+                        raise
+                    except Exception as batch_error:
+                        logger.warning(f"⚠️ Batched partial update failed ({batch_error}) - sending rows one by one from now on")
+                        self._batch_upserts = False
+                    else:
+                        sent += payload_bytes(payload)
+                        written += len(batch)
+                        for row_id, match_key, record, _ in batch:
+                            self.remember_write(table, match_key, row_id, record)
+                        continue
+                
+                for row_id, match_key, record, changed in batch:
+                    try:
+                        update_result = query(table).update(changed).eq('id', row_id).execute()
+                    except CircuitOpenError:
+                        raise
+                    except Exception as record_error:
+                        logger.error(f"❌ Error updating record for {record.get('hometeam', 'unknown')}: {record_error}")
+                        continue
+                    sent += payload_bytes(changed)
+                    if update_result.data:
+                        written += 1
+                        self.remember_write(table, match_key, row_id, record)
+                    else:
+                        logger.warning(f"⚠️ Update failed for {record.get('hometeam')}")
+        
+        return written, sent
+
+    def record_update_payload(self, full_bytes: int, sent_bytes: int, partial: int, unchanged: int) -> None:
+        """Export and log how many update bytes the partial writes saved this cycle"""
+        REGISTRY.inc('inplay_supabase_update_bytes_total', {'payload': 'full'}, amount=full_bytes,
+                     help_text='Update payload bytes: full records vs what was actually sent')
+        REGISTRY.inc('inplay_supabase_update_bytes_total', {'payload': 'sent'}, amount=sent_bytes,
+                     help_text='Update payload bytes: full records vs what was actually sent')
+        REGISTRY.set('inplay_supabase_update_bytes_saved', full_bytes - sent_bytes,
+                     help_text='Update payload bytes saved by partial updates in the last save')
+        if full_bytes:
+            logger.info(f"📉 Updates: {partial} partial, {unchanged} unchanged - sent {sent_bytes / 1024:.1f} KiB "
+                        f"instead of {full_bytes / 1024:.1f} KiB ({100 * (1 - sent_bytes / full_bytes):.0f}% saved)")
+
+    def archive_finished_matches(self, current_hometeams: set) -> bool:
+        """Move the matches no longer in play, with their final odds, into the archive in one RPC"""
+        try:
+            started = time.monotonic()
+            response = self.supabase_client.rpc('archive_finished_matches', {
+                'p_live_hometeams': sorted(current_hometeams)
+            }).execute()
+            archived = int(response.data or 0)
+        except Exception as e:
+            # The rows stay live, so the next cycle archives them instead
+            logger.error(f"❌ Error archiving finished matches: {e}")
+            return False
+        REGISTRY.inc('inplay_archived_matches_total', amount=archived,
+                     help_text='Finished matches moved into inplay_football_archive')
+        if archived:
+            logger.info(f"🗄️ Archived {archived} finished matches in {time.monotonic() - started:.2f}s")
+        else:
+            logger.info("✅ No finished matches to archive - all current")
+        return True
+
+    def cleanup_old_records(self, current_hometeams: set, table: str = 'inplay_football') -> bool:
         """Remove records from Supabase that are no longer in the current scraped data"""
+        if self.archive_finished and table == ARCHIVE_SOURCE_TABLE:
+            return self.archive_finished_matches(current_hometeams)
         try:
             logger.info("🧹 Starting cleanup of old records...")
             
             # Get all existing records
-            all_existing = self.supabase_client.table('inplay_football').select('id,hometeam').execute()
+            all_existing = self.supabase_client.table(table).select('id,hometeam').execute()
             
             if not all_existing.data:
                 logger.info("📭 No existing records to clean up")
@@ -593,7 +886,7 @@ class InPlayFootballScraper:
             for i in range(0, len(records_to_delete), batch_size):
                 batch = records_to_delete[i:i + batch_size]
                 try:
-                    delete_result = self.supabase_client.table('inplay_football').delete().in_('id', batch).execute()
+                    delete_result = self.supabase_client.table(table).delete().in_('id', batch).execute()
                     if delete_result.data:
                         deleted_count += len(delete_result.data)
                 except Exception as batch_error:
@@ -607,44 +900,276 @@ class InPlayFootballScraper:
             logger.error(f"❌ Error during cleanup: {e}")
             return False
 
-    def run_scraper(self) -> bool:
-        """Main method to run the complete scraping process"""
+    def sink_fanout(self):
+        """The configured sinks, started on first use"""
+        if self.sinks is None:
+            from sinks import SinkFanout, build_sinks
+            self.sinks = SinkFanout(build_sinks(self.sink_spec, self))
+            logger.info(f"📦 Writing snapshots to: {', '.join(self.sinks.names)}")
+        return self.sinks
+
+    def save_snapshot(self, clean_data: List[Dict], new_snapshot: bool = False) -> bool:
+        """Publish a cleaned snapshot to every configured sink; True once the blocking sinks have written it
+
+        A retry of the save stage only re-sends to the blocking sinks that failed;
+        new_snapshot starts over with every sink.
+        """
+        if new_snapshot:
+            self._sink_retry = None
+        results = self.sink_fanout().publish(clean_data, only=self._sink_retry)
+        failed = [name for name, ok in results.items() if not ok]
+        if failed:
+            logger.error(f"❌ Sinks failed: {', '.join(failed)}")
+        self._sink_retry = failed or None
+        return not failed
+
+    def stream_snapshot(self):
+        """Scrape, clean and write the table chunk by chunk; the number of rows written, or False
+
+        Sinks start writing while later rows are still being read, and no more than
+        a few chunks per sink are held in memory.
+        """
+        from sinks import chunked
+        
+        count = 0
+        
+        def counted(rows: Iterable[Dict]) -> Iterator[Dict]:
+            nonlocal count
+            for row in rows:
+                count += 1
+                yield row
+        
+        results = self.sink_fanout().publish_stream(
+            chunked(counted(self.iter_clean(self.iter_rows())), self.stream_chunk))
+        if not count:
+            logger.error("❌ No data scraped")
+            return False
+        
+        failed = [name for name, ok in results.items() if not ok]
+        if failed:
+            logger.error(f"❌ Sinks failed: {', '.join(failed)}")
+            return False
+        self.record_commit()
+        logger.info(f"✅ Streamed {count} rows to {', '.join(self.sinks.names)}")
+        return count
+
+    def process_snapshot(self, scraped_data: List[Dict]) -> List[Dict]:
+        """Clean a scraped snapshot once and run the optional analytics, alert and archive steps"""
+        clean_data = self.clean_and_convert_data(scraped_data)
+        
+        if self.analytics:
+            try:
+                self.analytics.enrich(clean_data)
+            except Exception as analytics_error:
+                logger.warning(f"⚠️ Could not compute analytics: {analytics_error}")
+        
+        if self.alerts:
+            try:
+                self.alerts.process(self.snapshot_diff.diff(clean_data))
+            except Exception as alert_error:
+                logger.warning(f"⚠️ Could not evaluate alert rules: {alert_error}")
+        
+        # Archive the snapshot locally before the database write
+        if self.history_archive:
+            try:
+                self.history_archive.append_snapshot(clean_data)
+            except Exception as archive_error:
+                logger.warning(f"⚠️ Could not archive snapshot: {archive_error}")
+        
+        return clean_data
+
+    def record_commit(self) -> None:
+        """The snapshot is committed: record its freshness lags and the p95 against the SLO"""
+        p95 = self.freshness.committed()
+        if p95 is not None:
+            self.last_cycle['freshness_p95'] = round(p95, 1)
+            logger.info(f"🕒 Odds age p95 {p95:.0f}s (SLO {self.freshness.slo_seconds:g}s)")
+
+    def driver_alive(self) -> bool:
+        """True if the current browser session still answers commands"""
+        if not self.driver:
+            return False
+        try:
+            self.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def close_driver(self) -> None:
+        """Quit the browser; the next cycle starts a fresh one"""
+        if self.driver:
+            try:
+                self.driver.quit()
+                logger.info("🛑 WebDriver closed")
+            except:
+                pass
+            self.driver = None
+
+    def may_write(self) -> bool:
+        """True unless a leader lease is configured and this replica does not hold it"""
+        if not self.lease_spec:
+            return True
+        if self.lease is None:
+            from leader_lease import build_lease
+            if self.lease_spec == 'supabase' and not self.supabase_client:
+                self.setup_supabase()
+            self.lease = build_lease(self.lease_spec, self.supabase_client)
+        leading = self.lease.renew()
+        # A new epoch means someone else may have held the lease, even if this replica never
+        # noticed losing it (a cycle that outlived the TTL); the first renewal counts as one
+        if leading and (self._lease_term is None or self.lease.epoch != self._lease_term):
+            self.check_write_caches_for_term()
+            self._lease_term = self.lease.epoch
+        return leading
+    
+    def check_write_caches_for_term(self) -> None:
+        """Drop the write caches unless they were written in this same term of leadership
+        
+        Another replica may have written while this one stood by, so remembered rows are
+        no longer what the table holds. The term (holder and lease epoch) is recorded next
+        to the caches, so a per-cycle process that keeps the lease keeps its cache.
+        """
+        marker_path = os.getenv('WRITE_CACHE_STATE', 'write_cache.json') + '.term'
+        term = {'holder': self.lease.holder, 'epoch': self.lease.epoch}
+        try:
+            with open(marker_path, 'r', encoding='utf-8') as handle:
+                if term['epoch'] is not None and json.load(handle) == term:
+                    return
+        except (OSError, ValueError):
+            pass
+        self.reset_write_caches()
+        try:
+            with open(marker_path, 'w', encoding='utf-8') as handle:
+                json.dump(term, handle)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not record the write cache term: {e}")
+    
+    def reset_write_caches(self) -> None:
+        """Forget every remembered write, in memory and on disk, so the next save writes full rows"""
+        self.write_caches = {}
+        root, ext = os.path.splitext(os.getenv('WRITE_CACHE_STATE', 'write_cache.json'))
+        for path in glob.glob(f"{glob.escape(root)}{ext}") + glob.glob(f"{glob.escape(root)}.*{ext}"):
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning(f"⚠️ Could not remove write cache {path}: {e}")
+        logger.info("🧽 New leadership term - write caches cleared, next save writes full rows")
+
+    def take_hot_spare(self) -> bool:
+        """Swap a dead or failed primary browser for the parked spare; False if none is ready"""
+        if not self.hot_spare:
+            return False
+        started = time.monotonic()
+        driver = self.hot_spare.take()
+        if driver is None:
+            return False
+        self.close_driver()
+        self.driver = driver
+        logger.info(f"⚡ Switched to the hot-spare browser in {(time.monotonic() - started) * 1000:.0f} ms")
+        return True
+
+    def close(self) -> None:
+        """Release the browser, the hot spare and background sinks"""
+        self.close_driver()
+        if self.hot_spare:
+            self.hot_spare.stop()
+            self.hot_spare = None
+        if self.alerts:
+            self.alerts.close()
+        if self.sinks:
+            self.sinks.close()
+            self.sinks = None
+
+    def run_scraper(self, keep_browser: bool = False) -> bool:
+        """Main method to run the complete scraping process
+        
+        With keep_browser the logged-in driver is left open for the next cycle,
+        which then skips driver setup and login (long-running modes only).
+        """
+        # Every stage runs under a deadline; a hung Chrome is killed and the stage restarted
+        supervisor = CycleSupervisor(self, adaptive=self.timeouts)
+        browser_ok = False
+        cycle_id = start_cycle()
+        self.last_cycle = {'cycle_id': cycle_id, 'rows': 0}
+        self.freshness.start_cycle()
+        profile = self.profiler.begin(cycle_id, self.driver) if self.profiler else None
+        
         try:
             logger.info("=" * 60)
-            logger.info("🚀 Starting InPlay Football scraping process...")
+            logger.info(f"🚀 Starting InPlay Football scraping process (cycle {cycle_id})...")
             logger.info(f"Environment: {'Production' if self.is_production else 'Development'}")
             logger.info("=" * 60)
             
-            # Setup components
-            self.setup_driver()
-            self.setup_supabase()
+            if keep_browser and self.hot_spare_enabled and not self.hot_spare:
+                from hot_spare import HotSpare
+                self.hot_spare = HotSpare(self)
+                self.hot_spare.start()
+            
+            # Setup components (a kept browser, or the hot spare, is already logged in)
+            reuse_browser = keep_browser and (self.driver_alive() or self.take_hot_spare())
+            if not reuse_browser:
+                self.close_driver()
+                supervisor.run_stage('setup_driver', self.setup_driver)
             
             # Execute scraping workflow
-            if not self.login():
+            if reuse_browser:
+                logger.info("♻️ Reusing logged-in browser session")
+            elif not supervisor.run_stage('login', self.login):
                 logger.error("❌ Failed to login - aborting scraping")
                 return False
             
-            if not self.navigate_to_fulltime_page():
+            if not supervisor.run_stage('navigate', self.navigate_to_fulltime_page):
                 logger.error("❌ Failed to navigate to full-time page - aborting scraping")
                 return False
             
-            if not self.click_fulltime_raw_tab():
+            if not supervisor.run_stage('click_tab', self.click_fulltime_raw_tab):
                 logger.error("❌ Failed to click Full-Time Model Raw tab - aborting scraping")
                 return False
             
+            if not self.may_write():
+                # Warm standby: logged in and on the raw tab, so taking over costs one cycle
+                browser_ok = True
+                self.last_cycle['standby'] = True
+                logger.info("🪑 Standby - browser ready, the leader does the writes")
+                return True
+            
+            if self.stream_rows:
+                # Scrape, clean and save overlap, so the whole pipeline runs under the scrape deadline
+                streamed = supervisor.run_stage('scrape', self.stream_snapshot)
+                if not streamed:
+                    logger.error("❌ Streaming scrape failed - aborting")
+                    return False
+                browser_ok = True
+                self.last_cycle['rows'] = streamed
+                logger.info("🎉 Scraping process completed successfully!")
+                return True
+            
             # Scrape data
-            scraped_data = self.scrape_table_data()
+            scraped_data = supervisor.run_stage('scrape', self.scrape_table_data)
             
             if not scraped_data:
                 logger.error("❌ No data scraped - aborting")
                 return False
             
             logger.info(f"✅ Successfully scraped {len(scraped_data)} rows")
+            browser_ok = True
+            self.last_cycle['rows'] = len(scraped_data)
+            
+            # Clean once; analytics, alerts, the archive and the database all share these rows
+            clean_data = supervisor.run_stage('process', self.process_snapshot, scraped_data)
             
-            # Save to database
-            success = self.save_to_supabase(scraped_data)
+            # Renewed again right before writing, in case a slow scrape outlived the lease
+            if not self.may_write():
+                logger.warning("🪑 Lost the leader lease during the cycle - not writing")
+                self.last_cycle['standby'] = True
+                return True
+            
+            # Save to every configured sink (Supabase by default)
+            self._sink_retry = None
+            success = supervisor.run_stage('save', self.save_snapshot, clean_data)
             
             if success:
+                self.record_commit()
                 logger.info("=" * 60)
                 logger.info("🎉 Scraping process completed successfully!")
                 logger.info("=" * 60)
@@ -653,24 +1178,38 @@ class InPlayFootballScraper:
                 logger.error("❌ Failed to save data to database")
                 return False
             
+        except StageDeadlineExceeded as e:
+            logger.error(f"❌ {e} - aborting scraping")
+            return False
         except Exception as e:
             logger.error(f"❌ Error in scraping process: {e}")
             return False
         finally:
-            if self.driver:
-                try:
-                    self.driver.quit()
-                    logger.info("🛑 WebDriver closed")
-                except:
-                    pass
+            if self.profiler:
+                self.profiler.finish(profile, self.driver)
+            self.timeouts.save()
+            if not keep_browser:
+                self.close()
+            elif not browser_ok:
+                # Never keep a browser whose session just failed or hung
+                self.close_driver()
 
 def main():
     """Main function to run the scraper"""
     import sys
     
+    # Configure logging: I/O happens on a background listener thread (see logging_setup.py)
+    setup_logging('inplay_scraper.log')
+    
+    # Counters accumulate across runs when each cycle is a fresh process
+    metrics_state = os.getenv('METRICS_STATE', 'scraper_metrics.json')
+    metrics_file = os.getenv('METRICS_FILE', 'scraper_metrics.prom')
+    REGISTRY.load(metrics_state)
+    
     try:
         scraper = InPlayFootballScraper()
         success = scraper.run_scraper()
+        REGISTRY.save(metrics_state, metrics_file)
         
         if success:
             logger.info("✅ InPlay Football scraper completed successfully!")
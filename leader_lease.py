@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+InPlay Football Leader Lease
+Lets several replicas run side by side with only one writing: the leader renews a
+time-limited lease each cycle, and a standby takes it over once it expires
+"""
+
+import os
+import json
+import time
+import fcntl
+import socket
+import logging
+from typing import Dict, Optional
+
+from scraper_metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+LEASE_NAME = 'inplay_football'
+
+
+class FileLease:
+    """Local stand-in for the database lease: a JSON file updated under an exclusive lock
+
+    Only replicas sharing the file (same host or a shared volume) see each other.
+    """
+
+    def __init__(self, path: str, name: str = LEASE_NAME):
+        self.path = path
+        self.name = name
+
+    def _update(self, change) -> Dict:
+        """Apply change(current lease or None, now) -> new lease or None under the file lock"""
+        with open(self.path, 'a+', encoding='utf-8') as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            handle.seek(0)
+            try:
+                leases = json.loads(handle.read() or '{}')
+            except ValueError:
+                leases = {}
+            lease = change(leases.get(self.name), time.time())
+            if lease is not None:
+                leases[self.name] = lease
+                handle.seek(0)
+                handle.truncate()
+                json.dump(leases, handle)
+                handle.flush()
+                os.fsync(handle.fileno())
+            return leases.get(self.name) or {}
+
+    def acquire(self, holder: str, ttl: float) -> Dict:
+        def take(current: Optional[Dict], now: float) -> Optional[Dict]:
+            if current is None:
+                return {'holder': holder, 'expires_at': now + ttl, 'epoch': 1}
+            if current['holder'] == holder:
+                return dict(current, expires_at=now + ttl)
+            if current['expires_at'] < now:
+                return {'holder': holder, 'expires_at': now + ttl, 'epoch': current['epoch'] + 1}
+            return None
+        return self._update(take)
+
+    def release(self, holder: str) -> None:
+        def expire(current: Optional[Dict], now: float) -> Optional[Dict]:
+            if current and current['holder'] == holder:
+                return dict(current, expires_at=now)
+            return None
+        self._update(expire)
+
+
+class SupabaseLease:
+    """Lease row in scraper_leases, taken and renewed atomically by acquire_scraper_lease()
+
+    Install sql/scraper_leader_lease.sql first. Expiry is judged on the database clock.
+    """
+
+    def __init__(self, client, name: str = LEASE_NAME):
+        self.client = client
+        self.name = name
+
+    def acquire(self, holder: str, ttl: float) -> Dict:
+        response = self.client.rpc('acquire_scraper_lease', {
+            'p_name': self.name, 'p_holder': holder, 'p_ttl_seconds': int(round(ttl))
+        }).execute()
+        return response.data[0] if response.data else {}
+
+    def release(self, holder: str) -> None:
+        self.client.rpc('release_scraper_lease', {'p_name': self.name, 'p_holder': holder}).execute()
+
+
+class LeaderLease:
+    """This replica's view of the lease; renew() is called from the cycle, never from a timer
+
+    A leader whose cycle hangs therefore stops renewing and loses the lease instead
+    of holding it forever.
+    """
+
+    def __init__(self, store, holder: Optional[str] = None, ttl: Optional[float] = None):
+        self.store = store
+        # Stable across the per-cycle subprocesses of continuous_runner.py, unique per replica
+        self.holder = (holder or os.getenv('LEASE_HOLDER') or os.getenv('RAILWAY_REPLICA_ID')
+                       or os.getenv('RENDER_INSTANCE_ID') or socket.gethostname())
+        self.ttl = float(os.getenv('LEASE_TTL', '60')) if ttl is None else ttl
+        # None until the first renewal, so a fresh process does not count a change of role
+        self.is_leader: Optional[bool] = None
+        self.epoch: Optional[int] = None
+        self.leader: Optional[str] = None
+        self._valid_until = 0.0
+
+    def renew(self) -> bool:
+        """Take or extend the lease; True while this replica is the leader"""
+        started = time.monotonic()
+        try:
+            lease = self.store.acquire(self.holder, self.ttl)
+        except Exception as e:
+            # Without an answer we cannot know; keep leading only while our last grant lasts
+            logger.warning(f"⚠️ Could not renew the leader lease: {e}")
+            return self._set_leader(bool(self.is_leader) and time.monotonic() < self._valid_until)
+        self.leader = lease.get('holder')
+        if self.leader == self.holder:
+            self.epoch = lease.get('epoch')
+            # Measured from before the request, so a slow answer shortens the grant, never extends it
+            self._valid_until = started + self.ttl
+        return self._set_leader(self.leader == self.holder)
+
+    def _set_leader(self, leading: bool) -> bool:
+        if self.is_leader is None:
+            logger.info(f"{'👑' if leading else '🪑'} {self.holder} starts as "
+                        f"{'leader' if leading else 'standby'} (leader: {self.leader})")
+        elif leading != self.is_leader:
+            REGISTRY.inc('inplay_leader_transitions_total', {'to': 'leader' if leading else 'standby'},
+                         help_text='Changes of this replica\'s lease role')
+            if leading:
+                logger.info(f"👑 {self.holder} is now the leader (epoch {self.epoch})")
+            else:
+                logger.warning(f"🪑 {self.holder} is standing by (leader: {self.leader})")
+        self.is_leader = leading
+        REGISTRY.set('inplay_leader', 1 if leading else 0, help_text='1 while this replica holds the leader lease')
+        return leading
+
+    def release(self) -> None:
+        """Hand the lease over early on a clean shutdown"""
+        if not self.is_leader:
+            return
+        try:
+            self.store.release(self.holder)
+            logger.info("👋 Released the leader lease")
+        except Exception as e:
+            logger.warning(f"⚠️ Could not release the leader lease: {e}")
+        self._set_leader(False)
+
+
+def build_lease(spec: Optional[str], supabase_client=None) -> Optional[LeaderLease]:
+    """LEADER_LEASE spec: 'supabase', 'file' or 'file:path'; empty disables the lease"""
+    if not spec:
+        return None
+    kind, _, option = spec.partition(':')
+    if kind == 'file':
+        return LeaderLease(FileLease(option or 'leader_lease.json'))
+    if kind == 'supabase':
+        if supabase_client is None:
+            raise ValueError("The supabase lease needs a Supabase client")
+        return LeaderLease(SupabaseLease(supabase_client))
+    raise ValueError(f"Unknown LEADER_LEASE {spec!r}")
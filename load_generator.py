@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+InPlay Football Load Generator
+Synthetic #fulltimemodelraw pages and row streams at 50-5000 live matches with
+realistic league/team strings and odds drift, plus a scaling report of per-stage
+time against row count so super-linear behaviour shows up before a busy Saturday
+"""
+
+import os
+import sys
+import csv
+import math
+import time
+import random
+import logging
+import argparse
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from unittest import mock
+
+from table_parser import TABLE_COLUMNS, parse_table_html, render_table_html
+from logging_setup import setup_logging
+from replay import isolated_state
+
+logger = logging.getLogger(__name__)
+
+# Country -> (leagues, towns); team names are built from towns and club suffixes
+COUNTRIES = {
+    'England': (['Premier League', 'Championship', 'League One', 'League Two', 'National League'],
+                ['Arsenal', 'Bolton', 'Bristol', 'Burnley', 'Coventry', 'Derby', 'Exeter', 'Fleetwood',
+                 'Hull', 'Ipswich', 'Leeds', 'Leicester', 'Luton', 'Millwall', 'Norwich', 'Oxford',
+                 'Plymouth', 'Preston', 'Reading', 'Stockport', 'Swindon', 'Walsall', 'Wigan', 'Wrexham']),
+    'Spain': (['La Liga', 'Segunda Division', 'Primera RFEF'],
+              ['Almeria', 'Bilbao', 'Cadiz', 'Elche', 'Getafe', 'Girona', 'Huesca', 'Leganes',
+               'Malaga', 'Mallorca', 'Osasuna', 'Oviedo', 'Sevilla', 'Valencia', 'Vigo', 'Zaragoza']),
+    'Germany': (['Bundesliga', '2. Bundesliga', '3. Liga'],
+                ['Augsburg', 'Bielefeld', 'Bochum', 'Bremen', 'Dresden', 'Freiburg', 'Hamburg',
+                 'Hannover', 'Kiel', 'Koln', 'Mainz', 'Munster', 'Nurnberg', 'Rostock', 'Ulm']),
+    'Italy': (['Serie A', 'Serie B', 'Serie C'],
+              ['Bari', 'Bologna', 'Brescia', 'Cagliari', 'Como', 'Cremona', 'Empoli', 'Genoa',
+               'Lecce', 'Modena', 'Palermo', 'Parma', 'Pisa', 'Salerno', 'Torino', 'Verona']),
+    'France': (['Ligue 1', 'Ligue 2', 'National'],
+               ['Ajaccio', 'Amiens', 'Angers', 'Auxerre', 'Bastia', 'Brest', 'Caen', 'Dijon',
+                'Grenoble', 'Laval', 'Lorient', 'Metz', 'Nantes', 'Pau', 'Reims', 'Rodez']),
+    'Netherlands': (['Eredivisie', 'Eerste Divisie'],
+                    ['Almere', 'Breda', 'Den Bosch', 'Emmen', 'Groningen', 'Heerenveen', 'Helmond',
+                     'Maastricht', 'Nijmegen', 'Tilburg', 'Utrecht', 'Venlo', 'Zwolle']),
+    'Brazil': (['Serie A', 'Serie B'],
+               ['Bahia', 'Belo Horizonte', 'Campinas', 'Curitiba', 'Fortaleza', 'Goiania', 'Recife',
+                'Salvador', 'Santos', 'Sao Paulo', 'Porto Alegre', 'Florianopolis']),
+    'Argentina': (['Primera Division', 'Primera Nacional'],
+                  ['Avellaneda', 'Banfield', 'Cordoba', 'La Plata', 'Lanus', 'Mendoza', 'Rosario',
+                   'Santa Fe', 'Tucuman', 'Quilmes']),
+    'Japan': (['J1 League', 'J2 League'],
+              ['Kashima', 'Kashiwa', 'Kawasaki', 'Kobe', 'Kyoto', 'Nagoya', 'Niigata', 'Osaka',
+               'Sapporo', 'Sendai', 'Tokyo', 'Yokohama']),
+    'Sweden': (['Allsvenskan', 'Superettan'],
+               ['Boras', 'Degerfors', 'Goteborg', 'Halmstad', 'Helsingborg', 'Kalmar', 'Malmo',
+                'Norrkoping', 'Orebro', 'Sundsvall', 'Varberg']),
+}
+
+CLUB_SUFFIXES = ['United', 'City', 'Town', 'Athletic', 'Rovers', 'FC', 'SC', 'Real', 'Sporting', 'Dynamo']
+SQUAD_SUFFIXES = ['', ' II', ' U23', ' Women']
+ANALYSIS_LABELS = ['Home value', 'Away value', 'Over value', 'Under value']
+
+DEFAULT_SIZES = [50, 100, 250, 500, 1000, 2500, 5000]
+REPORT_STAGES = ['scrape', 'parse', 'clean', 'save']
+CHART_MARKERS = {'scrape': 's', 'parse': 'p', 'clean': 'c', 'save': 'w'}
+
+
+def _quarter(value: float) -> float:
+    return round(value * 4) / 4
+
+
+def _fmt(value: float, places: int = 2) -> str:
+    return f"{value:.{places}f}"
+
+
+class Match:
+    """Live state of one synthetic match; renders itself as a raw table row"""
+
+    def __init__(self, rng: random.Random, league: str, hometeam: str, awayteam: str, kickoff: datetime):
+        self.rng = rng
+        self.league = league
+        self.hometeam = hometeam
+        self.awayteam = awayteam
+        self.minute = rng.uniform(1, 90)
+        self.home_goals = rng.choice([0, 0, 0, 1, 1, 2])
+        self.away_goals = rng.choice([0, 0, 1, 1, 2])
+        self.supremacy = rng.gauss(0, 0.8)
+        self.expected_goals = rng.uniform(2.1, 3.2)
+        self.start_line = _quarter(-self.supremacy)
+        self.start_tgs = _quarter(self.expected_goals)
+        self.hdp_price = rng.uniform(1.75, 2.15)
+        self.over_price = rng.uniform(1.75, 2.15)
+        self.updated = kickoff
+        self.noise = [rng.uniform(-1, 1) for _ in range(len(TABLE_COLUMNS))]
+
+    def tick(self, seconds: float, update_rate: float, now: datetime) -> None:
+        """Advance the clock; with probability update_rate the prices and lines move"""
+        self.minute += seconds / 60
+        # ~2.7 goals a match spread over 90 minutes
+        if self.rng.random() < seconds / 60 * 0.03:
+            if self.rng.random() < 0.5 + self.supremacy / 10:
+                self.home_goals += 1
+            else:
+                self.away_goals += 1
+        if self.rng.random() < update_rate:
+            self.hdp_price = min(2.6, max(1.4, self.hdp_price + self.rng.gauss(0, 0.03)))
+            self.over_price = min(2.6, max(1.4, self.over_price + self.rng.gauss(0, 0.03)))
+            self.supremacy += self.rng.gauss(0, 0.05)
+            self.noise = [n + self.rng.gauss(0, 0.05) for n in self.noise]
+            self.updated = now
+
+    @property
+    def finished(self) -> bool:
+        return self.minute > 95
+
+    def row(self) -> Dict[str, Optional[str]]:
+        remaining = max(0.0, (90 - self.minute) / 90)
+        hdp1 = _quarter(-self.supremacy * remaining + (self.away_goals - self.home_goals))
+        goals = self.home_goals + self.away_goals
+        tg1 = _quarter(goals + self.expected_goals * remaining) + 0.25 * (goals % 2)
+        hprice, aprice = self.hdp_price, 1 / max(0.05, 1.04 - 1 / self.hdp_price)
+        over, under = self.over_price, 1 / max(0.05, 1.045 - 1 / self.over_price)
+        modhome = max(1.01, hprice + self.noise[0] * 0.1)
+        modaway = max(1.01, aprice + self.noise[1] * 0.1)
+        modover = max(1.01, over + self.noise[2] * 0.1)
+        modunder = max(1.01, under + self.noise[3] * 0.1)
+        n = self.noise
+
+        row = {
+            'timeupdated': self.updated.strftime('%d/%m/%Y, %H:%M:%S'),
+            'league': self.league,
+            'hometeam': self.hometeam,
+            'awayteam': self.awayteam,
+            'min': str(min(90, int(self.minute))),
+            'score': f"{self.home_goals} - {self.away_goals}",
+            'modsup': _fmt(self.supremacy),
+            'hdp1': str(hdp1), 'hprice': _fmt(hprice, 3), 'aprice': _fmt(aprice, 3),
+            'homehdp1': _fmt(n[4]), 'awayhdp1': _fmt(n[5]),
+            'tg1': str(tg1), 'over_price': _fmt(over, 3), 'under_price': _fmt(under, 3),
+            'overtg1': _fmt(n[6]), 'undertg1': _fmt(n[7]),
+            'hdp1_hval': _fmt(hprice / modhome), 'hdp1_aval': _fmt(aprice / modaway),
+            'tg1_oval': _fmt(over / modover), 'tg1_uval': _fmt(under / modunder),
+            'modhome': _fmt(modhome), 'modaway': _fmt(modaway),
+            'homeperc': _fmt(100 / modhome), 'awayperc': _fmt(100 / modaway),
+            'modtgs': _fmt(goals + self.expected_goals * remaining),
+            'modover': _fmt(modover), 'modunder': _fmt(modunder),
+            'overperc': _fmt(100 / modover), 'underperc': _fmt(100 / modunder),
+            'startline': str(self.start_line), 'start_tgs': str(self.start_tgs),
+            'analysis': None,
+        }
+        for step in (2, 3, 4):
+            row[f'hdp{step}'] = str(hdp1 + 0.25 * (step - 1))
+            row[f'homehdp{step}'] = _fmt(n[4 + 2 * step])
+            row[f'awayhdp{step}'] = _fmt(n[5 + 2 * step])
+            row[f'tg{step}'] = str(tg1 + 0.25 * (step - 1))
+            row[f'overtg{step}'] = _fmt(n[12 + 2 * step])
+            row[f'undertg{step}'] = _fmt(n[13 + 2 * step])
+        best_value = max(row['hdp1_hval'], row['hdp1_aval'], row['tg1_oval'], row['tg1_uval'], key=float)
+        if float(best_value) > 1.04:
+            values = [row['hdp1_hval'], row['hdp1_aval'], row['tg1_oval'], row['tg1_uval']]
+            row['analysis'] = ANALYSIS_LABELS[values.index(best_value)]
+        return row
+
+
+class LoadGenerator:
+    """A fixed-size slate of live matches; finished matches are replaced so the size stays constant"""
+
+    def __init__(self, rows: int = 500, seed: int = 1, update_rate: float = 0.3,
+                 start: Optional[datetime] = None):
+        self.rng = random.Random(seed)
+        self.update_rate = update_rate
+        self.now = start or datetime(2026, 10, 17, 15, 0, 0)
+        self.leagues = [(country, league) for country, (leagues, _) in COUNTRIES.items() for league in leagues]
+        self.used_teams: set = set()
+        self.matches: List[Match] = [self._new_match() for _ in range(rows)]
+
+    def _team(self, country: str) -> str:
+        towns = COUNTRIES[country][1]
+        for _ in range(50):
+            name = f"{self.rng.choice(towns)} {self.rng.choice(CLUB_SUFFIXES)}{self.rng.choice(SQUAD_SUFFIXES)}"
+            if name not in self.used_teams:
+                self.used_teams.add(name)
+                return name
+        # Slate larger than the name pool - fall back to a numbered side
+        name = f"{self.rng.choice(towns)} {len(self.used_teams)}"
+        self.used_teams.add(name)
+        return name
+
+    def _new_match(self) -> Match:
+        country, league = self.rng.choice(self.leagues)
+        return Match(self.rng, f"{country} {league}", self._team(country), self._team(country), self.now)
+
+    def rows(self) -> List[Dict]:
+        return [match.row() for match in self.matches]
+
+    def page(self) -> str:
+        return render_table_html(self.rows())
+
+    def step(self, seconds: float = 30.0) -> List[Dict]:
+        """Advance every match by one scrape interval and return the next snapshot"""
+        self.now += timedelta(seconds=seconds)
+        for i, match in enumerate(self.matches):
+            match.tick(seconds, self.update_rate, self.now)
+            if match.finished:
+                self.used_teams.discard(match.hometeam)
+                self.used_teams.discard(match.awayteam)
+                self.matches[i] = self._new_match()
+                self.matches[i].minute = 1
+        return self.rows()
+
+
+# ----------------------------------------------------------------------
+# Scaling report
+# ----------------------------------------------------------------------
+
+def _time_stage(fn, *args) -> Tuple[float, object]:
+    started = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - started, result
+
+
+def measure_size(scraper, rows: int, seed: int, rtt_ms: float) -> Dict:
+    """Time one scrape -> clean -> save cycle at the given row count"""
+    # Every size starts from an empty write cache with its own state file, like a fresh process
+    scraper.write_caches = {}
+    with isolated_state():
+        return _measure_size(scraper, rows, seed, rtt_ms)
+
+
+def _measure_size(scraper, rows: int, seed: int, rtt_ms: float) -> Dict:
+    from fake_webdriver import FakeWebDriver
+    from fake_supabase import FakeSupabaseClient
+
+    generator = LoadGenerator(rows, seed=seed)
+    client = FakeSupabaseClient()
+    scraper.supabase_client = client
+    # First cycle seeds the table so the measured cycle is mostly updates, like steady state
+    scraper.save_to_supabase(scraper.clean_and_convert_data(generator.rows()), cleaned=True)
+    client.calls.clear()
+
+    page = render_table_html(generator.step())
+    driver = FakeWebDriver(page)
+    scraper.driver = driver
+    # scrape_table_data has fixed settle sleeps; they do not scale with rows, so skip them
+    with mock.patch('time.sleep'):
+        scrape_seconds, scraped = _time_stage(scraper.scrape_table_data)
+    scraper.driver = None
+
+    parse_seconds, parsed = _time_stage(parse_table_html, page)
+    clean_seconds, clean_data = _time_stage(scraper.clean_and_convert_data, scraped)
+    save_seconds, _ = _time_stage(scraper.save_to_supabase, clean_data, True)
+
+    driver_calls = driver.round_trips
+    db_calls = sum(client.calls.values())
+    return {
+        'rows': rows,
+        'scraped': len(scraped),
+        'scrape': scrape_seconds + driver_calls * rtt_ms / 1000,
+        'parse': parse_seconds,
+        'clean': clean_seconds,
+        'save': save_seconds + db_calls * rtt_ms / 1000,
+        'driver_calls': driver_calls,
+        'driver_elements': driver.elements_returned,
+        'db_calls': db_calls,
+    }
+
+
+def fit_exponent(sizes: List[int], seconds: List[float]) -> float:
+    """Least-squares slope of log(time) against log(rows): ~1 linear, ~2 quadratic"""
+    points = [(math.log(n), math.log(t)) for n, t in zip(sizes, seconds) if n > 0 and t > 0]
+    if len(points) < 2:
+        return float('nan')
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if not var_x:
+        return float('nan')
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+
+
+def ascii_chart(results: List[Dict], stages: List[str], width: int = 60, height: int = 16) -> str:
+    """Log-log plot of seconds against rows, one marker letter per stage"""
+    points = [(r['rows'], r[stage], CHART_MARKERS[stage]) for r in results for stage in stages if r[stage] > 0]
+    if not points:
+        return ''
+    xs = [math.log10(p[0]) for p in points]
+    ys = [math.log10(p[1]) for p in points]
+    x_min, x_max = min(xs), max(xs)
+    y_min, y_max = min(ys), max(ys)
+    x_span = (x_max - x_min) or 1
+    y_span = (y_max - y_min) or 1
+
+    grid = [[' '] * width for _ in range(height)]
+    for x, y, (_, _, marker) in zip(xs, ys, points):
+        col = int((x - x_min) / x_span * (width - 1))
+        row = height - 1 - int((y - y_min) / y_span * (height - 1))
+        grid[row][col] = marker if grid[row][col] in (' ', marker) else '*'
+
+    lines = []
+    for i, cells in enumerate(grid):
+        label = ''
+        if i == 0:
+            label = f"{10 ** y_max:.3g}s"
+        elif i == height - 1:
+            label = f"{10 ** y_min:.3g}s"
+        lines.append(f"{label:>9} |{''.join(cells)}")
+    lines.append(' ' * 10 + '+' + '-' * width)
+    lines.append(' ' * 11 + f"{10 ** x_min:.0f} rows" + ' ' * max(1, width - 20) + f"{10 ** x_max:.0f} rows")
+    lines.append(' ' * 11 + '  '.join(f"{CHART_MARKERS[stage]}={stage}" for stage in stages) + '  *=overlap')
+    return '\n'.join(lines)
+
+
+def scaling_report(sizes: List[int], seed: int = 1, rtt_ms: float = 0.0) -> List[Dict]:
+    """Measure every size with the scraper's state files in a temporary directory"""
+    with isolated_state():
+        return _scaling_report(sizes, seed, rtt_ms)
+
+
+def _scaling_report(sizes: List[int], seed: int, rtt_ms: float) -> List[Dict]:
+    from inplay_football_scraper import InPlayFootballScraper
+
+    scraper = InPlayFootballScraper()
+    # Throwaway run so first-use imports (selenium helpers) are not billed to the smallest size
+    measure_size(scraper, min(sizes), seed, rtt_ms)
+    results = []
+    for rows in sizes:
+        result = measure_size(scraper, rows, seed, rtt_ms)
+        results.append(result)
+        print(f"  {rows:>5} rows: " + ', '.join(f"{stage} {result[stage]:.3f}s" for stage in REPORT_STAGES)
+              + f" ({result['driver_calls']} driver calls returning {result['driver_elements']} elements,"
+              f" {result['db_calls']} db calls)")
+    return results
+
+
+def write_csv(results: List[Dict], path: str) -> None:
+    fields = ['rows', 'scraped'] + REPORT_STAGES + ['driver_calls', 'driver_elements', 'db_calls']
+    with open(path, 'w', newline='', encoding='utf-8') as handle:
+        writer = csv.DictWriter(handle, fieldnames=fields, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(results)
+
+
+# ----------------------------------------------------------------------
+# CLI
+# ----------------------------------------------------------------------
+
+def cmd_generate(args) -> int:
+    """Write a stream of snapshots (consumable by replay.py), optionally paced in real time"""
+    generator = LoadGenerator(args.rows, seed=args.seed, update_rate=args.update_rate)
+    os.makedirs(args.out, exist_ok=True)
+    for i in range(args.snapshots):
+        rows = generator.rows() if i == 0 else generator.step(args.interval)
+        path = os.path.join(args.out, f"snapshot_{i:05d}.{args.format}")
+        with open(path, 'w', encoding='utf-8') as handle:
+            if args.format == 'html':
+                handle.write(render_table_html(rows))
+            else:
+                import json
+                json.dump({'captured_at': generator.now.isoformat(), 'rows': rows}, handle)
+        if args.realtime and i + 1 < args.snapshots:
+            time.sleep(args.interval)
+    print(f"✅ Wrote {args.snapshots} snapshots of {args.rows} rows to {args.out}")
+    return 0
+
+
+def cmd_report(args) -> int:
+    sizes = [int(size) for size in args.sizes.split(',')]
+    print(f"📏 Scaling report over {sizes} rows (modelled round trip {args.rtt_ms:g} ms)")
+    results = scaling_report(sizes, seed=args.seed, rtt_ms=args.rtt_ms)
+
+    print()
+    print(ascii_chart(results, REPORT_STAGES))
+    print()
+    worst = 0.0
+    sizes = [r['rows'] for r in results]
+    for stage in REPORT_STAGES + ['driver_calls', 'driver_elements', 'db_calls']:
+        exponent = fit_exponent(sizes, [r[stage] for r in results])
+        flag = '⚠️ super-linear' if exponent > args.max_exponent else '✅'
+        measure = 'time' if stage in REPORT_STAGES else 'count'
+        print(f"{stage:<16} {measure} ~ rows^{exponent:.2f} {flag}")
+        if not math.isnan(exponent):
+            worst = max(worst, exponent)
+
+    if args.csv:
+        write_csv(results, args.csv)
+        print(f"📄 Wrote {args.csv}")
+    return 1 if args.strict and worst > args.max_exponent else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Synthetic in-play load for scaling tests')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    generate = sub.add_parser('generate', help='Write synthetic snapshots to a directory')
+    generate.add_argument('out')
+    generate.add_argument('--rows', type=int, default=500)
+    generate.add_argument('--snapshots', type=int, default=120)
+    generate.add_argument('--interval', type=float, default=30.0, help='Simulated seconds between snapshots')
+    generate.add_argument('--update-rate', type=float, default=0.3, help='Fraction of matches whose prices move per snapshot')
+    generate.add_argument('--format', choices=['html', 'json'], default='html')
+    generate.add_argument('--realtime', action='store_true', help='Sleep the interval between snapshots')
+    generate.add_argument('--seed', type=int, default=1)
+    generate.set_defaults(func=cmd_generate)
+
+    report = sub.add_parser('report', help='Time each stage against row count')
+    report.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)))
+    report.add_argument('--rtt-ms', type=float, default=0.0,
+                        help='Add this latency per WebDriver/Supabase call to model remote round trips')
+    report.add_argument('--max-exponent', type=float, default=1.3)
+    report.add_argument('--strict', action='store_true', help='Exit non-zero when any stage is super-linear')
+    report.add_argument('--csv', help='Also write the measurements to this CSV file')
+    report.add_argument('--seed', type=int, default=1)
+    report.set_defaults(func=cmd_report)
+
+    args = parser.parse_args(argv)
+    setup_logging(level=logging.WARNING)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
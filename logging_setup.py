@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+InPlay Football Logging Setup
+Queue-based logging: callers only enqueue records, a background listener thread
+does the file/console I/O with rotation, optional JSON output carrying the cycle
+id and stage, and rate limiting of repetitive warnings
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import queue
+import atexit
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+from typing import Dict, Optional, Tuple
+
+from scraper_metrics import REGISTRY
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Extra attributes that the JSON formatter copies onto each line when present
+EXTRA_FIELDS = ('stage_seconds', 'rows', 'attempt', 'match_key')
+
+_cycle_id: contextvars.ContextVar = contextvars.ContextVar('cycle_id', default=None)
+_stage: contextvars.ContextVar = contextvars.ContextVar('stage', default=None)
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+
+
+def start_cycle(cycle_id: Optional[str] = None) -> str:
+    """Tag every record logged from this context with a cycle id"""
+    cycle_id = cycle_id or uuid.uuid4().hex[:8]
+    _cycle_id.set(cycle_id)
+    _stage.set(None)
+    return cycle_id
+
+
+def current_cycle() -> Optional[str]:
+    return _cycle_id.get()
+
+
+@contextmanager
+def stage_context(stage: str):
+    """Tag records logged inside the block with the stage name"""
+    token = _stage.set(stage)
+    try:
+        yield
+    finally:
+        _stage.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """Copies the cycle id and stage from contextvars onto the record before it is queued"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.cycle_id = _cycle_id.get()
+        record.stage = _stage.get()
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """Lets at most `burst` records per call site through per `window` seconds
+
+    Only applies to WARNING; progress at INFO (such as the per-stage timings) and
+    errors always pass. When a window closes with suppressed records, the next
+    record from that call site says how many.
+    """
+
+    def __init__(self, burst: int = 5, window: float = 60.0):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self._lock = threading.Lock()
+        # (pathname, lineno) -> [window start, emitted, suppressed]
+        self._sites: Dict[Tuple[str, int], list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno != logging.WARNING or self.burst <= 0:
+            return True
+        now = time.monotonic()
+        key = (record.pathname, record.lineno)
+        with self._lock:
+            site = self._sites.get(key)
+            if site is None or now - site[0] >= self.window:
+                suppressed = site[2] if site else 0
+                self._sites[key] = [now, 1, 0]
+                if suppressed:
+                    record.msg = f"{record.getMessage()} (suppressed {suppressed} similar messages)"
+                    record.args = None
+                return True
+            if site[1] < self.burst:
+                site[1] += 1
+                return True
+            site[2] += 1
+            return False
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line for log shippers"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'ts': self.formatTime(record, '%Y-%m-%dT%H:%M:%S') + f'.{int(record.msecs):03d}',
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        if getattr(record, 'cycle_id', None):
+            payload['cycle_id'] = record.cycle_id
+        if getattr(record, 'stage', None):
+            payload['stage'] = record.stage
+        for field in EXTRA_FIELDS:
+            if hasattr(record, field):
+                payload[field] = getattr(record, field)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload['exc'] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """Never blocks the caller: if the listener falls behind, records are dropped and counted
+
+    Drops are exported as inplay_log_records_dropped_total, and the total is
+    logged when the listener stops.
+    """
+
+    dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _DroppingQueueHandler.dropped += 1
+            REGISTRY.inc('inplay_log_records_dropped_total', {'level': record.levelname},
+                         help_text='Log records dropped because the log queue was full')
+
+
+def _file_handler(log_file: str) -> logging.Handler:
+    """Size-based rotation by default; LOG_ROTATE_WHEN (e.g. 'midnight') switches to time-based"""
+    backup_count = int(os.getenv('LOG_BACKUP_COUNT', '5'))
+    rotate_when = os.getenv('LOG_ROTATE_WHEN')
+    if rotate_when:
+        return TimedRotatingFileHandler(log_file, when=rotate_when, backupCount=backup_count,
+                                        encoding='utf-8', delay=True)
+    max_bytes = int(os.getenv('LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+    return RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count,
+                               encoding='utf-8', delay=True)
+
+
+def setup_logging(log_file: Optional[str] = None, level: int = logging.INFO,
+                  json_format: Optional[bool] = None) -> QueueListener:
+    """Install the queue handler on the root logger, replacing any earlier setup"""
+    global _listener, _queue_handler
+
+    if json_format is None:
+        json_format = os.getenv('LOG_FORMAT', 'text').lower() == 'json'
+    formatter = JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT)
+
+    handlers = [logging.StreamHandler(sys.stderr)]
+    if log_file:
+        handlers.append(_file_handler(log_file))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    root = logging.getLogger()
+    shutdown_logging()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    log_queue: queue.Queue = queue.Queue(maxsize=int(os.getenv('LOG_QUEUE_SIZE', '10000')))
+    _queue_handler = _DroppingQueueHandler(log_queue)
+    _queue_handler.addFilter(ContextFilter())
+    _queue_handler.addFilter(RateLimitFilter(
+        burst=int(os.getenv('LOG_RATE_LIMIT_BURST', '5')),
+        window=float(os.getenv('LOG_RATE_LIMIT_WINDOW', '60')),
+    ))
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread"""
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        if _DroppingQueueHandler.dropped:
+            # Written straight to the handlers: the queue is what overflowed
+            record = logging.LogRecord(__name__, logging.WARNING, __file__, 0,
+                                       f"⚠️ {_DroppingQueueHandler.dropped} log records were dropped "
+                                       f"because the log queue was full (LOG_QUEUE_SIZE)", None, None)
+            for handler in _listener.handlers:
+                handler.handle(record)
+            _DroppingQueueHandler.dropped = 0
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+
+
+atexit.register(shutdown_logging)
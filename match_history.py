@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+InPlay Football History Archive
+Append-only archive of scraped snapshots with match-key and league indexes
+Reads are memory-mapped so a single match lookup never loads the whole day
+"""
+
+import os
+import sys
+import json
+import mmap
+import logging
+import argparse
+from datetime import datetime, timezone
+from typing import List, Dict, Optional, Iterator
+
+from match_identity import match_key
+
+logger = logging.getLogger(__name__)
+
+DATA_FILE = 'snapshots.jsonl'
+INDEX_FILE = 'index.json'
+INDEX_VERSION = 1
+
+# Numeric columns that get a per-match min/max in the index so threshold
+# queries only have to read the matches that can possibly cross
+INDEXED_NUMERIC_COLUMNS = ['hdp1_hval', 'hdp1_aval', 'tg1_oval', 'tg1_uval', 'min']
+
+
+def match_key_for(record: Dict) -> Optional[str]:
+    """Build the match key used across the scraper: hometeam + date part of timeupdated"""
+    return match_key(record.get('hometeam'), record.get('timeupdated'))
+
+
+class HistoryArchive:
+    """Writes snapshots into one append-only JSON-lines file per capture day"""
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    def day_dir(self, day: str) -> str:
+        return os.path.join(self.root_dir, day)
+
+    def append_snapshot(self, rows: List[Dict], captured_at: Optional[datetime] = None) -> int:
+        """Append one cleaned snapshot; returns the number of rows written"""
+        captured_at = captured_at or datetime.now(timezone.utc)
+        day = captured_at.strftime('%Y-%m-%d')
+        stamp = captured_at.isoformat()
+
+        os.makedirs(self.day_dir(day), exist_ok=True)
+        lines = []
+        for row in rows:
+            if not match_key_for(row):
+                continue
+            record = dict(row)
+            record.setdefault('captured_at', stamp)
+            lines.append(json.dumps(record, separators=(',', ':'), default=str))
+
+        if not lines:
+            return 0
+
+        # One write per snapshot keeps rows of a snapshot contiguous on disk
+        with open(os.path.join(self.day_dir(day), DATA_FILE), 'a', encoding='utf-8') as handle:
+            handle.write('\n'.join(lines) + '\n')
+
+        logger.info(f"🗄️ Archived {len(lines)} rows to {day}")
+        return len(lines)
+
+
+class HistoryQuery:
+    """Indexed, memory-mapped lookups over a HistoryArchive directory"""
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+        self._indexes: Dict[str, Dict] = {}
+
+    # ------------------------------------------------------------------
+    # Index maintenance
+    # ------------------------------------------------------------------
+
+    def days(self) -> List[str]:
+        if not os.path.isdir(self.root_dir):
+            return []
+        return sorted(
+            name for name in os.listdir(self.root_dir)
+            if os.path.isfile(os.path.join(self.root_dir, name, DATA_FILE))
+        )
+
+    def _empty_index(self) -> Dict:
+        return {'version': INDEX_VERSION, 'data_size': 0, 'matches': {}, 'leagues': {}, 'ranges': {}}
+
+    def index(self, day: str) -> Dict:
+        """Load the index for a day, extending it over any rows appended since it was built"""
+        day_dir = os.path.join(self.root_dir, day)
+        data_path = os.path.join(day_dir, DATA_FILE)
+        index_path = os.path.join(day_dir, INDEX_FILE)
+
+        if not os.path.exists(data_path):
+            return self._empty_index()
+
+        data_size = os.path.getsize(data_path)
+        index = self._indexes.get(day)
+
+        if index is None and os.path.exists(index_path):
+            try:
+                with open(index_path, 'r', encoding='utf-8') as handle:
+                    index = json.load(handle)
+                if index.get('version') != INDEX_VERSION or index.get('data_size', 0) > data_size:
+                    index = None
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ Ignoring unreadable index for {day}: {e}")
+                index = None
+
+        if index is None:
+            index = self._empty_index()
+
+        if index['data_size'] < data_size:
+            self._extend_index(index, data_path, data_size)
+            tmp_path = index_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as handle:
+                json.dump(index, handle, separators=(',', ':'))
+            os.replace(tmp_path, index_path)
+
+        self._indexes[day] = index
+        return index
+
+    def _extend_index(self, index: Dict, data_path: str, data_size: int) -> None:
+        """Scan only the bytes appended since the index was last written"""
+        matches = index['matches']
+        leagues = index['leagues']
+        ranges = index['ranges']
+        offset = index['data_size']
+
+        with open(data_path, 'rb') as handle:
+            handle.seek(offset)
+            while offset < data_size:
+                line = handle.readline()
+                if not line or not line.endswith(b'\n'):
+                    # Partial trailing line from an in-progress write
+                    break
+                length = len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    offset += length
+                    continue
+
+                key = match_key_for(record)
+                if key:
+                    matches.setdefault(key, []).append([offset, length])
+                    league = record.get('league') or ''
+                    league_keys = leagues.setdefault(league, [])
+                    if key not in league_keys:
+                        league_keys.append(key)
+
+                    match_ranges = ranges.setdefault(key, {})
+                    for column in INDEXED_NUMERIC_COLUMNS:
+                        value = record.get(column)
+                        if not isinstance(value, (int, float)):
+                            continue
+                        bounds = match_ranges.get(column)
+                        if bounds is None:
+                            match_ranges[column] = [value, value]
+                        else:
+                            bounds[0] = min(bounds[0], value)
+                            bounds[1] = max(bounds[1], value)
+
+                offset += length
+
+        index['data_size'] = offset
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _read_spans(self, day: str, spans: List[List[int]]) -> Iterator[Dict]:
+        if not spans:
+            return
+        data_path = os.path.join(self.root_dir, day, DATA_FILE)
+        with open(data_path, 'rb') as handle:
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for offset, length in spans:
+                    yield json.loads(mapped[offset:offset + length])
+
+    def match_ticks(self, match_key: str, days: Optional[List[str]] = None) -> List[Dict]:
+        """Every archived tick for one match, in capture order"""
+        ticks = []
+        for day in days or self.days():
+            spans = self.index(day)['matches'].get(match_key)
+            ticks.extend(self._read_spans(day, spans or []))
+        return ticks
+
+    def league_matches(self, league: str, day: str) -> List[str]:
+        """Match keys seen in a league on a capture day"""
+        return list(self.index(day)['leagues'].get(league, []))
+
+    def leagues(self, day: str) -> List[str]:
+        return sorted(self.index(day)['leagues'])
+
+    def latest_ticks(self, league: str, day: str) -> List[Dict]:
+        """Last archived tick of every match in a league on a capture day"""
+        index = self.index(day)
+        spans = [index['matches'][key][-1] for key in index['leagues'].get(league, [])]
+        return list(self._read_spans(day, spans))
+
+    def crossings(self, column: str, threshold: float, day: str, direction: str = 'up') -> List[Dict]:
+        """Rows where a column crossed the threshold relative to the match's previous tick"""
+        if direction not in ('up', 'down', 'any'):
+            raise ValueError(f"direction must be 'up', 'down' or 'any', got {direction!r}")
+
+        index = self.index(day)
+        pruned = column in INDEXED_NUMERIC_COLUMNS
+        results = []
+
+        for key, spans in index['matches'].items():
+            if pruned:
+                bounds = index['ranges'].get(key, {}).get(column)
+                # Cannot cross if every tick sits on one side of the threshold
+                if bounds is None or not (bounds[0] <= threshold < bounds[1] or bounds[0] < threshold <= bounds[1]):
+                    continue
+
+            previous = None
+            for record in self._read_spans(day, spans):
+                value = record.get(column)
+                if not isinstance(value, (int, float)):
+                    continue
+                if previous is not None:
+                    crossed_up = previous <= threshold < value
+                    crossed_down = previous >= threshold > value
+                    if (direction == 'up' and crossed_up) or (direction == 'down' and crossed_down) or \
+                            (direction == 'any' and (crossed_up or crossed_down)):
+                        results.append(record)
+                previous = value
+
+        return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point for history lookups"""
+    parser = argparse.ArgumentParser(description='Query the archived InPlay Football snapshots')
+    parser.add_argument('--root', default=os.getenv('HISTORY_DIR', 'history'), help='Archive directory')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    match_cmd = commands.add_parser('match', help='Every tick for one match')
+    match_cmd.add_argument('match_key', help='hometeam_dd/mm/yyyy')
+    match_cmd.add_argument('--day', action='append', help='Limit to capture day(s), YYYY-MM-DD')
+
+    league_cmd = commands.add_parser('league', help='Matches in a league on a capture day')
+    league_cmd.add_argument('league')
+    league_cmd.add_argument('day', help='YYYY-MM-DD')
+    league_cmd.add_argument('--latest', action='store_true', help='Print the last tick of each match')
+
+    crossed_cmd = commands.add_parser('crossed', help='Rows where a column crossed a threshold')
+    crossed_cmd.add_argument('column')
+    crossed_cmd.add_argument('threshold', type=float)
+    crossed_cmd.add_argument('day', help='YYYY-MM-DD')
+    crossed_cmd.add_argument('--direction', choices=['up', 'down', 'any'], default='up')
+
+    commands.add_parser('reindex', help='Bring every day index up to date')
+
+    args = parser.parse_args(argv)
+    query = HistoryQuery(args.root)
+
+    if args.command == 'match':
+        rows = query.match_ticks(args.match_key, args.day)
+    elif args.command == 'league':
+        if args.latest:
+            rows = query.latest_ticks(args.league, args.day)
+        else:
+            rows = [{'match_key': key} for key in query.league_matches(args.league, args.day)]
+    elif args.command == 'crossed':
+        rows = query.crossings(args.column, args.threshold, args.day, args.direction)
+    else:
+        rows = []
+        for day in query.days():
+            index = query.index(day)
+            rows.append({'day': day, 'matches': len(index['matches']), 'bytes': index['data_size']})
+
+    for row in rows:
+        sys.stdout.write(json.dumps(row, default=str) + '\n')
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+InPlay Football Match Identity
+Parses each distinct timeupdated once, interns team and league names and keeps
+match keys in a bounded LRU, so rows repeated across cycles share the same objects
+"""
+
+import os
+import sys
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+# Distinct timeupdated strings and match keys remembered; a busy evening has a few hundred matches
+CACHE_SIZE = int(os.getenv('MATCH_IDENTITY_CACHE', '8192'))
+
+# Text columns whose values repeat every cycle and are worth sharing between snapshots
+NAME_COLUMNS = ('league', 'hometeam', 'awayteam')
+
+
+def intern_name(value: Optional[str]) -> Optional[str]:
+    """One shared string per team or league name (interned strings are freed once unused)"""
+    return sys.intern(value) if value else value
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def split_timeupdated(text: str) -> Tuple[str, Optional[int]]:
+    """'19/10/2026, 15:45:37' -> ('19/10/2026', 56737): the interned date and seconds into the day
+
+    The date part is taken exactly as match keys always have (everything before the
+    comma); the time is None when it cannot be read.
+    """
+    date_part, _, clock = text.partition(',')
+    date_part = sys.intern(date_part.strip())
+    try:
+        hours, minutes, seconds = (int(field) for field in clock.strip().split(':'))
+    except ValueError:
+        return date_part, None
+    if not (0 <= hours < 24 and 0 <= minutes < 60 and 0 <= seconds < 60):
+        return date_part, None
+    return date_part, hours * 3600 + minutes * 60 + seconds
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _match_key(hometeam: str, date_part: str) -> str:
+    return sys.intern(f"{hometeam}_{date_part}")
+
+
+def match_key(hometeam: Optional[str], timeupdated: Optional[str]) -> Optional[str]:
+    """hometeam + date part of timeupdated, the key used across the scraper; None without a home team"""
+    if not hometeam:
+        return None
+    return _match_key(hometeam, split_timeupdated(timeupdated)[0] if timeupdated else '')
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def timeupdated_timestamp(text: str, tz=timezone.utc) -> Optional[float]:
+    """Unix time of a timeupdated string read in tz, or None if it is not a valid date and time"""
+    date_part, clock = split_timeupdated(text.strip())
+    if clock is None:
+        return None
+    try:
+        day, month, year = (int(field) for field in date_part.split('/'))
+        # Built from fields so the zone's DST offset for that moment applies
+        moment = datetime(year, month, day, clock // 3600, clock // 60 % 60, clock % 60, tzinfo=tz)
+    except ValueError:
+        return None
+    return moment.timestamp()
+
+
+def cache_info() -> Dict[str, Dict[str, int]]:
+    """Hits, misses and sizes of the identity caches"""
+    return {
+        name: cache.cache_info()._asdict()
+        for name, cache in (('timeupdated', split_timeupdated), ('match_key', _match_key),
+                            ('timestamp', timeupdated_timestamp))
+    }
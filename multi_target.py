@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+InPlay Football Multi-Target Runner
+Scrapes several model tables (URL, tab, table id, columns, destination table)
+from one logged-in Chrome, one browser tab per target, each on its own cadence
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+from typing import Dict, List, Optional
+
+from cycle_supervisor import CycleSupervisor, FailureBackoff, StageDeadlineExceeded
+from logging_setup import setup_logging, start_cycle
+from scraper_metrics import REGISTRY, start_metrics_server
+from table_parser import TABLE_COLUMNS, TABLE_ID, parse_table_html
+
+logger = logging.getLogger(__name__)
+
+
+class ScrapeTarget:
+    """One table to scrape: where it lives, how to read it and where it is written"""
+
+    def __init__(self, name: str, url: str, table_id: str = TABLE_ID, tab: Optional[str] = None,
+                 columns: Optional[List[str]] = None, text_columns: Optional[List[str]] = None,
+                 destination: str = 'inplay_football', interval: float = 30.0):
+        self.name = name
+        self.url = url
+        self.table_id = table_id
+        # CSS selector of the tab to click after each load (None if the table is visible already)
+        self.tab = tab
+        self.columns = columns or list(TABLE_COLUMNS)
+        self.text_columns = text_columns
+        self.destination = destination
+        self.interval = interval
+
+    @classmethod
+    def from_dict(cls, spec: Dict) -> 'ScrapeTarget':
+        unknown = set(spec) - {'name', 'url', 'table_id', 'tab', 'columns', 'text_columns', 'destination', 'interval'}
+        if unknown:
+            raise ValueError(f"Target {spec.get('name')!r}: unknown keys {sorted(unknown)}")
+        return cls(**spec)
+
+
+def load_targets(path: str) -> List[ScrapeTarget]:
+    with open(path, 'r', encoding='utf-8') as handle:
+        targets = [ScrapeTarget.from_dict(spec) for spec in json.load(handle)]
+    names = [target.name for target in targets]
+    if len(set(names)) != len(names):
+        raise ValueError("Target names must be unique")
+    return targets
+
+
+def write_target_rows(scraper, destination: str, clean_data: List[Dict]) -> bool:
+    """Write one target's cleaned snapshot to its destination table"""
+    if not scraper.may_write():
+        logger.info(f"🪑 Standby - not writing {destination}")
+        return True
+    if destination == 'inplay_football':
+        # The primary table keeps its sinks (sqlite mirror, realtime feed, ...)
+        return scraper.save_snapshot(clean_data, new_snapshot=True)
+    if not scraper.supabase_client:
+        scraper.setup_supabase()
+    return scraper.save_to_supabase(clean_data, cleaned=True, table=destination)
+
+
+class MultiTargetRunner:
+    """Keeps one tab per target open in a single logged-in browser and scrapes whichever are due"""
+
+    def __init__(self, scraper, targets: List[ScrapeTarget]):
+        self.scraper = scraper
+        self.targets = targets
+        self.handles: Dict[str, str] = {}
+        self.next_due: Dict[str, float] = {target.name: 0.0 for target in targets}
+        self.backoff: Dict[str, FailureBackoff] = {target.name: FailureBackoff() for target in targets}
+        # Retries are per target (its next slot comes round soon); deadlines still apply,
+        # and an overrun kills the browser rather than racing a second call on the same tab
+        self.supervisor = CycleSupervisor(scraper, max_restarts=0, retries=0)
+
+    def start_browser(self) -> bool:
+        """Fresh Chrome, one login, then a tab per target (cookies are shared between tabs)"""
+        self.scraper.close_driver()
+        self.scraper.setup_driver()
+        if not self.scraper.login():
+            return False
+        driver = self.scraper.driver
+        self.handles = {}
+        for i, target in enumerate(self.targets):
+            if i:
+                driver.switch_to.new_window('tab')
+            self.handles[target.name] = driver.current_window_handle
+            self.scraper.load_page(target.url)
+        logger.info(f"🗂️ Opened {len(self.handles)} target tabs: {', '.join(self.handles)}")
+        return True
+
+    def reload_tabs(self, targets: List[ScrapeTarget]) -> None:
+        """Start every due tab reloading before reading any, so the pages load side by side"""
+        driver = self.scraper.driver
+        for target in targets:
+            driver.switch_to.window(self.handles[target.name])
+            driver.execute_script("window.location.reload();")
+
+    def read_table(self, target: ScrapeTarget) -> List[Dict]:
+        """Switch to the target's tab, open its model tab and read the table in one round trip"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+
+        driver = self.scraper.driver
+        driver.switch_to.window(self.handles[target.name])
+        key = f'target_{target.name}'
+        timeout = self.scraper.wait_timeout(key, 60, 120)
+        wait = WebDriverWait(driver, timeout)
+        rows_selector = f"#{target.table_id} tbody tr"
+
+        with self.scraper.timeouts.measure(key, timeout):
+            if target.tab:
+                tab = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, target.tab)))
+                driver.execute_script("arguments[0].click();", tab)
+            wait.until(lambda d: d.execute_script(
+                "return document.querySelectorAll(arguments[0]).length;", rows_selector))
+
+        html = driver.execute_script("return document.getElementById(arguments[0]).outerHTML;", target.table_id)
+        return parse_table_html(html or '', target.columns, target.table_id)
+
+    def save(self, target: ScrapeTarget, rows: List[Dict]) -> bool:
+        clean_data = [self.scraper.clean_row(row, target.text_columns) for row in rows]
+        return write_target_rows(self.scraper, target.destination, clean_data)
+
+    def scrape_target(self, target: ScrapeTarget) -> bool:
+        started = time.monotonic()
+        labels = {'target': target.name}
+        rows = self.supervisor.run_stage('target_read', self.read_table, target)
+        REGISTRY.set('inplay_target_rows', len(rows), labels, help_text='Rows read from each target in its last cycle')
+        ok = bool(rows) and bool(self.supervisor.run_stage('target_save', self.save, target, rows))
+        duration = time.monotonic() - started
+        REGISTRY.observe('inplay_target_cycle_seconds', duration, labels,
+                         help_text='Read and save time of one target cycle')
+        REGISTRY.inc('inplay_target_cycles_total', {'target': target.name, 'ok': str(ok).lower()},
+                     help_text='Target cycles by outcome')
+        if ok:
+            REGISTRY.set('inplay_target_last_success_timestamp', time.time(), labels,
+                         help_text='Unix time of each target\'s last successful cycle')
+        logger.info(f"{'✅' if ok else '❌'} Target {target.name}: {len(rows)} rows in {duration:.1f}s",
+                    extra={'rows': len(rows)})
+        return ok
+
+    def run_due(self) -> int:
+        """Scrape every target whose slot has come; returns how many were due"""
+        now = time.monotonic()
+        due = [target for target in self.targets if self.next_due[target.name] <= now]
+        if not due:
+            return 0
+        try:
+            if not self.scraper.driver_alive() and not self.start_browser():
+                raise RuntimeError("login failed")
+            self.supervisor.run_stage('target_reload', self.reload_tabs, due)
+        except Exception as e:
+            logger.error(f"❌ Could not prepare the browser ({e}) - retrying shortly")
+            self.scraper.close_driver()
+            for target in due:
+                self.next_due[target.name] = now + self.backoff[target.name].failed()
+            return len(due)
+
+        for target in due:
+            start_cycle(f"{target.name}-{int(time.time())}")
+            try:
+                ok = self.scrape_target(target)
+            except StageDeadlineExceeded as e:
+                logger.error(f"❌ Target {target.name}: {e} - restarting the browser")
+                self.supervisor.kill_browser()
+                ok = False
+            except Exception as e:
+                logger.error(f"❌ Target {target.name} failed: {e}")
+                ok = False
+            if ok:
+                self.backoff[target.name].succeeded()
+                self.next_due[target.name] = now + target.interval
+            else:
+                self.next_due[target.name] = time.monotonic() + self.backoff[target.name].failed()
+            if not self.scraper.driver_alive():
+                # Remaining due targets wait for the next pass, which starts a fresh browser
+                break
+        return len(due)
+
+    def run_forever(self) -> None:
+        while True:
+            self.run_due()
+            wait = min(self.next_due.values()) - time.monotonic()
+            if wait > 0:
+                time.sleep(min(wait, 5.0))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Scrape several model tables from one browser')
+    parser.add_argument('targets', nargs='?', default=os.getenv('TARGETS_FILE', 'targets.json'),
+                        help='JSON list of targets (see targets.example.json)')
+    args = parser.parse_args(argv)
+
+    setup_logging('multi_target.log')
+    from inplay_football_scraper import InPlayFootballScraper
+
+    targets = load_targets(args.targets)
+    if os.getenv('METRICS_PORT'):
+        start_metrics_server(int(os.getenv('METRICS_PORT')))
+    scraper = InPlayFootballScraper()
+    runner = MultiTargetRunner(scraper, targets)
+    logger.info("🚀 Multi-target mode: " + ', '.join(f"{t.name} every {t.interval:g}s -> {t.destination}"
+                                                     for t in targets))
+    try:
+        runner.run_forever()
+    except KeyboardInterrupt:
+        logger.info("🛑 Stopping multi-target runner")
+    finally:
+        scraper.timeouts.save()
+        scraper.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+InPlay Football Realtime Feed
+Publishes each cycle's diff (inserted, updated with per-column deltas, removed)
+as Server-Sent Events, with a replay buffer so reconnecting clients catch up
+"""
+
+import json
+import time
+import queue
+import logging
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from scraper_metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+KEEPALIVE_SECONDS = 15
+
+
+class Subscriber:
+    """One connected client: a bounded queue of encoded events"""
+
+    def __init__(self, max_pending: int):
+        self.events: queue.Queue = queue.Queue(maxsize=max_pending)
+        # Set when the client fell too far behind; it is disconnected and replays on reconnect
+        self.lagging = False
+
+
+class ChangeFeed:
+    """Numbered events, a replay buffer of the last `replay_size` and the live subscribers"""
+
+    def __init__(self, replay_size: int = 100, max_pending: int = 50):
+        self.replay: Deque[Tuple[int, bytes]] = deque(maxlen=replay_size)
+        self.max_pending = max_pending
+        self.subscribers: List[Subscriber] = []
+        self.last_id = 0
+        # Latest full snapshot by match key, served from /snapshot so new clients can bootstrap
+        self.snapshot: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def encode(event_id: int, event: str, payload: Dict) -> bytes:
+        data = json.dumps(payload, separators=(',', ':'), default=str)
+        return f"id: {event_id}\nevent: {event}\ndata: {data}\n\n".encode('utf-8')
+
+    def publish(self, event: str, payload: Dict) -> int:
+        """Encode once and hand the same bytes to every subscriber; returns the event id"""
+        with self._lock:
+            self.last_id += 1
+            message = self.encode(self.last_id, event, payload)
+            self.replay.append((self.last_id, message))
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.events.put_nowait(message)
+            except queue.Full:
+                subscriber.lagging = True
+        REGISTRY.inc('inplay_realtime_events_total', {'event': event},
+                     help_text='Events published on the realtime feed')
+        return self.last_id
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> Tuple[Subscriber, List[bytes]]:
+        """Register a client; returns it with the buffered events after last_event_id
+
+        If last_event_id is older than the buffer, the backlog starts with a 'reset'
+        event telling the client to reload /snapshot.
+        """
+        subscriber = Subscriber(self.max_pending)
+        with self._lock:
+            backlog = []
+            if last_event_id is not None and last_event_id < self.last_id:
+                oldest = self.replay[0][0] if self.replay else self.last_id + 1
+                if last_event_id < oldest - 1:
+                    backlog.append(self.encode(self.last_id, 'reset', {'reason': 'replay buffer exceeded'}))
+                else:
+                    backlog.extend(message for event_id, message in self.replay if event_id > last_event_id)
+            self.subscribers.append(subscriber)
+            count = len(self.subscribers)
+        REGISTRY.set('inplay_realtime_subscribers', count, help_text='Clients connected to the realtime feed')
+        return subscriber, backlog
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        with self._lock:
+            if subscriber in self.subscribers:
+                self.subscribers.remove(subscriber)
+            count = len(self.subscribers)
+        REGISTRY.set('inplay_realtime_subscribers', count, help_text='Clients connected to the realtime feed')
+
+    def publish_diff(self, diff, rows: List[Dict], cycle_id: Optional[str] = None) -> Optional[int]:
+        """Publish a DiffResult as a 'diff' event; nothing is sent for an unchanged snapshot"""
+        from match_history import match_key_for
+
+        with self._lock:
+            self.snapshot = {key: row for key, row in ((match_key_for(row), row) for row in rows) if key}
+        if not (diff.inserted or diff.updated or diff.removed):
+            return None
+        # Updated matches carry only their changed columns; clients apply them to /snapshot
+        payload = {
+            'published_at': time.time(),
+            'cycle_id': cycle_id,
+            'summary': diff.summary(),
+            'inserted': list(diff.inserted.values()),
+            'updated': [{'key': key, 'deltas': {column: list(pair) for column, pair in diff.deltas[key].items()}}
+                        for key in diff.updated],
+            'removed': list(diff.removed),
+        }
+        return self.publish('diff', payload)
+
+
+def start_feed_server(feed: ChangeFeed, port: int, host: str = '0.0.0.0'):
+    """Serve /events (SSE) and /snapshot from daemon threads, one per connected client"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class FeedServer(ThreadingHTTPServer):
+        # Hundreds of clients reconnect at once after a restart
+        request_queue_size = 256
+        daemon_threads = True
+
+    class FeedHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == '/snapshot':
+                self._send_snapshot()
+            elif url.path == '/events':
+                self._stream(url)
+            else:
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+        def _send_snapshot(self):
+            with feed._lock:
+                body = json.dumps({'last_event_id': feed.last_id, 'rows': list(feed.snapshot.values())},
+                                  separators=(',', ':'), default=str).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _stream(self, url):
+            since = self.headers.get('Last-Event-ID') or parse_qs(url.query).get('last_event_id', [None])[0]
+            try:
+                last_event_id = int(since) if since is not None else None
+            except ValueError:
+                last_event_id = None
+
+            subscriber, backlog = feed.subscribe(last_event_id)
+            try:
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Cache-Control', 'no-cache')
+                self.send_header('Connection', 'close')
+                self.end_headers()
+                self.wfile.write(b'retry: 2000\n\n' + b''.join(backlog))
+                self.wfile.flush()
+                while not subscriber.lagging:
+                    try:
+                        message = subscriber.events.get(timeout=KEEPALIVE_SECONDS)
+                    except queue.Empty:
+                        message = b': keep-alive\n\n'
+                    self.wfile.write(message)
+                    self.wfile.flush()
+                REGISTRY.inc('inplay_realtime_lagging_disconnects_total',
+                             help_text='Clients disconnected for falling behind the realtime feed')
+            except (BrokenPipeError, ConnectionResetError, OSError):
+                pass
+            finally:
+                feed.unsubscribe(subscriber)
+                self.close_connection = True
+
+        def log_message(self, format, *args):
+            pass
+
+    server = FeedServer((host, port), FeedHandler)
+    thread = threading.Thread(target=server.serve_forever, name='realtime-http', daemon=True)
+    thread.start()
+    logger.info(f"📡 Realtime feed on http://{host}:{server.server_address[1]}/events")
+    return server
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+InPlay Football Realtime Load Test
+Runs the realtime feed in-process, connects hundreds of SSE subscribers and
+publishes synthetic diffs, reporting delivery latency, missed events and reconnects
+"""
+
+import sys
+import time
+import random
+import logging
+import argparse
+import http.client
+import threading
+from typing import Dict, List, Optional
+
+from logging_setup import setup_logging
+
+logger = logging.getLogger(__name__)
+
+
+class TestSubscriber(threading.Thread):
+    """Reads the event stream, recording latency per event; optionally drops once and resumes"""
+
+    def __init__(self, port: int, expected: int, reconnect_after: Optional[int] = None):
+        super().__init__(daemon=True)
+        self.port = port
+        self.expected = expected
+        self.reconnect_after = reconnect_after
+        self.latencies: List[float] = []
+        self.seen: set = set()
+        self.last_event_id: Optional[int] = None
+        self.reconnects = 0
+        self.resets = 0
+        self.error: Optional[str] = None
+        self.connected = threading.Event()
+
+    def _connect(self):
+        conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=30)
+        headers = {'Accept': 'text/event-stream'}
+        if self.last_event_id is not None:
+            headers['Last-Event-ID'] = str(self.last_event_id)
+        conn.request('GET', '/events', headers=headers)
+        response = conn.getresponse()
+        self.connected.set()
+        return conn, response
+
+    def run(self):
+        try:
+            conn, response = self._connect()
+            event_id, event, data = None, None, None
+            while len(self.seen) < self.expected:
+                line = response.readline()
+                if not line:
+                    # Server disconnected us (lagging); resume from the last id
+                    conn.close()
+                    self.reconnects += 1
+                    conn, response = self._connect()
+                    continue
+                # Only the leading published_at is decoded: the client must not be the bottleneck
+                if line.startswith(b'id: '):
+                    event_id = int(line[4:])
+                elif line.startswith(b'event: '):
+                    event = line[7:].strip()
+                elif line.startswith(b'data: '):
+                    data = line
+                elif line.strip() == b'' and data is not None:
+                    if event == b'diff':
+                        stamp = data[len(b'data: {"published_at":'):data.index(b',')]
+                        self.latencies.append(time.time() - float(stamp))
+                        self.seen.add(event_id)
+                    elif event == b'reset':
+                        self.resets += 1
+                    self.last_event_id = event_id
+                    event_id, event, data = None, None, None
+                    if self.reconnect_after is not None and len(self.seen) == self.reconnect_after:
+                        self.reconnect_after = None
+                        conn.close()
+                        self.reconnects += 1
+                        conn, response = self._connect()
+            conn.close()
+        except Exception as e:
+            self.error = str(e)
+            self.connected.set()
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run_load_test(subscribers: int, events: int, rows: int, interval: float,
+                  reconnect_fraction: float, seed: int = 1) -> Dict:
+    from load_generator import LoadGenerator
+    from realtime_feed import ChangeFeed, start_feed_server
+    from snapshot_diff import SnapshotDiff
+
+    feed = ChangeFeed(replay_size=max(100, events))
+    server = start_feed_server(feed, 0, host='127.0.0.1')
+    port = server.server_address[1]
+    generator = LoadGenerator(rows, seed=seed)
+    differ = SnapshotDiff()
+    differ.diff(generator.rows())
+
+    rng = random.Random(seed)
+    clients = []
+    for _ in range(subscribers):
+        reconnect_after = rng.randint(1, max(1, events - 1)) if rng.random() < reconnect_fraction else None
+        clients.append(TestSubscriber(port, events, reconnect_after))
+    started = time.monotonic()
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.connected.wait(30)
+    connect_seconds = time.monotonic() - started
+
+    publish_times = []
+    payload_bytes = 0
+    published = 0
+    while published < events:
+        snapshot = generator.step()
+        diff = differ.diff(snapshot)
+        began = time.perf_counter()
+        event_id = feed.publish_diff(diff, snapshot, cycle_id=f'load-{published}')
+        if event_id is None:
+            continue
+        publish_times.append(time.perf_counter() - began)
+        payload_bytes += len(feed.replay[-1][1])
+        published += 1
+        time.sleep(interval)
+
+    for client in clients:
+        client.join(timeout=30)
+    server.shutdown()
+    server.server_close()
+
+    latencies = [latency for client in clients for latency in client.latencies]
+    return {
+        'subscribers': subscribers,
+        'events': events,
+        'connect_seconds': connect_seconds,
+        'errors': sum(1 for client in clients if client.error),
+        'missed': sum(events - len(client.seen) for client in clients),
+        'reconnects': sum(client.reconnects for client in clients),
+        'resets': sum(client.resets for client in clients),
+        'delivered': len(latencies),
+        'avg_event_bytes': payload_bytes / max(1, published),
+        'publish_ms_p99': percentile(publish_times, 0.99) * 1000,
+        'latency_ms_p50': percentile(latencies, 0.50) * 1000,
+        'latency_ms_p99': percentile(latencies, 0.99) * 1000,
+        'latency_ms_max': max(latencies, default=float('nan')) * 1000,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Load test the realtime SSE feed')
+    parser.add_argument('--subscribers', type=int, default=300)
+    parser.add_argument('--events', type=int, default=20)
+    parser.add_argument('--rows', type=int, default=300, help='Live matches in the synthetic table')
+    parser.add_argument('--interval', type=float, default=0.5, help='Seconds between published diffs')
+    parser.add_argument('--reconnect-fraction', type=float, default=0.1,
+                        help='Share of subscribers that drop once mid-test and resume with Last-Event-ID')
+    parser.add_argument('--max-p99-ms', type=float, default=250.0)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args(argv)
+    setup_logging(level=logging.WARNING)
+
+    print(f"📡 {args.subscribers} subscribers, {args.events} diffs of a {args.rows}-row table "
+          f"every {args.interval:g}s")
+    result = run_load_test(args.subscribers, args.events, args.rows, args.interval,
+                           args.reconnect_fraction, args.seed)
+    print(f"  connected in {result['connect_seconds']:.2f}s, {result['errors']} client errors")
+    print(f"  delivered {result['delivered']} events ({result['avg_event_bytes'] / 1024:.1f} KiB each), "
+          f"missed {result['missed']}, {result['reconnects']} reconnects, {result['resets']} resets")
+    print(f"  publish p99 {result['publish_ms_p99']:.2f} ms; delivery latency p50 "
+          f"{result['latency_ms_p50']:.1f} ms, p99 {result['latency_ms_p99']:.1f} ms, "
+          f"max {result['latency_ms_max']:.1f} ms")
+
+    ok = result['missed'] == 0 and result['errors'] == 0 and result['latency_ms_p99'] <= args.max_p99_ms
+    print('✅ Feed kept up' if ok else '❌ Feed fell behind')
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+InPlay Football Replay
+Pushes a directory of captured #fulltimemodelraw snapshots (HTML, JSON or a history
+archive's JSON lines) through parse, clean, diff and a sink at full speed, reporting
+rows/s per stage - for backfilling history and load-testing the write path offline
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from table_parser import parse_table_html
+from snapshot_diff import SnapshotDiff
+from match_history import HistoryArchive
+from logging_setup import setup_logging
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_EXTENSIONS = ('.html', '.htm', '.json', '.jsonl')
+SINKS = ('null', 'fake', 'sqlite')
+STAGES = ('load', 'parse', 'clean', 'diff', 'archive', 'save')
+
+# State files the scraper keeps next to a live deployment; replay writes its own copies
+# elsewhere so fake row ids never reach a production write cache
+STATE_FILES = {
+    'WRITE_CACHE_STATE': 'write_cache.json',
+    'ADAPTIVE_STATE': 'adaptive_timeouts.json',
+    'ANALYTICS_STATE': 'analytics_state.npz',
+    'DIFF_STATE': 'snapshot_state.json',
+    'ALERT_STATE': 'alert_state.json',
+    'SUPABASE_SPOOL': 'supabase_spool.jsonl',
+}
+
+
+class Snapshot:
+    """One captured table: raw HTML or already-extracted rows"""
+
+    def __init__(self, source: str, captured_at: datetime, html: Optional[str] = None,
+                 rows: Optional[List[Dict]] = None):
+        self.source = source
+        self.captured_at = captured_at
+        self.html = html
+        self.rows = rows
+
+
+def _parse_time(value: Optional[str], fallback: datetime) -> datetime:
+    if not value:
+        return fallback
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return fallback
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _strip_captured_at(rows: List[Dict]) -> List[Dict]:
+    return [{k: v for k, v in row.items() if k != 'captured_at'} for row in rows]
+
+
+def _snapshot_files(path: str) -> List[str]:
+    if os.path.isfile(path):
+        return [path]
+    files = []
+    for root, _, names in os.walk(path):
+        for name in names:
+            if name.endswith(SNAPSHOT_EXTENSIONS):
+                files.append(os.path.join(root, name))
+    return sorted(files)
+
+
+def iter_snapshots(path: str) -> Iterator[Snapshot]:
+    """Snapshots in capture order; archive .jsonl files are split on captured_at"""
+    for file_path in _snapshot_files(path):
+        mtime = datetime.fromtimestamp(os.path.getmtime(file_path), timezone.utc)
+        with open(file_path, 'r', encoding='utf-8') as handle:
+            if file_path.endswith(('.html', '.htm')):
+                yield Snapshot(file_path, mtime, html=handle.read())
+
+            elif file_path.endswith('.jsonl'):
+                stamp, rows = None, []
+                for line in handle:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    if rows and record.get('captured_at') != stamp:
+                        yield Snapshot(file_path, _parse_time(stamp, mtime), rows=_strip_captured_at(rows))
+                        rows = []
+                    stamp = record.get('captured_at')
+                    rows.append(record)
+                if rows:
+                    yield Snapshot(file_path, _parse_time(stamp, mtime), rows=_strip_captured_at(rows))
+
+            else:
+                payload = json.load(handle)
+                if isinstance(payload, dict):
+                    captured_at = _parse_time(payload.get('captured_at'), mtime)
+                    payload = payload.get('rows', [])
+                else:
+                    captured_at = mtime
+                yield Snapshot(file_path, captured_at, rows=_strip_captured_at(payload))
+
+
+class StageTimer:
+    """Accumulates wall time and row counts per stage"""
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = {stage: 0.0 for stage in STAGES}
+        self.rows: Dict[str, int] = {stage: 0 for stage in STAGES}
+
+    def add(self, stage: str, started: float, rows: int) -> None:
+        self.seconds[stage] += time.perf_counter() - started
+        self.rows[stage] += rows
+
+    def report(self) -> List[Tuple[str, int, float, float]]:
+        return [
+            (stage, self.rows[stage], self.seconds[stage],
+             self.rows[stage] / self.seconds[stage] if self.seconds[stage] else 0.0)
+            for stage in STAGES if self.rows[stage]
+        ]
+
+
+def make_client(sink: str, sqlite_path: str):
+    """Client the scraper's save path writes to; None for the null sink"""
+    if sink == 'null':
+        return None
+    from fake_supabase import FakeSupabaseClient
+    return FakeSupabaseClient(sqlite_path if sink == 'sqlite' else None)
+
+
+@contextmanager
+def isolated_state():
+    """Point the scraper's state files at a temporary directory for the duration"""
+    saved = {name: os.environ.get(name) for name in STATE_FILES}
+    with tempfile.TemporaryDirectory(prefix='replay-state-') as state_dir:
+        os.environ.update({name: os.path.join(state_dir, filename) for name, filename in STATE_FILES.items()})
+        try:
+            yield state_dir
+        finally:
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+
+def replay(path: str, sink: str = 'null', sqlite_path: str = 'replay.sqlite3',
+           history_dir: Optional[str] = None, limit: Optional[int] = None) -> Dict:
+    """Run every snapshot under path through the pipeline; returns the timing summary"""
+    with isolated_state():
+        return _replay(path, sink, sqlite_path, history_dir, limit)
+
+
+def _replay(path: str, sink: str, sqlite_path: str, history_dir: Optional[str], limit: Optional[int]) -> Dict:
+    from inplay_football_scraper import InPlayFootballScraper
+
+    scraper = InPlayFootballScraper()
+    scraper.supabase_client = make_client(sink, sqlite_path)
+    differ = SnapshotDiff()
+    archive = HistoryArchive(history_dir) if history_dir else None
+    timer = StageTimer()
+
+    snapshots = 0
+    failed_saves = 0
+    first_capture = last_capture = None
+    started_all = time.perf_counter()
+
+    started = time.perf_counter()
+    for snapshot in iter_snapshots(path):
+        timer.add('load', started, len(snapshot.rows or []))
+
+        if snapshot.html is not None:
+            started = time.perf_counter()
+            snapshot.rows = parse_table_html(snapshot.html)
+            timer.add('parse', started, len(snapshot.rows))
+            timer.rows['load'] += len(snapshot.rows)
+
+        started = time.perf_counter()
+        clean_data = scraper.clean_and_convert_data(snapshot.rows)
+        timer.add('clean', started, len(clean_data))
+
+        started = time.perf_counter()
+        diff = differ.diff(clean_data)
+        timer.add('diff', started, len(clean_data))
+        logger.debug(f"🔁 {snapshot.source}: {diff.summary()}")
+
+        if archive:
+            started = time.perf_counter()
+            archive.append_snapshot(clean_data, captured_at=snapshot.captured_at)
+            timer.add('archive', started, len(clean_data))
+
+        if scraper.supabase_client is not None:
+            started = time.perf_counter()
+            if not scraper.save_to_supabase(clean_data, cleaned=True):
+                failed_saves += 1
+            timer.add('save', started, len(clean_data))
+
+        snapshots += 1
+        first_capture = first_capture or snapshot.captured_at
+        last_capture = snapshot.captured_at
+        if limit and snapshots >= limit:
+            break
+        started = time.perf_counter()
+
+    elapsed = time.perf_counter() - started_all
+    calls = dict(getattr(scraper.supabase_client, 'calls', {}))
+    if scraper.supabase_client is not None:
+        scraper.supabase_client.close()
+    scraper.close()
+
+    captured_span = (last_capture - first_capture).total_seconds() if snapshots > 1 else 0.0
+    return {
+        'snapshots': snapshots,
+        'elapsed': elapsed,
+        'captured_span': captured_span,
+        'failed_saves': failed_saves,
+        'calls': calls,
+        'stages': timer.report(),
+    }
+
+
+def print_report(summary: Dict, sink: str) -> None:
+    print(f"🔁 Replayed {summary['snapshots']} snapshots in {summary['elapsed']:.2f}s (sink: {sink})")
+    if summary['captured_span'] >= 1 and summary['elapsed']:
+        print(f"⏩ {summary['captured_span'] / summary['elapsed']:.0f}x real time "
+              f"({summary['captured_span'] / 3600:.1f} h of captures)")
+    print(f"{'stage':<10}{'rows':>10}{'seconds':>10}{'rows/s':>12}")
+    for stage, rows, seconds, rate in summary['stages']:
+        print(f"{stage:<10}{rows:>10}{seconds:>10.3f}{rate:>12.0f}")
+    if summary['calls']:
+        print("📞 Client calls: " + ', '.join(f"{op}={n}" for op, n in sorted(summary['calls'].items())))
+    if summary['failed_saves']:
+        print(f"⚠️ {summary['failed_saves']} snapshots failed to save")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Replay captured table snapshots through the scraper pipeline')
+    parser.add_argument('path', help='Snapshot file or directory (.html, .json, or history .jsonl)')
+    parser.add_argument('--sink', choices=SINKS, default='null',
+                        help='null: no writes; fake: in-memory Supabase; sqlite: Supabase stand-in on disk')
+    parser.add_argument('--sqlite-path', default='replay.sqlite3')
+    parser.add_argument('--history-dir', help='Backfill a history archive with the replayed snapshots')
+    parser.add_argument('--limit', type=int, help='Stop after this many snapshots')
+    parser.add_argument('--verbose', action='store_true', help='Show the scraper\'s per-snapshot logging')
+    args = parser.parse_args(argv)
+
+    setup_logging(level=logging.DEBUG if args.verbose else logging.WARNING)
+
+    if not _snapshot_files(args.path):
+        print(f"❌ No snapshots found under {args.path}")
+        return 1
+
+    summary = replay(args.path, args.sink, args.sqlite_path, args.history_dir, args.limit)
+    print_report(summary, args.sink)
+    return 0 if summary['snapshots'] and not summary['failed_saves'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
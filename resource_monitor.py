@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+InPlay Football Resource Monitor
+Tracks resident memory of the Python process and the browser process tree and
+decides when a long-lived driver should be recycled between cycles
+"""
+
+import os
+import logging
+from typing import Dict, Optional
+
+import psutil
+
+from scraper_metrics import REGISTRY
+from cycle_supervisor import browser_pid
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+def process_rss(pid: Optional[int] = None) -> int:
+    """Resident set size of one process in bytes (this process by default)"""
+    try:
+        return psutil.Process(pid or os.getpid()).memory_info().rss
+    except psutil.Error:
+        return 0
+
+
+def process_tree_rss(pid: int) -> int:
+    """Resident set size of a process and all of its descendants in bytes"""
+    try:
+        root = psutil.Process(pid)
+        processes = [root] + root.children(recursive=True)
+    except psutil.Error:
+        return 0
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            continue
+    return total
+
+
+class ResourceMonitor:
+    """Samples RSS after each cycle and applies the browser recycling policy"""
+
+    def __init__(self, max_cycles: Optional[int] = None, browser_rss_ceiling_mb: Optional[float] = None):
+        # Recycle the driver after this many cycles on the same browser (0 disables)
+        self.max_cycles = int(os.getenv('BROWSER_MAX_CYCLES', '200')) if max_cycles is None else max_cycles
+        # ... or as soon as the browser tree crosses this many MB (0 disables)
+        self.browser_rss_ceiling_mb = (float(os.getenv('BROWSER_RSS_CEILING_MB', '1024'))
+                                       if browser_rss_ceiling_mb is None else browser_rss_ceiling_mb)
+        self.cycles_on_browser = 0
+        self.recycles = 0
+
+    def sample(self, driver=None) -> Dict[str, float]:
+        """Current RSS of Python and the browser tree in MB, also exported as gauges"""
+        python_mb = process_rss() / MB
+        pid = browser_pid(driver) if driver else None
+        browser_mb = process_tree_rss(pid) / MB if pid else 0.0
+
+        REGISTRY.set('inplay_python_rss_mb', python_mb, help_text='Resident memory of the scraper process')
+        REGISTRY.set('inplay_browser_rss_mb', browser_mb, help_text='Resident memory of chromedriver and Chrome')
+        return {'python_rss_mb': python_mb, 'browser_rss_mb': browser_mb}
+
+    def after_cycle(self, driver=None) -> Optional[str]:
+        """Record a finished cycle; returns why the driver should be recycled now, if it should"""
+        self.cycles_on_browser += 1 if driver else 0
+        sample = self.sample(driver)
+        logger.info(f"🧠 RSS - Python {sample['python_rss_mb']:.0f} MB, browser {sample['browser_rss_mb']:.0f} MB "
+                    f"after {self.cycles_on_browser} cycles on this browser")
+
+        if not driver:
+            return None
+        return self.recycle_reason(self.cycles_on_browser, sample['browser_rss_mb'])
+
+    def recycle_reason(self, cycles: int, browser_mb: float) -> Optional[str]:
+        """Why a browser used for this many cycles at this RSS should be recycled, if it should"""
+        if self.max_cycles and cycles >= self.max_cycles:
+            return f"{cycles} cycles on this browser"
+        if self.browser_rss_ceiling_mb and browser_mb >= self.browser_rss_ceiling_mb:
+            return f"browser RSS {browser_mb:.0f} MB >= {self.browser_rss_ceiling_mb:.0f} MB"
+        return None
+
+    def recycled(self, reason: str) -> None:
+        self.cycles_on_browser = 0
+        self.recycles += 1
+        REGISTRY.inc('inplay_browser_recycles_total', help_text='Drivers recycled between cycles')
+        logger.info(f"♻️ Recycled browser ({reason})")
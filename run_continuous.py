@@ -4,20 +4,18 @@ Simple Continuous Runner for InPlay Football Scraper
 Runs the scraper directly in a loop with instant restart
 """
 
+import os
 import time
 import logging
 from datetime import datetime
 from inplay_football_scraper import InPlayFootballScraper
+from scraper_metrics import start_metrics_server
+from resource_monitor import ResourceMonitor
+from cycle_supervisor import FailureBackoff
+from logging_setup import setup_logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('continuous_scraper.log'),
-        logging.StreamHandler()
-    ]
-)
+# Configure logging: I/O happens on a background listener thread (see logging_setup.py)
+setup_logging('continuous_scraper.log')
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +28,17 @@ def run_continuously():
     logger.info("🔄 Press Ctrl+C to stop")
     logger.info("=" * 60)
     
+    # Stage durations, deadline fires and restarts are exported from this process
+    if os.getenv('METRICS_PORT'):
+        start_metrics_server(int(os.getenv('METRICS_PORT')))
+    
+    # One scraper for the whole run: the logged-in browser is kept between cycles
+    # and recycled (between cycles only) after N cycles or past an RSS ceiling
+    scraper = InPlayFootballScraper()
+    monitor = ResourceMonitor()
+    # Stages already retry in place; a failed cycle waits seconds, not a flat 30 s
+    backoff = FailureBackoff()
+    
     while True:
         run_count += 1
         start_time = datetime.now()
@@ -37,19 +46,27 @@ def run_continuously():
         try:
             logger.info(f"🎯 Starting scraper run #{run_count} at {start_time.strftime('%H:%M:%S')}")
             
-            # Create and run scraper directly
-            scraper = InPlayFootballScraper()
-            success = scraper.run_scraper()
+            success = scraper.run_scraper(keep_browser=True)
             
             end_time = datetime.now()
             duration = (end_time - start_time).total_seconds()
             
+            recycle_reason = monitor.after_cycle(scraper.driver)
+            if recycle_reason:
+                scraper.close_driver()
+                monitor.recycled(recycle_reason)
+            
             if success:
+                backoff.succeeded()
                 logger.info(f"✅ Run #{run_count} completed successfully in {duration:.1f} seconds")
             else:
+                delay = backoff.failed()
+                if scraper.driver is None and scraper.hot_spare and scraper.hot_spare.ready:
+                    # The failed browser was dropped and a logged-in spare is waiting
+                    delay = 0
                 logger.error(f"❌ Run #{run_count} failed after {duration:.1f} seconds")
-                logger.info("⏳ Waiting 30 seconds before retry...")
-                time.sleep(30)
+                logger.info(f"⏳ Waiting {delay:.1f} seconds before retry...")
+                time.sleep(delay)
                 continue
             
             # Instant restart (1 second delay)
@@ -59,12 +76,16 @@ def run_continuously():
             
         except KeyboardInterrupt:
             logger.info("🛑 Received interrupt signal - stopping continuous runner")
+            if scraper.lease:
+                scraper.lease.release()
+            scraper.close()
             break
             
         except Exception as e:
+            delay = backoff.failed()
             logger.error(f"❌ Unexpected error in run #{run_count}: {e}")
-            logger.info("⏳ Waiting 30 seconds before retry...")
-            time.sleep(30)
+            logger.info(f"⏳ Waiting {delay:.1f} seconds before retry...")
+            time.sleep(delay)
             continue
 
 if __name__ == "__main__":
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+InPlay Football Scraper Metrics
+Small thread-safe counter/gauge/histogram registry with Prometheus text export,
+an optional /metrics HTTP endpoint and a state file for one-process-per-cycle runs
+"""
+
+import os
+import json
+import bisect
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300]
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Optional[Dict[str, str]]) -> LabelKey:
+    return tuple(sorted((str(k), str(v)) for k, v in (labels or {}).items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    body = ','.join(f'{k}="{v}"' for k, v in pairs)
+    return '{' + body + '}'
+
+
+class MetricsRegistry:
+    """Holds every metric the scraper exports"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._values: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Dict]] = {}
+        self._buckets: Dict[str, List[float]] = {}
+
+    def _declare(self, name: str, kind: str, help_text: str) -> None:
+        if name not in self._help:
+            self._help[name] = (kind, help_text)
+
+    def inc(self, name: str, labels: Optional[Dict[str, str]] = None, amount: float = 1.0,
+            help_text: str = '') -> None:
+        """Increase a counter"""
+        with self._lock:
+            self._declare(name, 'counter', help_text)
+            series = self._values.setdefault(name, {})
+            key = _label_key(labels)
+            series[key] = series.get(key, 0.0) + amount
+
+    def set(self, name: str, value: float, labels: Optional[Dict[str, str]] = None,
+            help_text: str = '') -> None:
+        """Set a gauge"""
+        with self._lock:
+            self._declare(name, 'gauge', help_text)
+            self._values.setdefault(name, {})[_label_key(labels)] = float(value)
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, str]] = None,
+                buckets: Optional[List[float]] = None, help_text: str = '') -> None:
+        """Record one observation in a histogram"""
+        with self._lock:
+            self._declare(name, 'histogram', help_text)
+            bounds = self._buckets.setdefault(name, sorted(buckets or DEFAULT_BUCKETS))
+            series = self._histograms.setdefault(name, {})
+            key = _label_key(labels)
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = {'counts': [0] * (len(bounds) + 1), 'sum': 0.0, 'count': 0}
+            hist['counts'][bisect.bisect_left(bounds, value)] += 1
+            hist['sum'] += value
+            hist['count'] += 1
+
+    def get(self, name: str, labels: Optional[Dict[str, str]] = None) -> float:
+        with self._lock:
+            return self._values.get(name, {}).get(_label_key(labels), 0.0)
+
+    def quantile(self, name: str, q: float, labels: Optional[Dict[str, str]] = None) -> Optional[float]:
+        """Estimate a quantile from histogram buckets (upper bound of the bucket it falls in)"""
+        with self._lock:
+            hist = self._histograms.get(name, {}).get(_label_key(labels))
+            if not hist or not hist['count']:
+                return None
+            bounds = self._buckets[name]
+            target = q * hist['count']
+            running = 0
+            for i, count in enumerate(hist['counts']):
+                running += count
+                if running >= target:
+                    return bounds[i] if i < len(bounds) else float('inf')
+            return float('inf')
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name in sorted(self._help):
+                kind, help_text = self._help[name]
+                if help_text:
+                    lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+                if kind == 'histogram':
+                    bounds = self._buckets[name]
+                    for key, hist in sorted(self._histograms.get(name, {}).items()):
+                        running = 0
+                        for bound, count in zip(bounds + [float('inf')], hist['counts']):
+                            running += count
+                            le = '+Inf' if bound == float('inf') else repr(float(bound))
+                            lines.append(f'{name}_bucket{_format_labels(key, ("le", le))} {running}')
+                        lines.append(f'{name}_sum{_format_labels(key)} {hist["sum"]}')
+                        lines.append(f'{name}_count{_format_labels(key)} {hist["count"]}')
+                else:
+                    for key, value in sorted(self._values.get(name, {}).items()):
+                        lines.append(f'{name}{_format_labels(key)} {value}')
+        return '\n'.join(lines) + '\n'
+
+    # ------------------------------------------------------------------
+    # Persistence for runners that start a fresh process every cycle
+    # ------------------------------------------------------------------
+
+    def snapshot(self) -> Dict:
+        """Every metric as plain data, for the state file or another process's registry"""
+        with self._lock:
+            return {
+                'help': dict(self._help),
+                'buckets': dict(self._buckets),
+                'values': {name: [[list(map(list, key)), value] for key, value in series.items()]
+                           for name, series in self._values.items()},
+                'histograms': {name: [[list(map(list, key)), dict(hist, counts=list(hist['counts']))]
+                                      for key, hist in series.items()]
+                               for name, series in self._histograms.items()},
+            }
+
+    def merge(self, state: Dict, labels: Optional[Dict[str, str]] = None) -> None:
+        """Adopt a snapshot() under extra labels, replacing what the same source sent before"""
+        extra = _label_key(labels)
+        with self._lock:
+            for name, pair in state.get('help', {}).items():
+                self._help.setdefault(name, tuple(pair))
+            for name, bounds in state.get('buckets', {}).items():
+                self._buckets.setdefault(name, bounds)
+            for name, series in state.get('values', {}).items():
+                target = self._values.setdefault(name, {})
+                for key, value in series:
+                    target[tuple(sorted(tuple(pair) for pair in key + list(extra)))] = value
+            for name, series in state.get('histograms', {}).items():
+                target = self._histograms.setdefault(name, {})
+                for key, hist in series:
+                    target[tuple(sorted(tuple(pair) for pair in key + list(extra)))] = hist
+
+    def save(self, state_path: str, text_path: Optional[str] = None) -> None:
+        state = self.snapshot()
+        try:
+            tmp_path = state_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as handle:
+                json.dump(state, handle)
+            os.replace(tmp_path, state_path)
+            if text_path:
+                tmp_path = text_path + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as handle:
+                    handle.write(self.render())
+                os.replace(tmp_path, text_path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write metrics: {e}")
+
+    def load(self, state_path: str) -> None:
+        if not os.path.exists(state_path):
+            return
+        try:
+            with open(state_path, 'r', encoding='utf-8') as handle:
+                state = json.load(handle)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Could not load metrics state: {e}")
+            return
+        self.merge(state)
+
+
+REGISTRY = MetricsRegistry()
+
+
+def start_metrics_server(port: int, host: str = '0.0.0.0'):
+    """Serve /metrics from a daemon thread (used by the long-running modes)"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = REGISTRY.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True)
+    thread.start()
+    logger.info(f"📈 Metrics available on http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+InPlay Football Warm Worker
+Long-lived scraper process that runs one cycle per "run_cycle" command read from
+stdin and answers with one JSON line on stdout, so interpreter startup and the
+selenium/supabase imports are paid once instead of every cycle
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import signal
+import logging
+import threading
+import subprocess
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+PROTOCOL_VERSION = 1
+
+
+def serve(command_stream=None, reply_stream=None) -> int:
+    """Worker side: answer commands until shutdown or EOF"""
+    # stdout is the protocol channel; anything else printing there would corrupt it
+    reply_stream = reply_stream or os.fdopen(os.dup(sys.stdout.fileno()), 'w', buffering=1)
+    sys.stdout = sys.stderr
+    command_stream = command_stream or sys.stdin
+
+    from logging_setup import setup_logging
+    from inplay_football_scraper import InPlayFootballScraper
+    from resource_monitor import ResourceMonitor
+    from scraper_metrics import REGISTRY
+
+    setup_logging(os.getenv('WORKER_LOG_FILE', 'inplay_worker.log'))
+    metrics_state = os.getenv('METRICS_STATE', 'scraper_metrics.json')
+    metrics_file = os.getenv('METRICS_FILE', 'scraper_metrics.prom')
+    REGISTRY.load(metrics_state)
+
+    scraper = InPlayFootballScraper()
+    monitor = ResourceMonitor()
+    cycles = 0
+
+    def reply(payload: Dict) -> None:
+        reply_stream.write(json.dumps(payload, default=str) + '\n')
+        reply_stream.flush()
+
+    reply({'event': 'ready', 'pid': os.getpid(), 'protocol': PROTOCOL_VERSION})
+    logger.info(f"🔥 Warm worker ready (pid {os.getpid()})")
+
+    try:
+        for line in command_stream:
+            try:
+                command = json.loads(line)
+            except ValueError:
+                reply({'ok': False, 'error': f'invalid command: {line.strip()[:100]}'})
+                continue
+
+            name = command.get('cmd')
+            if name == 'ping':
+                reply({'id': command.get('id'), 'ok': True, 'event': 'pong'})
+            elif name == 'run_cycle':
+                started = time.monotonic()
+                try:
+                    success = scraper.run_scraper(keep_browser=True)
+                    error = None
+                except Exception as e:
+                    success, error = False, str(e)
+                cycles += 1
+
+                recycle_reason = monitor.after_cycle(scraper.driver)
+                if recycle_reason:
+                    scraper.close_driver()
+                    monitor.recycled(recycle_reason)
+                sample = monitor.sample(scraper.driver)
+                REGISTRY.save(metrics_state, metrics_file)
+
+                reply({
+                    'id': command.get('id'),
+                    'ok': bool(success),
+                    'error': error,
+                    'cycle': cycles,
+                    'cycle_id': scraper.last_cycle.get('cycle_id'),
+                    'rows': scraper.last_cycle.get('rows', 0),
+                    'freshness_p95': scraper.last_cycle.get('freshness_p95'),
+                    'duration': round(time.monotonic() - started, 3),
+                    'browser_recycled': bool(recycle_reason),
+                    **sample,
+                })
+            elif name == 'shutdown':
+                reply({'id': command.get('id'), 'ok': True, 'event': 'bye'})
+                break
+            else:
+                reply({'id': command.get('id'), 'ok': False, 'error': f'unknown command {name!r}'})
+    finally:
+        if scraper.lease:
+            # Let the standby take over on its next cycle instead of waiting out the TTL
+            scraper.lease.release()
+        scraper.close()
+    return 0
+
+
+class WorkerCrashed(Exception):
+    """The worker exited or stopped answering"""
+
+
+class WorkerClient:
+    """Supervisor side: owns one warm worker and respawns it on crash or after N cycles"""
+
+    def __init__(self, max_cycles: Optional[int] = None, timeout: Optional[float] = None,
+                 python: Optional[str] = None):
+        self.max_cycles = int(os.getenv('WORKER_MAX_CYCLES', '500')) if max_cycles is None else max_cycles
+        self.timeout = float(os.getenv('CYCLE_TIMEOUT', '600')) if timeout is None else timeout
+        self.python = python or sys.executable or 'python3'
+        self.process: Optional[subprocess.Popen] = None
+        self._replies: queue.Queue = queue.Queue()
+        self.cycles = 0
+        self.spawns = 0
+        self._next_id = 0
+
+    def _read_replies(self, process: subprocess.Popen, replies: queue.Queue) -> None:
+        for line in iter(process.stdout.readline, ''):
+            try:
+                replies.put(json.loads(line))
+            except ValueError:
+                logger.warning(f"⚠️ Ignoring non-protocol worker output: {line.strip()[:200]}")
+        replies.put(None)
+
+    def start(self) -> None:
+        script = os.path.abspath(__file__)
+        self.process = subprocess.Popen(
+            [self.python, script],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=None,  # worker logs go straight to our stderr
+            text=True,
+            bufsize=1,
+            cwd=os.path.dirname(script),
+            start_new_session=True
+        )
+        self._replies = queue.Queue()
+        threading.Thread(target=self._read_replies, args=(self.process, self._replies),
+                         name='worker-replies', daemon=True).start()
+        self.cycles = 0
+        self.spawns += 1
+
+        ready = self._wait_reply(self.timeout)
+        if ready.get('event') != 'ready':
+            self.stop(kill=True)
+            raise WorkerCrashed(f"Worker did not start: {ready}")
+        logger.info(f"🔥 Warm worker started (pid {ready.get('pid')}, spawn #{self.spawns})")
+
+    def _wait_reply(self, timeout: float) -> Dict:
+        try:
+            reply = self._replies.get(timeout=timeout)
+        except queue.Empty:
+            raise WorkerCrashed(f"Worker did not answer within {timeout:.0f}s")
+        if reply is None:
+            raise WorkerCrashed(f"Worker exited with code {self.process.wait()}")
+        return reply
+
+    def _send(self, command: Dict) -> None:
+        self._next_id += 1
+        command['id'] = self._next_id
+        try:
+            self.process.stdin.write(json.dumps(command) + '\n')
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise WorkerCrashed(f"Worker pipe closed: {e}")
+
+    def run_cycle(self) -> Dict:
+        """Run one cycle on the warm worker, spawning or respawning it as needed"""
+        if self.process is None or self.process.poll() is not None:
+            self.start()
+        elif self.max_cycles and self.cycles >= self.max_cycles:
+            logger.info(f"♻️ Respawning warm worker after {self.cycles} cycles")
+            self.stop()
+            self.start()
+
+        try:
+            self._send({'cmd': 'run_cycle'})
+            reply = self._wait_reply(self.timeout)
+        except WorkerCrashed:
+            # Never reuse a worker that hung or died mid-cycle
+            self.stop(kill=True)
+            raise
+        self.cycles += 1
+        return reply
+
+    def stop(self, kill: bool = False) -> None:
+        if self.process is None:
+            return
+        if not kill and self.process.poll() is None:
+            try:
+                self._send({'cmd': 'shutdown'})
+                self.process.wait(timeout=30)
+            except (WorkerCrashed, subprocess.TimeoutExpired):
+                kill = True
+        if kill and self.process.poll() is None:
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            self.process.wait()
+        self.process = None
+
+
+if __name__ == "__main__":
+    sys.exit(serve())
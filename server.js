@@ -1,8 +1,16 @@
 const { spawn } = require('child_process');
 const http = require('http');
+const fs = require('fs');
 
 // Configuration
 const PORT = process.env.PORT || 3000;
+const METRICS_FILE = process.env.METRICS_FILE || 'scraper_metrics.prom';
+// Hard ceiling per scraper process; the Python stage deadlines should fire first
+const CYCLE_TIMEOUT_MS = parseInt(process.env.CYCLE_TIMEOUT || '600', 10) * 1000;
+// Warm worker: one long-lived Python process runs every cycle (see scraper_worker.py)
+const WARM_WORKER = process.env.WARM_WORKER === '1';
+const WORKER_MAX_CYCLES = parseInt(process.env.WORKER_MAX_CYCLES || '500', 10);
+const pythonCmd = process.env.RAILWAY_ENVIRONMENT ? 'python' : 'python3';
 let isRunning = false;
 
 // Create HTTP server for health checks
@@ -14,13 +22,149 @@ const server = http.createServer((req, res) => {
             scraper_running: isRunning,
             timestamp: new Date().toISOString()
         }));
+    } else if (req.url === '/metrics') {
+        // Written by the scraper at the end of every run
+        fs.readFile(METRICS_FILE, 'utf8', (err, body) => {
+            res.writeHead(200, { 'Content-Type': 'text/plain; version=0.0.4' });
+            res.end(err ? '' : body);
+        });
     } else {
         res.writeHead(200, { 'Content-Type': 'text/plain' });
         res.end('InPlay Football Scraper - Continuous Mode\n');
     }
 });
 
+// ---------------------------------------------------------------------------
+// Warm worker mode
+// ---------------------------------------------------------------------------
+
+let worker = null;
+let workerCycles = 0;
+let nextCommandId = 0;
+const pendingReplies = new Map();
+
+function stopWorker() {
+    if (!worker) return;
+    try {
+        process.kill(-worker.pid, 'SIGKILL');
+    } catch (e) {
+        // already gone
+    }
+    worker = null;
+}
+
+function startWorker() {
+    return new Promise((resolve, reject) => {
+        const child = spawn(pythonCmd, ['scraper_worker.py'], {
+            stdio: ['pipe', 'pipe', 'inherit'],  // worker logs go straight to our stderr
+            env: { ...process.env },
+            detached: true
+        });
+        let buffer = '';
+        let ready = false;
+
+        child.stdout.on('data', (data) => {
+            buffer += data.toString();
+            let newline;
+            while ((newline = buffer.indexOf('\n')) >= 0) {
+                const line = buffer.slice(0, newline);
+                buffer = buffer.slice(newline + 1);
+                let reply;
+                try {
+                    reply = JSON.parse(line);
+                } catch (e) {
+                    console.log(`⚠️ Ignoring non-protocol worker output: ${line.slice(0, 200)}`);
+                    continue;
+                }
+                if (reply.event === 'ready') {
+                    ready = true;
+                    console.log(`🔥 Warm worker ready (pid ${reply.pid})`);
+                    resolve(child);
+                } else if (pendingReplies.has(reply.id)) {
+                    pendingReplies.get(reply.id)(null, reply);
+                    pendingReplies.delete(reply.id);
+                }
+            }
+        });
+
+        child.on('exit', (code) => {
+            console.log(`💥 Warm worker exited with code ${code}`);
+            if (worker === child) worker = null;
+            for (const callback of pendingReplies.values()) {
+                callback(new Error(`worker exited with code ${code}`));
+            }
+            pendingReplies.clear();
+            if (!ready) reject(new Error(`worker exited with code ${code} before becoming ready`));
+        });
+
+        child.on('error', (error) => {
+            if (!ready) reject(error);
+        });
+    });
+}
+
+async function runWarmCycle() {
+    if (worker && workerCycles >= WORKER_MAX_CYCLES) {
+        console.log(`♻️ Respawning warm worker after ${workerCycles} cycles`);
+        stopWorker();
+    }
+    if (!worker) {
+        worker = await startWorker();
+        workerCycles = 0;
+    }
+
+    const id = ++nextCommandId;
+    const reply = await new Promise((resolve, reject) => {
+        const watchdog = setTimeout(() => {
+            pendingReplies.delete(id);
+            reject(new Error(`cycle exceeded ${CYCLE_TIMEOUT_MS / 1000}s`));
+        }, CYCLE_TIMEOUT_MS);
+        pendingReplies.set(id, (err, result) => {
+            clearTimeout(watchdog);
+            err ? reject(err) : resolve(result);
+        });
+        worker.stdin.write(JSON.stringify({ cmd: 'run_cycle', id }) + '\n');
+    });
+    workerCycles += 1;
+    return reply;
+}
+
+function runScraperWarm() {
+    if (isRunning) {
+        console.log('⏳ Scraper already running, skipping...');
+        return;
+    }
+
+    isRunning = true;
+    console.log(`🎯 Starting scraper run at ${new Date().toLocaleString('en-GB', { timeZone: 'Europe/London' })}`);
+
+    runWarmCycle().then((reply) => {
+        isRunning = false;
+        const timestamp = new Date().toLocaleString('en-GB', { timeZone: 'Europe/London' });
+        if (reply.ok) {
+            console.log(`✅ Scraper completed successfully at ${timestamp} (${reply.rows} rows in ${reply.duration}s)`);
+            setTimeout(runScraperWarm, 1000);
+        } else {
+            console.log(`❌ Scraper failed at ${timestamp}: ${reply.error || 'see worker log'}`);
+            setTimeout(runScraperWarm, 30 * 1000);
+        }
+    }).catch((error) => {
+        isRunning = false;
+        console.error(`❌ Warm worker error: ${error.message} - respawning`);
+        stopWorker();
+        setTimeout(runScraperWarm, 30 * 1000);
+    });
+}
+
+// ---------------------------------------------------------------------------
+// One process per cycle
+// ---------------------------------------------------------------------------
+
 function runScraper() {
+    if (WARM_WORKER) {
+        runScraperWarm();
+        return;
+    }
     if (isRunning) {
         console.log('⏳ Scraper already running, skipping...');
         return;
@@ -29,12 +173,21 @@ function runScraper() {
     isRunning = true;
     console.log(`🎯 Starting scraper run at ${new Date().toLocaleString('en-GB', { timeZone: 'Europe/London' })}`);
 
-    const pythonCmd = process.env.RAILWAY_ENVIRONMENT ? 'python' : 'python3';
     const scraper = spawn(pythonCmd, ['inplay_football_scraper.py'], {
         stdio: ['pipe', 'pipe', 'pipe'],
-        env: { ...process.env }
+        env: { ...process.env },
+        detached: true  // own process group so a timeout also kills chromedriver/Chrome
     });
 
+    const watchdog = setTimeout(() => {
+        console.log(`⏰ Scraper exceeded ${CYCLE_TIMEOUT_MS / 1000}s - killing process group`);
+        try {
+            process.kill(-scraper.pid, 'SIGKILL');
+        } catch (e) {
+            console.error(`❌ Could not kill scraper: ${e.message}`);
+        }
+    }, CYCLE_TIMEOUT_MS);
+
     let output = '';
     let errorOutput = '';
 
@@ -51,6 +204,7 @@ function runScraper() {
     });
 
     scraper.on('close', (code) => {
+        clearTimeout(watchdog);
         isRunning = false;
         const timestamp = new Date().toLocaleString('en-GB', { timeZone: 'Europe/London' });
         
@@ -69,6 +223,7 @@ function runScraper() {
     });
 
     scraper.on('error', (error) => {
+        clearTimeout(watchdog);
         isRunning = false;
         console.error(`❌ Scraper error: ${error.message}`);
         
@@ -96,6 +251,7 @@ server.listen(PORT, '0.0.0.0', () => {
 // Graceful shutdown
 process.on('SIGTERM', () => {
     console.log('📴 Received SIGTERM, shutting down gracefully...');
+    stopWorker();
     server.close(() => {
         console.log('✅ Server closed');
         process.exit(0);
@@ -104,6 +260,7 @@ process.on('SIGTERM', () => {
 
 process.on('SIGINT', () => {
     console.log('📴 Received SIGINT, shutting down gracefully...');
+    stopWorker();
     server.close(() => {
         console.log('✅ Server closed');
         process.exit(0);
@@ -0,0 +1,590 @@
+#!/usr/bin/env python3
+"""
+InPlay Football Sinks
+Pluggable destinations for cleaned snapshots (Supabase, an indexed SQLite mirror,
+rolling CSV/Arrow files, JSON lines on stdout). Each sink runs on its own thread
+with its own batch size, so a slow destination never holds up the others
+"""
+
+import os
+import sys
+import csv
+import json
+import queue
+import sqlite3
+import time
+import logging
+import threading
+import contextvars
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from match_history import match_key_for
+from scraper_metrics import REGISTRY
+from table_parser import TABLE_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+
+def chunked(rows: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    """Lazily group rows into lists of `size` (everything in one list when size <= 0)"""
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size)) if size > 0 else list(rows)
+        if not chunk:
+            return
+        yield chunk
+
+
+# Chunks a non-blocking sink may fall behind by before its oldest chunks are dropped
+LOSSY_STREAM_CHUNKS = 16
+
+
+class StreamFeed:
+    """Bounded hand-off of row chunks from the scraping thread to one sink thread
+
+    A blocking sink's feed applies back-pressure to the scrape. A lossy feed, used for
+    non-blocking sinks, never makes the producer wait: once full it drops its oldest
+    chunk, and the stream then counts as incomplete for that sink.
+    """
+
+    _END = object()
+
+    def __init__(self, max_chunks: int = 4, lossy: bool = False):
+        self._queue: queue.Queue = queue.Queue(maxsize=max_chunks)
+        self.lossy = lossy
+        self.dropped = 0
+        # Known only once the producer finishes; removals are skipped for an incomplete stream
+        self.complete = False
+        self.removed: List[str] = []
+        # Set when the sink stops reading, so the producer never blocks on an abandoned feed
+        self.closed = False
+
+    def _drop_oldest(self) -> None:
+        try:
+            self._queue.get_nowait()
+            self.dropped += 1
+        except queue.Empty:
+            pass
+
+    def put(self, chunk) -> None:
+        if self.lossy:
+            while not self.closed:
+                try:
+                    self._queue.put_nowait(chunk)
+                    return
+                except queue.Full:
+                    self._drop_oldest()
+            return
+        while not self.closed:
+            try:
+                self._queue.put(chunk, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def finish(self, complete: bool, removed: List[str]) -> None:
+        if self.lossy:
+            # Make room first, so the drop is known before the sink can see the end
+            while self._queue.full() and not self.closed:
+                self._drop_oldest()
+        self.complete = complete and not self.dropped
+        self.removed = removed
+        self.put(self._END)
+
+    def chunks(self) -> Iterator[List[Dict]]:
+        while True:
+            chunk = self._queue.get()
+            if chunk is self._END:
+                return
+            yield chunk
+
+    def rows(self) -> Iterator[Dict]:
+        for chunk in self.chunks():
+            yield from chunk
+
+
+class Sink:
+    """A destination with batching semantics: upsert rows, remove keys, flush"""
+
+    name = 'sink'
+    # run_scraper waits for blocking sinks (their result decides whether the save stage succeeded)
+    blocking = False
+
+    def __init__(self, batch_size: int = 500):
+        self.batch_size = batch_size
+
+    def upsert(self, rows: List[Dict]) -> None:
+        raise NotImplementedError
+
+    def remove(self, keys: List[str]) -> None:
+        pass
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.flush()
+
+    def write_snapshot(self, rows: List[Dict], removed: List[str]) -> bool:
+        """Upsert a whole snapshot in batch_size chunks, remove finished matches, flush"""
+        for chunk in chunked(rows, self.batch_size):
+            self.upsert(chunk)
+        if removed:
+            self.remove(removed)
+        self.flush()
+        return True
+
+    def write_stream(self, feed: StreamFeed) -> bool:
+        """Upsert rows in batch_size chunks as they arrive; finished matches are removed only if the stream completed"""
+        for chunk in chunked(feed.rows(), self.batch_size):
+            self.upsert(chunk)
+        if feed.complete and feed.removed:
+            self.remove(feed.removed)
+        self.flush()
+        return feed.complete
+
+
+class SupabaseSink(Sink):
+    """The existing save path: keyed upsert plus cleanup of matches no longer listed"""
+
+    name = 'supabase'
+    blocking = True
+
+    def __init__(self, scraper, batch_size: int = 0):
+        super().__init__(batch_size)
+        self.scraper = scraper
+
+    def write_snapshot(self, rows: List[Dict], removed: List[str]) -> bool:
+        if not self.scraper.supabase_client:
+            self.scraper.setup_supabase()
+        # save_to_supabase already batches its reads and deletes, and removes stale matches itself
+        return self.scraper.save_to_supabase(rows, cleaned=True)
+
+    def write_stream(self, feed: StreamFeed) -> bool:
+        # The cleanup of finished matches needs the full snapshot, so this sink collects it first
+        rows = list(feed.rows())
+        if not feed.complete:
+            logger.warning("⚠️ Snapshot stream ended early - skipping the Supabase save")
+            return False
+        return self.write_snapshot(rows, [])
+
+
+class SqliteSink(Sink):
+    """Local mirror of the live table keyed by match key, indexed for league/team lookups"""
+
+    name = 'sqlite'
+
+    def __init__(self, path: str = 'inplay_mirror.sqlite3', batch_size: int = 500,
+                 table: str = 'inplay_football'):
+        super().__init__(batch_size)
+        self.path = path
+        self.table = table
+        self.conn: Optional[sqlite3.Connection] = None
+        self._seen: Set[str] = set()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Opened lazily so the connection belongs to the sink's own thread
+        if self.conn is None:
+            self.conn = sqlite3.connect(self.path)
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+            self.conn.execute(
+                f'CREATE TABLE IF NOT EXISTS "{self.table}" ('
+                'match_key TEXT PRIMARY KEY, league TEXT, hometeam TEXT, awayteam TEXT, '
+                'min INTEGER, timeupdated TEXT, data TEXT NOT NULL, updated_at TEXT NOT NULL)'
+            )
+            self.conn.execute(f'CREATE INDEX IF NOT EXISTS "{self.table}_league" ON "{self.table}" (league)')
+            self.conn.execute(f'CREATE INDEX IF NOT EXISTS "{self.table}_hometeam" ON "{self.table}" (hometeam)')
+        return self.conn
+
+    def upsert(self, rows: List[Dict]) -> None:
+        conn = self._connect()
+        now = datetime.now(timezone.utc).isoformat()
+        values = []
+        for row in rows:
+            key = match_key_for(row)
+            if not key:
+                continue
+            self._seen.add(key)
+            values.append((key, row.get('league'), row.get('hometeam'), row.get('awayteam'), row.get('min'),
+                           row.get('timeupdated'), json.dumps(row, default=str), now))
+        conn.executemany(
+            f'INSERT INTO "{self.table}" (match_key, league, hometeam, awayteam, min, timeupdated, data, updated_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(match_key) DO UPDATE SET '
+            'league=excluded.league, hometeam=excluded.hometeam, awayteam=excluded.awayteam, '
+            'min=excluded.min, timeupdated=excluded.timeupdated, data=excluded.data, updated_at=excluded.updated_at',
+            values
+        )
+
+    def remove(self, keys: List[str]) -> None:
+        self._connect().executemany(f'DELETE FROM "{self.table}" WHERE match_key = ?', [(key,) for key in keys])
+
+    def _prune_unseen(self) -> None:
+        # Mirror exactly: also drops rows left behind by an earlier process
+        stale = [key for (key,) in self._connect().execute(f'SELECT match_key FROM "{self.table}"')
+                 if key not in self._seen]
+        if stale:
+            self.remove(stale)
+
+    def write_snapshot(self, rows: List[Dict], removed: List[str]) -> bool:
+        self._seen = set()
+        for chunk in chunked(rows, self.batch_size):
+            self.upsert(chunk)
+        self._prune_unseen()
+        self.flush()
+        return True
+
+    def write_stream(self, feed: StreamFeed) -> bool:
+        self._seen = set()
+        for chunk in chunked(feed.rows(), self.batch_size):
+            self.upsert(chunk)
+        if feed.complete:
+            self._prune_unseen()
+        self.flush()
+        return feed.complete
+
+    def flush(self) -> None:
+        if self.conn is not None:
+            self.conn.commit()
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
+
+
+class RollingFileSink(Sink):
+    """Appends every snapshot to time-partitioned CSV or Arrow IPC files (one per hour by default)"""
+
+    name = 'csv'
+
+    def __init__(self, directory: str = 'exports', file_format: str = 'csv', batch_size: int = 1000,
+                 rotate: str = '%Y-%m-%d_%H'):
+        super().__init__(batch_size)
+        if file_format not in ('csv', 'arrow'):
+            raise ValueError(f"Unknown file format {file_format!r} (csv or arrow)")
+        self.name = file_format
+        self.directory = directory
+        self.file_format = file_format
+        self.rotate = rotate
+        self.columns = ['captured_at'] + TABLE_COLUMNS
+        self._buffer: List[Dict] = []
+        self._current_path: Optional[str] = None
+        self._writer = None
+        self._handle = None
+        self._stamp = ''
+        os.makedirs(directory, exist_ok=True)
+
+    def write_snapshot(self, rows: List[Dict], removed: List[str]) -> bool:
+        self._stamp = datetime.now(timezone.utc).isoformat()
+        return super().write_snapshot(rows, removed)
+
+    def write_stream(self, feed: StreamFeed) -> bool:
+        self._stamp = datetime.now(timezone.utc).isoformat()
+        return super().write_stream(feed)
+
+    def upsert(self, rows: List[Dict]) -> None:
+        self._buffer.extend(dict(row, captured_at=self._stamp) for row in rows)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def _path_for(self, now: datetime) -> str:
+        return os.path.join(self.directory, f"inplay_{now.strftime(self.rotate)}.{self.file_format}")
+
+    def _open(self, path: str) -> None:
+        self._close_file()
+        self._current_path = path
+        if self.file_format == 'csv':
+            new_file = not os.path.exists(path)
+            self._handle = open(path, 'a', newline='', encoding='utf-8')
+            self._writer = csv.DictWriter(self._handle, fieldnames=self.columns, extrasaction='ignore')
+            if new_file:
+                self._writer.writeheader()
+        else:
+            import pyarrow as pa
+            # IPC streams cannot be appended to once closed, so a restart within the hour gets a new part
+            part = 0
+            while os.path.exists(path if not part else f"{path}.{part}"):
+                part += 1
+            self._current_path = path if not part else f"{path}.{part}"
+            self._schema = pa.schema([(column, pa.string()) for column in self.columns])
+            self._handle = pa.OSFile(self._current_path, 'wb')
+            self._writer = pa.ipc.new_stream(self._handle, self._schema)
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        path = self._path_for(datetime.now(timezone.utc))
+        if self._writer is None or not self._current_path.startswith(path):
+            self._open(path)
+
+        if self.file_format == 'csv':
+            self._writer.writerows(self._buffer)
+            self._handle.flush()
+        else:
+            import pyarrow as pa
+            table = {column: [None if row.get(column) is None else str(row.get(column)) for row in self._buffer]
+                     for column in self.columns}
+            self._writer.write_batch(pa.record_batch(table, schema=self._schema))
+        self._buffer = []
+
+    def _close_file(self) -> None:
+        if self._writer is not None and self.file_format == 'arrow':
+            self._writer.close()
+        if self._handle is not None:
+            self._handle.close()
+        self._writer = self._handle = self._current_path = None
+
+    def close(self) -> None:
+        self.flush()
+        self._close_file()
+
+
+class StdoutSink(Sink):
+    """Streams one JSON object per upserted row or removed key to stdout"""
+
+    name = 'stdout'
+
+    def __init__(self, batch_size: int = 100, stream=None):
+        super().__init__(batch_size)
+        self.stream = stream or sys.stdout
+
+    def upsert(self, rows: List[Dict]) -> None:
+        self.stream.write(''.join(
+            json.dumps({'op': 'upsert', 'key': match_key_for(row), 'row': row}, default=str) + '\n'
+            for row in rows
+        ))
+
+    def remove(self, keys: List[str]) -> None:
+        self.stream.write(''.join(json.dumps({'op': 'remove', 'key': key}) + '\n' for key in keys))
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+class RealtimeSink(Sink):
+    """Diffs each snapshot against the last and publishes the changes as Server-Sent Events"""
+
+    name = 'sse'
+
+    def __init__(self, port: int = 8765, replay_size: int = 100, batch_size: int = 0):
+        super().__init__(batch_size)
+        from realtime_feed import ChangeFeed, start_feed_server
+        from snapshot_diff import SnapshotDiff
+        from logging_setup import current_cycle
+
+        self.current_cycle = current_cycle
+        self.differ = SnapshotDiff()
+        self.feed = ChangeFeed(replay_size=replay_size)
+        self.server = start_feed_server(self.feed, port)
+
+    def write_snapshot(self, rows: List[Dict], removed: List[str]) -> bool:
+        self.feed.publish_diff(self.differ.diff(rows), rows, self.current_cycle())
+        return True
+
+    def write_stream(self, feed: StreamFeed) -> bool:
+        # Removed matches are only known once the whole snapshot has been seen
+        rows = list(feed.rows())
+        return self.write_snapshot(rows, []) if feed.complete else False
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class SinkWorker:
+    """Owns one sink and the thread that feeds it; only the newest pending snapshots are kept"""
+
+    def __init__(self, sink: Sink, max_pending: int = 2):
+        self.sink = sink
+        self.name = sink.name
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name=f'sink-{self.name}', daemon=True)
+        self._thread.start()
+
+    def submit(self, rows: List[Dict], removed: List[str]) -> Dict:
+        """Queue a snapshot; the returned item's 'done' event is set once this sink has handled it"""
+        # Carry the caller's context so the sink's log lines keep the cycle id
+        item = {'rows': rows, 'removed': removed, 'done': threading.Event(), 'ok': False,
+                'context': contextvars.copy_context()}
+        return self._enqueue(item)
+
+    def submit_stream(self, feed: StreamFeed) -> Dict:
+        """Queue a streamed snapshot; the sink starts writing as soon as it reaches the front"""
+        item = {'feed': feed, 'done': threading.Event(), 'ok': False, 'context': contextvars.copy_context()}
+        return self._enqueue(item)
+
+    def _enqueue(self, item: Dict) -> Dict:
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                break
+            except queue.Full:
+                # The sink is behind: a newer snapshot supersedes the oldest queued one
+                try:
+                    dropped = self._queue.get_nowait()
+                    if 'feed' in dropped:
+                        dropped['feed'].closed = True
+                    dropped['done'].set()
+                    REGISTRY.inc('inplay_sink_dropped_snapshots_total', {'sink': self.name},
+                                 help_text='Snapshots skipped because a sink fell behind')
+                    logger.warning(f"⚠️ Sink {self.name} is behind - skipped one queued snapshot")
+                except queue.Empty:
+                    pass
+        return item
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            started = time.monotonic()
+            if 'feed' in item:
+                write, args = self.sink.write_stream, (item['feed'],)
+            else:
+                write, args = self.sink.write_snapshot, (item['rows'], item['removed'])
+            try:
+                item['ok'] = bool(item['context'].run(write, *args))
+            except Exception as e:
+                item['ok'] = False
+                logger.error(f"❌ Sink {self.name} failed: {e}")
+            finally:
+                if 'feed' in item:
+                    item['feed'].closed = True
+            REGISTRY.observe('inplay_sink_write_seconds', time.monotonic() - started, {'sink': self.name},
+                             help_text='Time each sink took to write one snapshot')
+            REGISTRY.inc('inplay_sink_snapshots_total', {'sink': self.name, 'ok': str(item['ok']).lower()},
+                         help_text='Snapshots written by each sink')
+            item['done'].set()
+        try:
+            self.sink.close()
+        except Exception as e:
+            logger.warning(f"⚠️ Could not close sink {self.name}: {e}")
+
+    def close(self, timeout: float = 30.0) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+
+class SinkFanout:
+    """Publishes each snapshot to every configured sink"""
+
+    def __init__(self, sinks: List[Sink]):
+        self.workers = [SinkWorker(sink) for sink in sinks]
+        self.previous_keys: Set[str] = set()
+
+    @property
+    def names(self) -> List[str]:
+        return [worker.name for worker in self.workers]
+
+    def publish(self, rows: List[Dict], only: Optional[List[str]] = None,
+                wait: Optional[float] = None) -> Dict[str, bool]:
+        """Hand a snapshot to the sinks; waits up to `wait` seconds for the blocking ones
+
+        Returns {sink name: ok} for the blocking sinks that were written to.
+        """
+        keys = {key for key in (match_key_for(row) for row in rows) if key}
+        removed = sorted(self.previous_keys - keys) if only is None else []
+        if only is None:
+            self.previous_keys = keys
+
+        pending = {}
+        for worker in self.workers:
+            if only is not None and worker.name not in only:
+                continue
+            item = worker.submit(rows, removed)
+            if worker.sink.blocking:
+                pending[worker.name] = item
+
+        return {name: item['done'].wait(wait) and item['ok'] for name, item in pending.items()}
+
+    def publish_stream(self, chunks: Iterable[List[Dict]], wait: Optional[float] = None) -> Dict[str, bool]:
+        """Feed chunks to every sink while they are still being produced
+
+        A blocking sink holds at most a few chunks, so it applies back-pressure rather
+        than the snapshot piling up in memory. A non-blocking sink never slows the
+        scrape: it gets a bounded buffer and loses its oldest chunks once that is full.
+        If `chunks` raises, the sinks are told the stream is incomplete (no removals)
+        and the error propagates.
+        """
+        feeds: Dict[str, StreamFeed] = {}
+        pending = {}
+        for worker in self.workers:
+            blocking = worker.sink.blocking
+            feed = StreamFeed() if blocking else StreamFeed(LOSSY_STREAM_CHUNKS, lossy=True)
+            item = worker.submit_stream(feed)
+            feeds[worker.name] = feed
+            if worker.sink.blocking:
+                pending[worker.name] = item
+
+        keys: Set[str] = set()
+        complete = False
+        try:
+            for chunk in chunks:
+                keys.update(key for key in (match_key_for(row) for row in chunk) if key)
+                for feed in feeds.values():
+                    feed.put(chunk)
+            complete = True
+        finally:
+            removed = sorted(self.previous_keys - keys) if complete else []
+            if complete:
+                self.previous_keys = keys
+            for name, feed in feeds.items():
+                feed.finish(complete, removed)
+                if feed.dropped:
+                    REGISTRY.inc('inplay_sink_dropped_chunks_total', {'sink': name}, amount=feed.dropped,
+                                 help_text='Streamed chunks a non-blocking sink lost by falling behind')
+                    logger.warning(f"⚠️ Sink {name} fell behind the stream - dropped {feed.dropped} chunks")
+
+        return {name: item['done'].wait(wait) and item['ok'] for name, item in pending.items()}
+
+    def close(self) -> None:
+        for worker in self.workers:
+            worker.close()
+
+
+def parse_sink_spec(spec: str) -> List[Dict]:
+    """'supabase,sqlite:path=mirror.sqlite3:batch=200,csv:dir=exports' -> [{'type': ..., options}]"""
+    specs = []
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        name, *options = part.split(':')
+        entry = {'type': name.strip()}
+        for option in options:
+            key, _, value = option.partition('=')
+            entry[key.strip()] = value.strip()
+        specs.append(entry)
+    return specs
+
+
+def build_sinks(spec: str, scraper=None) -> List[Sink]:
+    """Construct sinks from a SINKS spec string"""
+    sinks: List[Sink] = []
+    for entry in parse_sink_spec(spec):
+        kind = entry['type']
+        batch = int(entry['batch']) if 'batch' in entry else None
+        if kind == 'supabase':
+            if scraper is None:
+                raise ValueError("The supabase sink needs the scraper instance")
+            sink = SupabaseSink(scraper)
+        elif kind == 'sqlite':
+            sink = SqliteSink(entry.get('path', 'inplay_mirror.sqlite3'), batch or 500)
+        elif kind in ('csv', 'arrow'):
+            sink = RollingFileSink(entry.get('dir', 'exports'), kind, batch or 1000,
+                                   entry.get('rotate', '%Y-%m-%d_%H'))
+        elif kind == 'stdout':
+            sink = StdoutSink(batch or 100)
+        elif kind == 'sse':
+            sink = RealtimeSink(int(entry.get('port', os.getenv('REALTIME_PORT', '8765'))),
+                                int(entry.get('replay', '100')))
+        else:
+            raise ValueError(f"Unknown sink type {kind!r}")
+        if 'blocking' in entry:
+            sink.blocking = entry['blocking'] in ('1', 'true', 'yes')
+        sinks.append(sink)
+    return sinks
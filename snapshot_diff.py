@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+InPlay Football Snapshot Diff
+Compares each cleaned snapshot with the previous one by match key and reports
+inserted, updated and removed matches together with per-column deltas
+"""
+
+import os
+import json
+import logging
+from typing import List, Dict, Optional, Tuple
+
+from match_history import match_key_for
+
+logger = logging.getLogger(__name__)
+
+
+class DiffResult:
+    """Outcome of comparing two snapshots"""
+
+    def __init__(self):
+        self.inserted: Dict[str, Dict] = {}
+        self.updated: Dict[str, Dict] = {}
+        self.removed: Dict[str, Dict] = {}
+        # match key -> {column: (old, new)} for updated matches
+        self.deltas: Dict[str, Dict[str, Tuple]] = {}
+        self.unchanged = 0
+
+    @property
+    def changed(self) -> Dict[str, Dict]:
+        """Rows that are new or have at least one differing column"""
+        rows = dict(self.inserted)
+        rows.update(self.updated)
+        return rows
+
+    def summary(self) -> str:
+        return (f"{len(self.inserted)} inserted, {len(self.updated)} updated, "
+                f"{len(self.removed)} removed, {self.unchanged} unchanged")
+
+    def to_dict(self) -> Dict:
+        return {
+            'inserted': list(self.inserted.values()),
+            'updated': [
+                {'key': key, 'row': row, 'deltas': {col: list(pair) for col, pair in self.deltas[key].items()}}
+                for key, row in self.updated.items()
+            ],
+            'removed': list(self.removed),
+        }
+
+
+class SnapshotDiff:
+    """Keeps the last snapshot and diffs each new one against it"""
+
+    def __init__(self, state_path: Optional[str] = None, ignore_columns: Optional[List[str]] = None):
+        self.state_path = state_path
+        # Columns that change every cycle without meaning the match changed
+        self.ignore_columns = set(ignore_columns or ['captured_at'])
+        self.previous: Dict[str, Dict] = {}
+        self._load_state()
+
+    def _load_state(self) -> None:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as handle:
+                self.previous = json.load(handle)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Could not load diff state: {e}")
+            self.previous = {}
+
+    def _save_state(self) -> None:
+        if not self.state_path:
+            return
+        try:
+            tmp_path = self.state_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as handle:
+                json.dump(self.previous, handle, separators=(',', ':'), default=str)
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not save diff state: {e}")
+
+    def diff(self, rows: List[Dict]) -> DiffResult:
+        """Diff a cleaned snapshot against the previous one and remember it"""
+        result = DiffResult()
+        current: Dict[str, Dict] = {}
+
+        for row in rows:
+            key = match_key_for(row)
+            if not key:
+                continue
+            current[key] = row
+            old = self.previous.get(key)
+            if old is None:
+                result.inserted[key] = row
+                continue
+
+            deltas = {
+                column: (old.get(column), value)
+                for column, value in row.items()
+                if column not in self.ignore_columns and old.get(column) != value
+            }
+            if deltas:
+                result.updated[key] = row
+                result.deltas[key] = deltas
+            else:
+                result.unchanged += 1
+
+        for key, row in self.previous.items():
+            if key not in current:
+                result.removed[key] = row
+
+        self.previous = current
+        self._save_state()
+        logger.info(f"🔀 Snapshot diff: {result.summary()}")
+        return result
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+InPlay Football Soak Test
+Runs many continuous-mode cycles against the offline fixtures and checks that
+resident memory stays flat (simulates a 24 h match day at accelerated speed)
+"""
+
+import os
+import sys
+import random
+import logging
+import argparse
+from typing import List, Dict, Tuple
+from unittest import mock
+
+from table_parser import parse_table_html, render_table_html
+from resource_monitor import MB, ResourceMonitor, process_rss
+from cycle_supervisor import adopt_driver
+from fake_webdriver import FakeWebDriver
+from fake_supabase import FakeSupabaseClient
+from logging_setup import setup_logging
+from replay import isolated_state
+from inplay_football_scraper import InPlayFootballScraper
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'fulltimemodelraw_sample.html')
+
+PRICE_COLUMNS = ['hprice', 'aprice', 'over_price', 'under_price']
+
+
+def drift_rows(rows: List[Dict], rng: random.Random, cycle: int) -> List[Dict]:
+    """Next snapshot: minutes tick, prices wander, and finished matches are replaced by new ones"""
+    next_rows = []
+    for i, row in enumerate(rows):
+        row = dict(row)
+        minute = int(row['min'] or 0) + 1
+        if minute > 95:
+            # Match finished - a new match with a fresh identity takes its slot
+            minute = 1
+            row['hometeam'] = f"{row['hometeam'].split(' #')[0]} #{cycle}-{i}"
+        row['min'] = str(minute)
+        for column in PRICE_COLUMNS:
+            if row.get(column):
+                row[column] = f"{max(1.01, float(row[column]) + rng.uniform(-0.03, 0.03)):.3f}"
+        next_rows.append(row)
+    return next_rows
+
+
+class OfflineSite:
+    """Stands in for Chrome and the website so run_scraper's own keep-browser loop can run offline
+
+    Every setup_driver starts a fresh FakeWebDriver, and navigating loads the
+    current snapshot into it; login and the tab click always succeed.
+    """
+
+    def __init__(self, scraper):
+        self.scraper = scraper
+        self.page = ''
+        self.browsers = 0
+        scraper.setup_driver = self.setup_driver
+        scraper.login = lambda: True
+        scraper.navigate_to_fulltime_page = self.navigate
+        scraper.click_fulltime_raw_tab = lambda: True
+        scraper.supabase_client = FakeSupabaseClient()
+
+    def setup_driver(self) -> None:
+        self.browsers += 1
+        adopt_driver(self.scraper, FakeWebDriver())
+
+    def navigate(self) -> bool:
+        self.scraper.driver.load_html(self.page)
+        return True
+
+
+def run_offline(scraper, base_rows: List[Dict], cycles: int, sample_every: int, seed: int,
+                monitor: ResourceMonitor) -> Tuple[List[float], int]:
+    """The run_continuous.py loop against fake_webdriver and fake_supabase; RSS samples and failed cycles
+
+    Each cycle is run_scraper(keep_browser=True), then the browser is recycled
+    between cycles once ResourceMonitor says so.
+    """
+    rng = random.Random(seed)
+    rows = base_rows
+    samples = []
+    failed = 0
+    site = OfflineSite(scraper)
+
+    # scrape_table_data has fixed settle sleeps meant for a real page
+    with mock.patch('time.sleep'):
+        for cycle in range(cycles):
+            rows = drift_rows(rows, rng, cycle)
+            site.page = render_table_html(rows)
+            if not scraper.run_scraper(keep_browser=True):
+                failed += 1
+
+            reason = monitor.after_cycle(scraper.driver)
+            if reason:
+                scraper.close_driver()
+                monitor.recycled(reason)
+
+            if cycle % sample_every == 0:
+                samples.append(process_rss() / MB)
+
+    scraper.close()
+    print(f"♻️ {monitor.recycles} browser recycles, {site.browsers} browsers started")
+    return samples, failed
+
+
+def run_browser(scraper, base_rows: List[Dict], cycles: int, sample_every: int, seed: int,
+                workdir: str, monitor: ResourceMonitor) -> List[float]:
+    """Same snapshots, but each is loaded into a real headless Chrome that gets recycled"""
+    rng = random.Random(seed)
+    rows = base_rows
+    samples = []
+    page_path = os.path.join(workdir, 'page.html')
+
+    for cycle in range(cycles):
+        rows = drift_rows(rows, rng, cycle)
+        with open(page_path, 'w', encoding='utf-8') as handle:
+            handle.write(render_table_html(rows))
+
+        if not scraper.driver:
+            scraper.setup_driver()
+        scraper.driver.get(f'file://{page_path}')
+        scraper.process_snapshot(scraper.scrape_table_data())
+
+        reason = monitor.after_cycle(scraper.driver)
+        if reason:
+            scraper.close_driver()
+            monitor.recycled(reason)
+
+        if cycle % sample_every == 0:
+            sample = monitor.sample(scraper.driver)
+            samples.append(sample['python_rss_mb'] + sample['browser_rss_mb'])
+
+    scraper.close()
+    return samples
+
+
+def growth_mb(samples: List[float], warmup_fraction: float = 0.1) -> float:
+    """Mean of the last window minus mean of the first post-warmup window"""
+    start = int(len(samples) * warmup_fraction)
+    steady = samples[start:]
+    window = max(1, len(steady) // 5)
+    first = sum(steady[:window]) / window
+    last = sum(steady[-window:]) / window
+    return last - first
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Soak-test continuous mode memory against offline fixtures')
+    parser.add_argument('--fixture', default=DEFAULT_FIXTURE)
+    parser.add_argument('--hours', type=float, default=24.0, help='Simulated match-day length')
+    parser.add_argument('--interval', type=float, default=30.0, help='Simulated seconds per cycle')
+    parser.add_argument('--cycles', type=int, help='Override the number of cycles')
+    parser.add_argument('--browser', action='store_true', help='Drive a real headless Chrome (slow)')
+    parser.add_argument('--browser-max-cycles', type=int, default=50,
+                        help='Recycle the browser after this many cycles (BROWSER_MAX_CYCLES)')
+    parser.add_argument('--tolerance-mb', type=float, default=20.0, help='Allowed RSS growth after warm-up')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    setup_logging(level=logging.WARNING)
+
+    cycles = args.cycles or int(args.hours * 3600 / args.interval)
+    sample_every = max(1, cycles // 200)
+
+    with open(args.fixture, 'r', encoding='utf-8') as handle:
+        base_rows = parse_table_html(handle.read())
+    if not base_rows:
+        print(f"❌ No rows found in {args.fixture}")
+        return 1
+
+    # Write cache, adaptive timeouts, diff, analytics, alert and spool state stay in workdir
+    with isolated_state() as workdir:
+        # Exercise every optional per-cycle stage so their state is soak-tested too
+        rules_path = os.path.join(workdir, 'rules.json')
+        with open(rules_path, 'w', encoding='utf-8') as handle:
+            handle.write('{"sinks": {"file": {"type": "file", "path": "%s"}}, '
+                         '"rules": [{"name": "late", "when": [["min", ">=", 60]]}]}'
+                         % os.path.join(workdir, 'alerts.jsonl'))
+        os.environ.update({
+            'HISTORY_DIR': os.path.join(workdir, 'history'),
+            'ENABLE_ANALYTICS': '1',
+            'ALERT_RULES': rules_path,
+            'BROWSER_MAX_CYCLES': str(args.browser_max_cycles),
+            # Simulated cycles are milliseconds apart; a 300 s freshness window would hold
+            # thousands of cycles' lags where a real 30 s cadence holds about ten
+            'FRESHNESS_WINDOW': '0.5',
+        })
+
+        scraper = InPlayFootballScraper()
+        monitor = ResourceMonitor()
+        failed = 0
+
+        print(f"🧪 Soak test: {cycles} cycles of {len(base_rows)} rows "
+              f"({'browser' if args.browser else 'offline'} mode)")
+        if args.browser:
+            samples = run_browser(scraper, base_rows, cycles, sample_every, args.seed, workdir, monitor)
+        else:
+            samples, failed = run_offline(scraper, base_rows, cycles, sample_every, args.seed, monitor)
+
+    growth = growth_mb(samples)
+    print(f"🧠 RSS start {samples[0]:.1f} MB, peak {max(samples):.1f} MB, end {samples[-1]:.1f} MB")
+    print(f"📈 Growth after warm-up: {growth:+.1f} MB (tolerance {args.tolerance_mb:.0f} MB)")
+
+    if failed:
+        print(f"❌ {failed} of {cycles} cycles failed")
+        return 1
+    if monitor.max_cycles and cycles >= monitor.max_cycles and not monitor.recycles:
+        print(f"❌ Browser was never recycled after {cycles} cycles (max {monitor.max_cycles})")
+        return 1
+    if growth > args.tolerance_mb:
+        print("❌ Memory is not flat")
+        return 1
+    print("✅ Memory stayed flat")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
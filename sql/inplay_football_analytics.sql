@@ -0,0 +1,21 @@
+-- Derived analytics columns written by cycle_analytics.py (ENABLE_ANALYTICS=1)
+ALTER TABLE inplay_football
+    ADD COLUMN IF NOT EXISTS imp_home DECIMAL,
+    ADD COLUMN IF NOT EXISTS imp_away DECIMAL,
+    ADD COLUMN IF NOT EXISTS imp_over DECIMAL,
+    ADD COLUMN IF NOT EXISTS imp_under DECIMAL,
+    ADD COLUMN IF NOT EXISTS overround_hdp DECIMAL,
+    ADD COLUMN IF NOT EXISTS overround_tg DECIMAL,
+    ADD COLUMN IF NOT EXISTS edge_home DECIMAL,
+    ADD COLUMN IF NOT EXISTS edge_over DECIMAL,
+    ADD COLUMN IF NOT EXISTS value_home DECIMAL,
+    ADD COLUMN IF NOT EXISTS value_away DECIMAL,
+    ADD COLUMN IF NOT EXISTS value_over DECIMAL,
+    ADD COLUMN IF NOT EXISTS hdp1_move_open DECIMAL,
+    ADD COLUMN IF NOT EXISTS tg1_move_open DECIMAL,
+    ADD COLUMN IF NOT EXISTS hdp1_move_prev DECIMAL,
+    ADD COLUMN IF NOT EXISTS tg1_move_prev DECIMAL,
+    ADD COLUMN IF NOT EXISTS hprice_move_prev DECIMAL,
+    ADD COLUMN IF NOT EXISTS aprice_move_prev DECIMAL,
+    ADD COLUMN IF NOT EXISTS over_price_move_prev DECIMAL,
+    ADD COLUMN IF NOT EXISTS under_price_move_prev DECIMAL;
@@ -0,0 +1,63 @@
+-- Finished matches, moved out of inplay_football with their final odds (ARCHIVE_FINISHED=1)
+-- Same columns as the live table plus the match date it is partitioned by, one partition per month
+CREATE TABLE IF NOT EXISTS inplay_football_archive (
+    LIKE inplay_football,
+    match_date DATE NOT NULL,
+    archived_at TIMESTAMPTZ NOT NULL DEFAULT now()
+) PARTITION BY RANGE (match_date);
+
+CREATE INDEX IF NOT EXISTS inplay_football_archive_match_idx
+    ON inplay_football_archive (match_date, hometeam);
+
+-- Date part of timeupdated ('19/10/2026, 15:45:37' -> 2026-10-19), NULL if it cannot be read
+CREATE OR REPLACE FUNCTION inplay_match_date(p_timeupdated TEXT)
+RETURNS DATE
+LANGUAGE plpgsql IMMUTABLE AS $$
+BEGIN
+    RETURN to_date(split_part(p_timeupdated, ',', 1), 'DD/MM/YYYY');
+EXCEPTION WHEN others THEN
+    RETURN NULL;
+END;
+$$;
+
+-- Move every row whose home team is no longer in play into the archive in one statement;
+-- returns the number of rows moved. Missing monthly partitions are created first.
+CREATE OR REPLACE FUNCTION archive_finished_matches(p_live_hometeams TEXT[])
+RETURNS INTEGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_month DATE;
+    v_moved INTEGER;
+BEGIN
+    FOR v_month IN
+        SELECT DISTINCT date_trunc('month', COALESCE(inplay_match_date(timeupdated), current_date))::DATE
+        FROM inplay_football
+        WHERE hometeam IS NULL OR hometeam <> ALL (p_live_hometeams)
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF inplay_football_archive FOR VALUES FROM (%L) TO (%L)',
+            'inplay_football_archive_' || to_char(v_month, 'YYYYMM'), v_month, (v_month + INTERVAL '1 month')::DATE
+        );
+    END LOOP;
+
+    -- Rows are matched by column name, so columns added to the live table later
+    -- (add them to the archive too) never shift the values into the wrong columns
+    WITH moved AS (
+        DELETE FROM inplay_football
+        WHERE hometeam IS NULL OR hometeam <> ALL (p_live_hometeams)
+        RETURNING *
+    )
+    INSERT INTO inplay_football_archive
+    SELECT (jsonb_populate_record(
+        NULL::inplay_football_archive,
+        to_jsonb(moved) || jsonb_build_object(
+            'match_date', COALESCE(inplay_match_date(moved.timeupdated), current_date),
+            'archived_at', now()
+        )
+    )).*
+    FROM moved;
+
+    GET DIAGNOSTICS v_moved = ROW_COUNT;
+    RETURN v_moved;
+END;
+$$;
@@ -0,0 +1,3 @@
+-- Capture time of each row, written when WRITE_CAPTURED_AT=1 (see freshness.py)
+ALTER TABLE inplay_football
+    ADD COLUMN IF NOT EXISTS captured_at TIMESTAMPTZ;
@@ -0,0 +1,32 @@
+-- Leader lease for active/standby scraper replicas (LEADER_LEASE=supabase, see leader_lease.py)
+CREATE TABLE IF NOT EXISTS scraper_leases (
+    name TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,
+    expires_at TIMESTAMPTZ NOT NULL,
+    -- Bumped on every change of holder, so a write can be traced to one term of leadership
+    epoch BIGINT NOT NULL DEFAULT 1
+);
+
+-- Take or renew the lease; returns the holder after the call, which is p_holder only if it won.
+-- Expiry is judged on the database clock, so the replicas' clocks do not need to agree.
+CREATE OR REPLACE FUNCTION acquire_scraper_lease(p_name TEXT, p_holder TEXT, p_ttl_seconds INTEGER)
+RETURNS TABLE (holder TEXT, expires_at TIMESTAMPTZ, epoch BIGINT)
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO scraper_leases AS l (name, holder, expires_at)
+    VALUES (p_name, p_holder, now() + make_interval(secs => p_ttl_seconds))
+    ON CONFLICT (name) DO UPDATE
+        SET holder = EXCLUDED.holder,
+            expires_at = EXCLUDED.expires_at,
+            epoch = CASE WHEN l.holder = EXCLUDED.holder THEN l.epoch ELSE l.epoch + 1 END
+        WHERE l.holder = EXCLUDED.holder OR l.expires_at < now();
+    RETURN QUERY SELECT l.holder, l.expires_at, l.epoch FROM scraper_leases l WHERE l.name = p_name;
+END;
+$$;
+
+-- Give the lease up early (clean shutdown) so the standby takes over on its next cycle
+CREATE OR REPLACE FUNCTION release_scraper_lease(p_name TEXT, p_holder TEXT)
+RETURNS VOID
+LANGUAGE sql AS $$
+    UPDATE scraper_leases SET expires_at = now() WHERE name = p_name AND holder = p_holder;
+$$;
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+InPlay Football Supabase Client
+Wraps the supabase client with per-call timeouts, jittered exponential retries on
+retryable errors and a circuit breaker; while the breaker is open, snapshots are
+spooled to a local file instead of being sent
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from cycle_supervisor import jittered_backoff
+from scraper_metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# Postgres error classes worth retrying: serialization/deadlock, connection, resources, timeouts
+RETRYABLE_PG_CODES = ('40001', '40P01', '57014', '57P01')
+RETRYABLE_PG_PREFIXES = ('08', '53')
+RETRYABLE_MESSAGES = ('timeout', 'timed out', 'temporarily unavailable', 'too many requests',
+                      'bad gateway', 'service unavailable', 'gateway timeout', 'connection reset')
+
+QUERY_OPERATIONS = ('select', 'insert', 'update', 'upsert', 'delete')
+
+# Operations that must not be repeated if the first attempt may have committed
+NON_IDEMPOTENT_OPERATIONS = ('insert',)
+
+
+class CircuitOpenError(Exception):
+    """The breaker is open: calls are refused until a probe succeeds"""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Transport failures, timeouts, 5xx/429 and transient Postgres errors are retryable"""
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    try:
+        import httpx
+        if isinstance(error, (httpx.TimeoutException, httpx.TransportError)):
+            return True
+        if isinstance(error, httpx.HTTPStatusError):
+            status = error.response.status_code
+            return status == 429 or status >= 500
+    except ImportError:
+        pass
+
+    code = str(getattr(error, 'code', '') or '')
+    if code in RETRYABLE_PG_CODES or code.startswith(RETRYABLE_PG_PREFIXES):
+        return True
+    if code.isdigit() and (int(code) == 429 or int(code) >= 500):
+        return True
+    message = str(error).lower()
+    return any(fragment in message for fragment in RETRYABLE_MESSAGES)
+
+
+def may_have_been_applied(error: BaseException) -> bool:
+    """Whether a failed request could still have committed: a timeout or a lost reply, not a refusal"""
+    try:
+        import httpx
+        if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout)):
+            return False
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in (502, 504)
+    except ImportError:
+        pass
+    if isinstance(error, ConnectionRefusedError):
+        return False
+    code = str(getattr(error, 'code', '') or '')
+    # Postgres reported the error itself, so the statement was rolled back
+    if code in RETRYABLE_PG_CODES or code.startswith(RETRYABLE_PG_PREFIXES):
+        return False
+    if code.isdigit():
+        return int(code) in (502, 504)
+    return True
+
+
+class CircuitBreaker:
+    """closed -> open after N consecutive failures; open -> half_open after reset_timeout"""
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def _set_state(self, state: str) -> None:
+        if state != self.state:
+            logger.warning(f"🔌 Supabase circuit {self.state} -> {state}")
+        self.state = state
+        REGISTRY.set('inplay_supabase_circuit_open', 1 if state == self.OPEN else 0,
+                     help_text='1 while the Supabase circuit breaker is open')
+
+    def ready_for_probe(self) -> bool:
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self._set_state(self.HALF_OPEN)
+            return self.state == self.HALF_OPEN
+
+    def allow(self) -> bool:
+        with self._lock:
+            return self.state == self.CLOSED
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._set_state(self.CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                if self.state != self.OPEN:
+                    REGISTRY.inc('inplay_supabase_circuit_trips_total',
+                                 help_text='Times the Supabase circuit breaker opened')
+                self._set_state(self.OPEN)
+
+
+class LocalSpool:
+    """Bounded JSON-lines buffer of snapshots that could not be written (history-archive format)"""
+
+    def __init__(self, path: str, max_snapshots: int = 20):
+        self.path = path
+        self.max_snapshots = max_snapshots
+
+    def _snapshots(self) -> List[List[str]]:
+        if not os.path.exists(self.path):
+            return []
+        snapshots: List[List[str]] = []
+        stamp = None
+        with open(self.path, 'r', encoding='utf-8') as handle:
+            for line in handle:
+                record_stamp = json.loads(line).get('captured_at')
+                if not snapshots or record_stamp != stamp:
+                    snapshots.append([])
+                    stamp = record_stamp
+                snapshots[-1].append(line)
+        return snapshots
+
+    def pending(self) -> int:
+        return len(self._snapshots())
+
+    def append(self, rows: List[Dict]) -> None:
+        stamp = datetime.now(timezone.utc).isoformat()
+        lines = [json.dumps(dict(row, captured_at=stamp), separators=(',', ':'), default=str) + '\n'
+                 for row in rows]
+        snapshots = self._snapshots()[-(self.max_snapshots - 1):] if self.max_snapshots > 1 else []
+        snapshots.append(lines)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as handle:
+            for snapshot in snapshots:
+                handle.writelines(snapshot)
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> int:
+        pending = self.pending()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        return pending
+
+
+class _Query:
+    """Forwards the builder chain to the real query and routes execute() through the wrapper"""
+
+    def __init__(self, wrapper: 'ResilientSupabase', table: str, query: Any, operation: str = 'select'):
+        self._wrapper = wrapper
+        self._table = table
+        self._query = query
+        self._operation = operation
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._query, name)
+        if not callable(attr):
+            return attr
+
+        def chained(*args, **kwargs):
+            operation = name if name in QUERY_OPERATIONS else self._operation
+            return _Query(self._wrapper, self._table, attr(*args, **kwargs), operation)
+        return chained
+
+    def execute(self):
+        return self._wrapper.execute(self._query.execute, self._table, self._operation)
+
+
+class ResilientSupabase:
+    """Drop-in for the supabase client's table() API with retries and a circuit breaker"""
+
+    def __init__(self, client, retries: Optional[int] = None, retry_delay: Optional[float] = None,
+                 retry_max_delay: Optional[float] = None, breaker: Optional[CircuitBreaker] = None,
+                 spool: Optional[LocalSpool] = None, probe_table: str = 'inplay_football'):
+        self.client = client
+        self.retries = int(os.getenv('SUPABASE_RETRIES', '3')) if retries is None else retries
+        self.retry_delay = float(os.getenv('SUPABASE_RETRY_DELAY', '0.5')) if retry_delay is None else retry_delay
+        self.retry_max_delay = (float(os.getenv('SUPABASE_RETRY_MAX_DELAY', '8'))
+                                if retry_max_delay is None else retry_max_delay)
+        self.breaker = breaker or CircuitBreaker(
+            failure_threshold=int(os.getenv('SUPABASE_BREAKER_THRESHOLD', '5')),
+            reset_timeout=float(os.getenv('SUPABASE_BREAKER_RESET', '30')),
+        )
+        self.spool = spool or LocalSpool(
+            os.getenv('SUPABASE_SPOOL', 'supabase_spool.jsonl'),
+            int(os.getenv('SUPABASE_SPOOL_MAX_SNAPSHOTS', '20')),
+        )
+        self.probe_table = probe_table
+
+    def table(self, name: str) -> _Query:
+        return _Query(self, name, self.client.table(name))
+
+    def rpc(self, function: str, params: Optional[Dict] = None) -> _Query:
+        """Call a Postgres function (see sql/) through the same retries and breaker"""
+        return _Query(self, function, self.client.rpc(function, params or {}), 'rpc')
+
+    def execute(self, call: Callable[[], Any], table: str = '', operation: str = 'call') -> Any:
+        """Run one request: refused while open, retried with back-off while retryable"""
+        if not self.breaker.allow():
+            REGISTRY.inc('inplay_supabase_calls_total', {'op': operation, 'outcome': 'refused'},
+                         help_text='Supabase requests by operation and outcome')
+            raise CircuitOpenError(f"Supabase circuit is {self.breaker.state} - {operation} on {table} refused")
+
+        attempt = 0
+        while True:
+            try:
+                result = call()
+            except Exception as e:
+                retryable = is_retryable(e)
+                if retryable:
+                    # Only transient failures count, and every attempt does, so a brownout opens
+                    # the breaker within one save instead of after several save deadlines
+                    self.breaker.record_failure()
+                if operation in NON_IDEMPOTENT_OPERATIONS and may_have_been_applied(e):
+                    # A timed-out insert may have committed; retrying could duplicate the row.
+                    # The next save finds it among the existing rows or inserts it then
+                    retryable = False
+                if retryable and attempt < self.retries and self.breaker.allow():
+                    attempt += 1
+                    delay = jittered_backoff(attempt, self.retry_delay, self.retry_max_delay)
+                    REGISTRY.inc('inplay_supabase_retries_total', {'op': operation},
+                                 help_text='Supabase requests retried after a retryable error')
+                    logger.warning(f"🔁 Supabase {operation} on {table} failed ({e}) - "
+                                   f"retry {attempt}/{self.retries} in {delay:.1f}s")
+                    time.sleep(delay)
+                    continue
+                REGISTRY.inc('inplay_supabase_calls_total', {'op': operation, 'outcome': 'error'},
+                             help_text='Supabase requests by operation and outcome')
+                raise
+            self.breaker.record_success()
+            REGISTRY.inc('inplay_supabase_calls_total', {'op': operation, 'outcome': 'ok'},
+                         help_text='Supabase requests by operation and outcome')
+            return result
+
+    def available(self) -> bool:
+        """False while the breaker is open; once the reset timeout passes, one cheap probe decides"""
+        if self.breaker.allow():
+            return True
+        if not self.breaker.ready_for_probe():
+            return False
+        try:
+            self.client.table(self.probe_table).select('id').limit(1).execute()
+        except Exception as e:
+            logger.warning(f"🔌 Supabase probe failed: {e}")
+            self.breaker.record_failure()
+            return False
+        logger.info("🔌 Supabase probe succeeded - resuming writes")
+        self.breaker.record_success()
+        return True
+
+
+def create_resilient_client(url: str, key: str) -> ResilientSupabase:
+    """Supabase client with a per-request timeout (SUPABASE_TIMEOUT) behind the resilience wrapper"""
+    from supabase import create_client
+    from supabase.lib.client_options import ClientOptions
+
+    timeout = float(os.getenv('SUPABASE_TIMEOUT', '10'))
+    client = create_client(url, key, options=ClientOptions(postgrest_client_timeout=timeout))
+    return ResilientSupabase(client)
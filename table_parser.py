@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+InPlay Football Table Parser
+Parses captured #fulltimemodelraw HTML into the same raw row dicts that
+scrape_table_data produces, and renders rows back into that HTML for fixtures
+"""
+
+import html
+from html.parser import HTMLParser
+from typing import List, Dict, Optional
+
+# Column mapping for the Full-Time Model Raw table, in on-page order
+TABLE_COLUMNS = [
+    'timeupdated', 'league', 'hometeam', 'awayteam', 'min', 'score',
+    'modsup', 'hdp1', 'hprice', 'aprice', 'homehdp1', 'awayhdp1',
+    'tg1', 'over_price', 'under_price', 'overtg1', 'undertg1',
+    'hdp1_hval', 'hdp1_aval', 'tg1_oval', 'tg1_uval',
+    'hdp2', 'homehdp2', 'awayhdp2', 'hdp3', 'homehdp3', 'awayhdp3',
+    'hdp4', 'homehdp4', 'awayhdp4', 'modhome', 'modaway',
+    'homeperc', 'awayperc', 'modtgs', 'tg2', 'overtg2', 'undertg2',
+    'tg3', 'overtg3', 'undertg3', 'tg4', 'overtg4', 'undertg4',
+    'modover', 'modunder', 'overperc', 'underperc',
+    'startline', 'start_tgs', 'analysis'
+]
+
+TABLE_ID = 'fulltimemodelraw'
+
+
+def normalise_cell(text: str) -> Optional[str]:
+    """Match Selenium's cell.text handling: collapse whitespace, empty or '-' is None"""
+    text = ' '.join(text.split())
+    if text == '' or text == '-':
+        return None
+    return text
+
+
+class _TableParser(HTMLParser):
+    """Collects the td text of every tbody row inside the target table"""
+
+    def __init__(self, table_id: str):
+        super().__init__(convert_charrefs=True)
+        self.table_id = table_id
+        self.rows: List[List[str]] = []
+        self._table_depth = 0
+        self._in_tbody = False
+        self._row: Optional[List[str]] = None
+        self._cell: Optional[List[str]] = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'table':
+            if self._table_depth:
+                self._table_depth += 1
+            elif dict(attrs).get('id') == self.table_id:
+                self._table_depth = 1
+            return
+        if self._table_depth != 1:
+            return
+        if tag == 'tbody':
+            self._in_tbody = True
+        elif tag == 'tr' and self._in_tbody:
+            self._row = []
+        elif tag == 'td' and self._row is not None:
+            self._cell = []
+        elif tag == 'br' and self._cell is not None:
+            self._cell.append(' ')
+
+    def handle_endtag(self, tag):
+        if tag == 'table' and self._table_depth:
+            self._table_depth -= 1
+            return
+        if self._table_depth != 1:
+            return
+        if tag == 'td' and self._cell is not None:
+            self._row.append(''.join(self._cell))
+            self._cell = None
+        elif tag == 'tr' and self._row is not None:
+            self.rows.append(self._row)
+            self._row = None
+        elif tag == 'tbody':
+            self._in_tbody = False
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+
+def parse_table_rows(page_html: str, table_id: str = TABLE_ID) -> List[List[str]]:
+    """Raw cell text of every body row in the table"""
+    parser = _TableParser(table_id)
+    parser.feed(page_html)
+    parser.close()
+    return parser.rows
+
+
+def parse_table_html(page_html: str, columns: Optional[List[str]] = None,
+                     table_id: str = TABLE_ID) -> List[Dict]:
+    """Row dicts keyed by column; rows with the wrong cell count are skipped like the live scraper does"""
+    columns = columns or TABLE_COLUMNS
+    rows = []
+    for cells in parse_table_rows(page_html, table_id):
+        if len(cells) != len(columns):
+            continue
+        rows.append({column: normalise_cell(cell) for column, cell in zip(columns, cells)})
+    return rows
+
+
+def render_table_html(rows: List[Dict], columns: Optional[List[str]] = None,
+                      table_id: str = TABLE_ID) -> str:
+    """Render raw row dicts as a minimal page containing the DataTable"""
+    columns = columns or TABLE_COLUMNS
+    head = ''.join(f'<th>{html.escape(column)}</th>' for column in columns)
+    body = []
+    for row in rows:
+        cells = ''.join(
+            f'<td>{html.escape(str(row.get(column))) if row.get(column) is not None else "-"}</td>'
+            for column in columns
+        )
+        body.append(f'<tr>{cells}</tr>')
+    return (
+        '<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>Full-Time Model Raw</title></head><body>\n'
+        f'<table id="{table_id}" class="display">\n<thead><tr>{head}</tr></thead>\n<tbody>\n'
+        + '\n'.join(body)
+        + '\n</tbody>\n</table>\n</body></html>\n'
+    )
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+InPlay Football Worker Pool
+Spreads scrape targets over worker processes that each own one browser, with a
+single writer process doing the database sync; a crashed or stalled worker is
+restarted on its own while the others keep scraping
+"""
+
+import os
+import sys
+import time
+import pickle
+import signal
+import logging
+import argparse
+import multiprocessing
+from multiprocessing.connection import wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+from cycle_supervisor import FailureBackoff
+from logging_setup import current_cycle, setup_logging, start_cycle
+from multi_target import MultiTargetRunner, ScrapeTarget, load_targets, write_target_rows
+from scraper_metrics import REGISTRY, start_metrics_server
+
+logger = logging.getLogger(__name__)
+
+# Fork would copy the parent's logging and HTTP threads mid-flight; spawned children start clean
+CONTEXT = multiprocessing.get_context('spawn')
+
+# Workers report in at least this often while idle, so silence means hung
+HEARTBEAT_SECONDS = 5.0
+
+
+def default_scraper():
+    from inplay_football_scraper import InPlayFootballScraper
+    return InPlayFootballScraper()
+
+
+def encode_batch(rows: List[Dict]) -> bytes:
+    """Rows as value tuples under one column header, pickled: about half the size of JSON dicts"""
+    columns = list(dict.fromkeys(column for row in rows for column in row))
+    values = [tuple(row.get(column) for column in columns) for row in rows]
+    return pickle.dumps((columns, values), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def decode_batch(payload: bytes) -> List[Dict]:
+    columns, values = pickle.loads(payload)
+    return [dict(zip(columns, row)) for row in values]
+
+
+def assign_targets(targets: List[ScrapeTarget], workers: int) -> List[List[ScrapeTarget]]:
+    """Deal targets round-robin, busiest (shortest interval) first, so the load evens out"""
+    ordered = sorted(targets, key=lambda target: target.interval)
+    shares: List[List[ScrapeTarget]] = [[] for _ in range(max(1, min(workers, len(targets))))]
+    for i, target in enumerate(ordered):
+        shares[i % len(shares)].append(target)
+    return shares
+
+
+class PipeRunner(MultiTargetRunner):
+    """A MultiTargetRunner whose save cleans the rows and hands them to the coordinator"""
+
+    def __init__(self, scraper, targets: List[ScrapeTarget], conn):
+        super().__init__(scraper, targets)
+        self.conn = conn
+        # Set once the coordinator has gone away; the remaining due targets are skipped
+        self.stopping = False
+
+    def send(self, message: Tuple) -> bool:
+        try:
+            self.conn.send(message)
+            return True
+        except (ConnectionError, OSError):
+            self.stopping = True
+            return False
+
+    def save(self, target: ScrapeTarget, rows: List[Dict]) -> bool:
+        clean_data = [self.scraper.clean_row(row, target.text_columns) for row in rows]
+        return self.send(('batch', target.name, current_cycle(), encode_batch(clean_data)))
+
+    def scrape_target(self, target: ScrapeTarget) -> bool:
+        if self.stopping:
+            return False
+        ok = super().scrape_target(target)
+        self.send(('tick', target.name, ok))
+        return ok
+
+
+def run_worker(conn, name: str, targets: List[ScrapeTarget], scraper_factory: Callable) -> None:
+    """Worker process: one browser scraping its share of the targets until the pipe closes"""
+    # Own process group, so killing a stalled worker takes its chromedriver and Chrome along
+    os.setsid()
+    setup_logging(f'worker_pool.{name}.log')
+    scraper = scraper_factory()
+    runner = PipeRunner(scraper, targets, conn)
+    conn.send(('ready', os.getpid()))
+    try:
+        while not runner.stopping:
+            runner.run_due()
+            runner.send(('tick', None, None))
+            # This process's REGISTRY is only exported through the coordinator
+            runner.send(('metrics', REGISTRY.snapshot()))
+            wait_seconds = min(runner.next_due.values()) - time.monotonic()
+            if wait_seconds > 0:
+                time.sleep(min(wait_seconds, HEARTBEAT_SECONDS))
+    except (ConnectionError, EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        scraper.timeouts.save()
+        scraper.close()
+
+
+def run_writer(conn, destinations: Dict[str, str], scraper_factory: Callable) -> None:
+    """Writer process: writes each list of batches it is sent, then reports back"""
+    os.setsid()
+    setup_logging('worker_pool.writer.log')
+    scraper = scraper_factory()
+    conn.send(('ready', os.getpid()))
+    try:
+        while True:
+            results = []
+            for target, cycle_id, payload in conn.recv():
+                start_cycle(cycle_id)
+                started = time.monotonic()
+                rows = decode_batch(payload)
+                try:
+                    ok = bool(write_target_rows(scraper, destinations[target], rows))
+                except Exception as e:
+                    logger.error(f"❌ Write for target {target} failed: {e}")
+                    ok = False
+                results.append((target, ok, len(rows), time.monotonic() - started))
+            conn.send(('written', results, REGISTRY.snapshot()))
+    except (ConnectionError, EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        scraper.close()
+
+
+class PoolProcess:
+    """One child process (started as target(conn, *args)) and the coordinator's end of its pipe"""
+
+    def __init__(self, name: str, target: Callable, args: tuple):
+        self.name = name
+        self.target = target
+        self.args = args
+        self.process = None
+        self.conn = None
+        self.last_seen = 0.0
+        self.restarts = 0
+        self.next_start = 0.0
+        self.backoff = FailureBackoff()
+
+    @property
+    def running(self) -> bool:
+        return self.process is not None
+
+    def start(self) -> None:
+        parent_conn, child_conn = CONTEXT.Pipe()
+        self.process = CONTEXT.Process(target=self.target, args=(child_conn,) + self.args,
+                                       name=f'pool-{self.name}', daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+        self.last_seen = time.monotonic()
+
+    def stop(self, kill: bool = False) -> None:
+        if self.process is None:
+            return
+        self.conn.close()
+        if not kill:
+            # Closing the pipe ends the child's loop; it closes its browser on the way out
+            self.process.join(timeout=30)
+        if self.process.is_alive():
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                self.process.kill()
+            self.process.join()
+        self.process = None
+        self.conn = None
+
+
+class PoolCoordinator:
+    """Runs one browser worker per share of the targets plus one writer, and keeps them all alive
+
+    Workers send cleaned snapshots as compact batches; the coordinator keeps only the
+    newest undelivered batch per target and hands them to the writer whenever it is idle.
+    """
+
+    def __init__(self, targets: List[ScrapeTarget], workers: Optional[int] = None,
+                 stall_timeout: Optional[float] = None, scraper_factory: Callable = default_scraper):
+        if workers is None:
+            workers = int(os.getenv('POOL_WORKERS', '0')) or os.cpu_count() or 1
+        self.stall_timeout = (float(os.getenv('POOL_STALL_TIMEOUT', '600'))
+                              if stall_timeout is None else stall_timeout)
+        self.workers = [PoolProcess(f'worker-{i}', run_worker, (f'worker-{i}', share, scraper_factory))
+                        for i, share in enumerate(assign_targets(targets, workers))]
+        self.writer = PoolProcess('writer', run_writer,
+                                  ({target.name: target.destination for target in targets}, scraper_factory))
+        self.pending: Dict[str, Tuple[str, Optional[str], bytes]] = {}
+        self.in_flight: List[Tuple[str, Optional[str], bytes]] = []
+        self.writer_busy = False
+
+    @property
+    def processes(self) -> List[PoolProcess]:
+        return self.workers + [self.writer]
+
+    def restart(self, child: PoolProcess, reason: str) -> None:
+        """Kill one child and schedule its replacement; the rest of the pool is untouched"""
+        child.stop(kill=True)
+        child.restarts += 1
+        delay = child.backoff.failed()
+        child.next_start = time.monotonic() + delay
+        REGISTRY.inc('inplay_pool_restarts_total', {'process': child.name, 'reason': reason},
+                     help_text='Pool processes restarted, by reason')
+        logger.warning(f"♻️ Restarting {child.name} in {delay:.0f}s ({reason}, restart #{child.restarts})")
+        if child is self.writer:
+            # Whatever it was writing is sent again unless a newer snapshot has arrived
+            for batch in self.in_flight:
+                self.pending.setdefault(batch[0], batch)
+            self.in_flight = []
+            self.writer_busy = False
+
+    def handle(self, child: PoolProcess, message: Tuple) -> None:
+        kind = message[0]
+        if kind == 'ready':
+            logger.info(f"🔥 {child.name} started (pid {message[1]})")
+        elif kind == 'tick':
+            if message[2]:
+                child.backoff.succeeded()
+        elif kind == 'metrics':
+            self.adopt_metrics(child, message[1])
+        elif kind == 'batch':
+            _, target, cycle_id, payload = message
+            # An older batch still waiting is superseded: the writer only needs the latest table
+            self.pending[target] = (target, cycle_id, payload)
+            REGISTRY.inc('inplay_pool_batch_bytes_total', {'target': target}, amount=len(payload),
+                         help_text='Serialized snapshot bytes sent from workers')
+        elif kind == 'written':
+            self.writer_busy = False
+            self.in_flight = []
+            self.adopt_metrics(child, message[2])
+            for target, ok, rows, seconds in message[1]:
+                labels = {'target': target}
+                REGISTRY.inc('inplay_pool_writes_total', {'target': target, 'ok': str(ok).lower()},
+                             help_text='Snapshot writes by the pool writer, by outcome')
+                REGISTRY.observe('inplay_pool_write_seconds', seconds, labels,
+                                 help_text='Time the writer took to sync one target snapshot')
+                if ok:
+                    REGISTRY.set('inplay_target_rows', rows, labels,
+                                 help_text='Rows read from each target in its last cycle')
+                    REGISTRY.set('inplay_target_last_success_timestamp', time.time(), labels,
+                                 help_text='Unix time of each target\'s last successful cycle')
+                    child.backoff.succeeded()
+                logger.info(f"{'✅' if ok else '❌'} Wrote {target}: {rows} rows in {seconds:.1f}s")
+
+    @staticmethod
+    def adopt_metrics(child: PoolProcess, snapshot: Dict) -> None:
+        """Export a child's own metrics (stage timings, per-target counters, writes) as process=<name>"""
+        REGISTRY.merge(snapshot, {'process': child.name})
+
+    def dispatch(self) -> None:
+        """Send everything pending to the writer in one message if it is idle"""
+        if self.writer_busy or not self.pending or not self.writer.running:
+            return
+        self.in_flight = list(self.pending.values())
+        self.pending = {}
+        try:
+            self.writer.conn.send(self.in_flight)
+            self.writer_busy = True
+            self.writer.last_seen = time.monotonic()
+        except (BrokenPipeError, OSError):
+            self.restart(self.writer, 'crashed')
+
+    def check(self) -> None:
+        """Start due children and replace any that died or went quiet for too long"""
+        now = time.monotonic()
+        for child in self.processes:
+            if not child.running:
+                if now >= child.next_start:
+                    child.start()
+            elif not child.process.is_alive():
+                self.restart(child, 'crashed')
+            elif now - child.last_seen > self.stall_timeout and (child is not self.writer or self.writer_busy):
+                # An idle writer has nothing to say; a busy one must answer within the timeout
+                self.restart(child, 'stalled')
+        REGISTRY.set('inplay_pool_workers_alive', sum(1 for child in self.workers if child.running),
+                     help_text='Browser workers currently running')
+
+    def poll(self, timeout: float = 1.0) -> None:
+        """One coordinator pass: read whatever the children sent, then supervise and dispatch"""
+        self.check()
+        by_conn = {child.conn: child for child in self.processes if child.running}
+        for conn in wait(list(by_conn), timeout=timeout):
+            child = by_conn[conn]
+            try:
+                while child.running and conn.poll():
+                    self.handle(child, conn.recv())
+                    child.last_seen = time.monotonic()
+            except (EOFError, OSError):
+                self.restart(child, 'crashed')
+        self.dispatch()
+
+    def run_forever(self) -> None:
+        while True:
+            self.poll()
+
+    def stop(self) -> None:
+        for child in self.processes:
+            child.stop()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Scrape targets with a pool of browser processes')
+    parser.add_argument('targets', nargs='?', default=os.getenv('TARGETS_FILE', 'targets.json'),
+                        help='JSON list of targets (see targets.example.json)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Browser processes (default POOL_WORKERS or the CPU count)')
+    args = parser.parse_args(argv)
+
+    setup_logging('worker_pool.log')
+    targets = load_targets(args.targets)
+    if os.getenv('METRICS_PORT'):
+        start_metrics_server(int(os.getenv('METRICS_PORT')))
+    pool = PoolCoordinator(targets, workers=args.workers)
+    for child in pool.workers:
+        logger.info(f"🧩 {child.name}: {', '.join(target.name for target in child.args[1])}")
+    try:
+        pool.run_forever()
+    except KeyboardInterrupt:
+        logger.info("🛑 Stopping worker pool")
+    finally:
+        pool.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+InPlay Football Write Deltas
+Remembers the last version of each row written to Supabase so an update only
+sends the columns that changed, grouped by changed-column set for batching
+"""
+
+import os
+import json
+import logging
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Sent with every batched row so the upsert's would-be insert satisfies the uniqueness columns
+IDENTITY_COLUMNS = ('hometeam', 'timeupdated')
+
+
+def payload_bytes(payload) -> int:
+    """Size of a request body as the client would serialise it"""
+    return len(json.dumps(payload, default=str))
+
+
+class WriteCache:
+    """match key -> {'id': row id, 'row': last record written}; optionally persisted between runs"""
+
+    def __init__(self, state_path: Optional[str] = None):
+        self.state_path = state_path
+        self.rows: Dict[str, Dict] = {}
+        self._load_state()
+
+    def changes(self, key: str, row_id, record: Dict) -> Optional[Dict]:
+        """Columns of record that differ from the last write, or None if a full write is needed"""
+        cached = self.rows.get(key)
+        if cached is None or cached['id'] != row_id:
+            return None
+        previous = cached['row']
+        return {column: value for column, value in record.items()
+                if column not in previous or previous[column] != value}
+
+    def remember(self, key: str, row_id, record: Dict) -> None:
+        self.rows[key] = {'id': row_id, 'row': dict(record)}
+
+    def retain(self, keys) -> None:
+        """Forget matches that are no longer listed (their rows are cleaned up)"""
+        self.rows = {key: entry for key, entry in self.rows.items() if key in keys}
+
+    def _load_state(self) -> None:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as handle:
+                self.rows = json.load(handle)
+        except (OSError, ValueError) as e:
+            # An empty cache only costs one cycle of full updates
+            logger.warning(f"⚠️ Could not load write cache: {e}")
+            self.rows = {}
+
+    def save(self) -> None:
+        if not self.state_path:
+            return
+        try:
+            tmp_path = self.state_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as handle:
+                json.dump(self.rows, handle, separators=(',', ':'), default=str)
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not save write cache: {e}")
+
+
+def group_by_columns(updates: List[Tuple]) -> Dict[Tuple[str, ...], List[Tuple]]:
+    """Group (row id, key, record, changed) updates by their sorted changed-column set"""
+    groups: Dict[Tuple[str, ...], List[Tuple]] = {}
+    for update in updates:
+        groups.setdefault(tuple(sorted(update[3])), []).append(update)
+    return groups